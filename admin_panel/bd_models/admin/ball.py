@@ -2,13 +2,15 @@ from typing import TYPE_CHECKING, Any
 
 from django.contrib import admin
 from django.contrib.admin.utils import quote
+from django.db.models import Q
 from django.forms import Textarea
 from django.urls import reverse
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
-from django.utils.text import capfirst
+from django.utils.text import capfirst, smart_split, unescape_string_literal
 
 from ..models import Ball, BallInstance, Economy, Regime, TradeObject, transform_media
+from ..utils import search_balls
 
 if TYPE_CHECKING:
     from django.db.models import Field, Model, QuerySet
@@ -153,6 +155,7 @@ class BallAdmin(admin.ModelAdmin):
     list_filter = ["enabled", "tradeable", "regime", "economy", "created_at"]
     ordering = ["-created_at"]
 
+    # fields are searched through the indexed "search_text" column, see get_search_results
     search_fields = [
         "country",
         "capacity_name",
@@ -167,6 +170,21 @@ class BallAdmin(admin.ModelAdmin):
         "credits, catch names or translations"
     )
 
+    def get_search_results(
+        self, request: "HttpRequest", queryset: "QuerySet[Ball]", search_term: str
+    ) -> "tuple[QuerySet[Ball], bool]":
+        if not search_term:
+            return super().get_search_results(request, queryset, search_term)  # type: ignore
+        # like the default search, every word must be found in one of the fields
+        for bit in smart_split(search_term):
+            if bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+                bit = unescape_string_literal(bit)
+            condition = Q(id__in=search_balls(bit))
+            if bit.isdigit():
+                condition |= Q(pk=int(bit))
+            queryset = queryset.filter(condition)
+        return queryset, False
+
     @admin.display(description="Emoji")
     def emoji(self, obj: Ball):
         return mark_safe(
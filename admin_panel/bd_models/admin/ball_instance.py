@@ -1,11 +1,11 @@
 from typing import TYPE_CHECKING, Any
 
 from admin_auto_filters.filters import AutocompleteFilter
-from django.contrib import admin, messages
-from django.db.models import Prefetch
+from django.contrib import admin
+from django.db.models import Prefetch, Q
 
-from ..models import BallInstance, Player, Trade, TradeObject
-from ..utils import ApproxCountPaginator
+from ..models import Ball, BallInstance, Player, Trade, TradeObject
+from ..utils import ApproxCountPaginator, search_balls
 
 if TYPE_CHECKING:
     from django.db.models import QuerySet
@@ -52,7 +52,7 @@ class BallInstanceAdmin(admin.ModelAdmin):
     show_full_result_count = False
     paginator = ApproxCountPaginator
 
-    search_help_text = "Search by hexadecimal ID or Discord ID"
+    search_help_text = "Search by hexadecimal ID, Discord ID or countryball name"
     search_fields = ("id",)  # field is ignored, but required for the text area to show up
 
     def get_search_results(
@@ -66,11 +66,15 @@ class BallInstanceAdmin(admin.ModelAdmin):
             except Player.DoesNotExist:
                 return queryset.none(), False
             return queryset.filter(player=player), False
+        countries = search_balls(search_term, country_only=True)
         try:
-            return queryset.filter(id=int(search_term, 16)), False
+            pk = int(search_term, 16)
         except ValueError:
-            messages.error(request, "Invalid search query")
-            return queryset.none(), False
+            return queryset.filter(ball_id__in=countries), False
+        # names made of hexadecimal letters like "Cafe" are valid IDs too, search both
+        # the balls are fetched first, indexes can't be used for a subquery inside an OR
+        ball_ids = list(Ball.objects.filter(id__in=countries).values_list("id", flat=True))
+        return queryset.filter(Q(id=pk) | Q(ball_id__in=ball_ids)), False
 
     def change_view(
         self,
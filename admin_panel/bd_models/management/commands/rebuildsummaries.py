@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from ballsdex.core.models import REBUILD_SUMMARIES_QUERY
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the collection summaries of all players from the ballinstance table. "
+        "Writes to ballinstance are blocked until this finishes."
+    )
+
+    def handle(self, *args, **options):
+        t1 = time.time()
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(REBUILD_SUMMARIES_QUERY)
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt collection summaries in {time.time() - t1:.2f}s.")
+        )
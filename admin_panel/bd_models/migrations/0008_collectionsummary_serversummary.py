@@ -0,0 +1,146 @@
+# Generated by Django 5.1.4 on 2026-10-16 12:00
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+# The summaries are updated by a trigger rather than by the bot, so that every writer (bot,
+# admin panel, manual queries) keeps them in sync. Updates that don't change the counted
+# columns, like locking or adding to favorites, are skipped early.
+SUMMARY_TRIGGER = """
+CREATE FUNCTION ballinstance_summary() RETURNS trigger AS $$
+DECLARE
+    remaining integer;
+    summary_id bigint;
+BEGIN
+    IF TG_OP = 'UPDATE' AND (
+        OLD.player_id, OLD.ball_id, OLD.special_id, OLD.trade_player_id, OLD.server_id
+    ) IS NOT DISTINCT FROM (
+        NEW.player_id, NEW.ball_id, NEW.special_id, NEW.trade_player_id, NEW.server_id
+    ) THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE collectionsummary
+        SET count = count - 1, traded = traded - (OLD.trade_player_id IS NOT NULL)::integer
+        WHERE player_id = OLD.player_id AND ball_id = OLD.ball_id
+            AND COALESCE(special_id, 0) = COALESCE(OLD.special_id, 0)
+        RETURNING id, count INTO summary_id, remaining;
+        IF remaining <= 0 THEN
+            DELETE FROM collectionsummary WHERE id = summary_id;
+        END IF;
+        IF OLD.server_id IS NOT NULL THEN
+            UPDATE serversummary SET count = count - 1
+            WHERE player_id = OLD.player_id AND server_id = OLD.server_id
+            RETURNING id, count INTO summary_id, remaining;
+            IF remaining <= 0 THEN
+                DELETE FROM serversummary WHERE id = summary_id;
+            END IF;
+        END IF;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'INSERT') THEN
+        INSERT INTO collectionsummary (player_id, ball_id, special_id, count, traded)
+        VALUES (
+            NEW.player_id, NEW.ball_id, NEW.special_id, 1,
+            (NEW.trade_player_id IS NOT NULL)::integer
+        )
+        ON CONFLICT (player_id, ball_id, COALESCE(special_id, 0)) DO UPDATE
+        SET count = collectionsummary.count + 1,
+            traded = collectionsummary.traded + EXCLUDED.traded;
+        IF NEW.server_id IS NOT NULL THEN
+            INSERT INTO serversummary (player_id, server_id, count)
+            VALUES (NEW.player_id, NEW.server_id, 1)
+            ON CONFLICT (player_id, server_id) DO UPDATE
+            SET count = serversummary.count + 1;
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER ballinstance_summary
+AFTER INSERT OR DELETE OR UPDATE OF player_id, ball_id, special_id, trade_player_id, server_id
+ON ballinstance
+FOR EACH ROW EXECUTE FUNCTION ballinstance_summary();
+"""
+DROP_SUMMARY_TRIGGER = """
+DROP TRIGGER IF EXISTS ballinstance_summary ON ballinstance;
+DROP FUNCTION IF EXISTS ballinstance_summary();
+"""
+# frozen copy of `REBUILD_SUMMARIES_QUERY` from ballsdex.core.models as of this migration, later
+# changes to the summaries go to that query and a new migration, not here
+FILL_SUMMARIES = """
+INSERT INTO collectionsummary (player_id, ball_id, special_id, count, traded)
+SELECT player_id, ball_id, special_id, COUNT(*), COUNT(trade_player_id)
+FROM ballinstance GROUP BY player_id, ball_id, special_id;
+INSERT INTO serversummary (player_id, server_id, count)
+SELECT player_id, server_id, COUNT(*)
+FROM ballinstance WHERE server_id IS NOT NULL GROUP BY player_id, server_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bd_models", "0007_player_trade_cooldown_policy"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CollectionSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("player_id", models.BigIntegerField()),
+                ("ball_id", models.BigIntegerField()),
+                ("special_id", models.BigIntegerField(blank=True, null=True)),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "traded",
+                    models.IntegerField(
+                        default=0, help_text="Instances obtained from another player"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "collectionsummary",
+                "managed": True,
+                "constraints": [
+                    models.UniqueConstraint(
+                        models.F("player_id"),
+                        models.F("ball_id"),
+                        django.db.models.functions.comparison.Coalesce(
+                            "special_id", models.Value(0)
+                        ),
+                        name="collectionsummary_unique",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ServerSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("player_id", models.BigIntegerField()),
+                ("server_id", models.BigIntegerField()),
+                ("count", models.IntegerField(default=0)),
+            ],
+            options={
+                "db_table": "serversummary",
+                "managed": True,
+                "unique_together": {("player_id", "server_id")},
+            },
+        ),
+        migrations.RunSQL(SUMMARY_TRIGGER, DROP_SUMMARY_TRIGGER),
+        migrations.RunSQL(FILL_SUMMARIES, migrations.RunSQL.noop),
+    ]
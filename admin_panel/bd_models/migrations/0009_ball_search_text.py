@@ -0,0 +1,36 @@
+# Generated by Django 5.1.4 on 2026-10-16 12:00
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# The searchable text of a ball is generated by the database, so every writer keeps it in sync.
+# It isn't declared on the models since neither Django nor Tortoise can write it. The trigram
+# index serves "LIKE '%term%'" searches, which a B-tree index cannot.
+ADD_SEARCH_TEXT = """
+ALTER TABLE ball ADD COLUMN search_text text GENERATED ALWAYS AS (
+    lower(
+        country || ' ' || capacity_name || ' ' || capacity_description || ' ' || credits
+        || ' ' || COALESCE(catch_names, '') || ' ' || COALESCE(translations, '')
+    )
+) STORED;
+CREATE INDEX ball_search_text_trgm ON ball USING gin (search_text gin_trgm_ops);
+"""
+DROP_SEARCH_TEXT = """
+DROP INDEX IF EXISTS ball_search_text_trgm;
+ALTER TABLE ball DROP COLUMN IF EXISTS search_text;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bd_models", "0008_collectionsummary_serversummary"),
+    ]
+
+    operations = [
+        # pg_trgm is a trusted extension: a user without superuser rights needs the CREATE
+        # privilege on the database (PostgreSQL 13+), or a superuser must create it beforehand,
+        # in which case this is skipped
+        TrigramExtension(),
+        migrations.RunSQL(ADD_SEARCH_TEXT, DROP_SEARCH_TEXT),
+    ]
@@ -6,6 +6,7 @@ from typing import Any, Iterable, cast
 from django.contrib import admin
 from django.core.cache import cache
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.utils.safestring import SafeText, mark_safe
 from django.utils.timezone import now
 
@@ -334,6 +335,47 @@ class BallInstance(models.Model):
         verbose_name = f"{settings.collectible_name} instance"
 
 
+class CollectionSummary(models.Model):
+    """
+    Number of instances owned by a player for each ball and special. Maintained by a trigger on
+    the ballinstance table, see migration 0008.
+    """
+
+    player_id = models.BigIntegerField()
+    ball_id = models.BigIntegerField()
+    special_id = models.BigIntegerField(blank=True, null=True)
+    count = models.IntegerField(default=0)
+    traded = models.IntegerField(default=0, help_text="Instances obtained from another player")
+
+    class Meta:
+        managed = True
+        db_table = "collectionsummary"
+        constraints = [
+            models.UniqueConstraint(
+                "player_id",
+                "ball_id",
+                Coalesce("special_id", 0),
+                name="collectionsummary_unique",
+            )
+        ]
+
+
+class ServerSummary(models.Model):
+    """
+    Number of instances owned by a player for each server where they were caught. Maintained by
+    a trigger on the ballinstance table, see migration 0008.
+    """
+
+    player_id = models.BigIntegerField()
+    server_id = models.BigIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        managed = True
+        db_table = "serversummary"
+        unique_together = (("player_id", "server_id"),)
+
+
 class BlacklistedID(models.Model):
     discord_id = models.BigIntegerField(unique=True, help_text="Discord user ID")
     reason = models.TextField(blank=True, null=True)
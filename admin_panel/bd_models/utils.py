@@ -2,6 +2,7 @@ from typing import TYPE_CHECKING
 
 from django.core.paginator import Paginator
 from django.db import connection
+from django.db.models.expressions import RawSQL
 from django.http import HttpRequest
 from django.utils.functional import cached_property
 from nonrelated_inlines.admin import NonrelatedTabularInline
@@ -11,6 +12,26 @@ from .models import BlacklistHistory, Player
 if TYPE_CHECKING:
     from .models import GuildConfig
 
+# "search_text" is generated by the database and has a trigram index, see migration 0009
+BALL_SEARCH_QUERY = "SELECT id FROM ball WHERE search_text LIKE %s"
+# search_text contains the country, so the index still narrows the rows checked by the second
+# condition
+BALL_COUNTRY_SEARCH_QUERY = f"{BALL_SEARCH_QUERY} AND lower(country) LIKE %s"
+
+
+def search_balls(term: str, *, country_only: bool = False) -> RawSQL:
+    """
+    Return a subquery of the IDs of the balls with `term` in their name, capacity, credits,
+    catch names or translations, ignoring case. Use it with an ``__in`` filter.
+
+    If `country_only` is set, only the name of the balls is matched.
+    """
+    escaped = term.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    pattern = f"%{escaped}%"
+    if country_only:
+        return RawSQL(BALL_COUNTRY_SEARCH_QUERY, [pattern, pattern])
+    return RawSQL(BALL_SEARCH_QUERY, [pattern])
+
 
 class ApproxCountPaginator(Paginator):
     @cached_property
@@ -7,6 +7,7 @@ import math
 import time
 import types
 from datetime import datetime
+from pathlib import Path
 from typing import TYPE_CHECKING, Self, cast
 
 import aiohttp
@@ -25,6 +26,10 @@ from rich.table import Table
 
 from ballsdex.core.commands import Core
 from ballsdex.core.dev import Dev
+from ballsdex.core.image_generator.cache import card_cache
+from ballsdex.core.image_generator.image_gen import ARTWORK_SIZE, ICON_SIZE
+from ballsdex.core.image_generator.pool import RenderPool, RenderPoolBusy
+from ballsdex.core.image_generator.wild_cards import WildCardProfile, wild_card_store
 from ballsdex.core.metrics import PrometheusServer
 from ballsdex.core.models import (
     Ball,
@@ -38,6 +43,7 @@ from ballsdex.core.models import (
     regimes,
     specials,
 )
+from ballsdex.core.utils.sampling import spawn_sampler
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
@@ -176,6 +182,21 @@ class BallsDexBot(commands.AutoShardedBot):
         self.command_log: set[int] = set()
         self.locked_balls = TTLCache(maxsize=99999, ttl=60 * 30)
 
+        card_cache.configure(
+            settings.card_cache_memory_size * 1024 * 1024,
+            Path(settings.card_cache_path) if settings.card_cache_path else None,
+            settings.card_cache_disk_size * 1024 * 1024,
+        )
+        wild_card_store.configure(
+            settings.wild_cards_memory_size * 1024 * 1024,
+            WildCardProfile.from_options(settings.wild_card_profile),
+        )
+        self.render_pool = RenderPool(
+            settings.render_workers,
+            settings.render_queue_size,
+            settings.render_assets_size * 1024 * 1024,
+        )
+
         self.owner_ids: set[int]
 
     async def start_prometheus_server(self):
@@ -222,6 +243,7 @@ class BallsDexBot(commands.AutoShardedBot):
 
         balls.clear()
         for ball in await Ball.all():
+            ball.index_catch_names()
             balls[ball.pk] = ball
         table.add_row(settings.collectible_name.title() + "s", str(len(balls)))
 
@@ -240,6 +262,13 @@ class BallsDexBot(commands.AutoShardedBot):
             specials[special.pk] = special
         table.add_row("Special events", str(len(specials)))
 
+        spawn_sampler.rebuild()
+        card_cache.clear()
+        await self.render_pool.preload(self.list_card_assets())
+        await asyncio.get_running_loop().run_in_executor(
+            None, wild_card_store.refresh, self.list_wild_cards()
+        )
+
         self.blacklist = set()
         for blacklisted_id in await BlacklistedID.all().only("discord_id"):
             self.blacklist.add(blacklisted_id.discord_id)
@@ -371,6 +400,35 @@ class BallsDexBot(commands.AutoShardedBot):
             "is now operational![/green][/bold]\n"
         )
 
+    def list_card_assets(
+        self, media_path: str = "./admin_panel/media/"
+    ) -> list[tuple[str, tuple[int, int] | None]]:
+        """
+        List the media files used to draw cards, with the size they are fitted to, for preloading.
+        Shared assets come first, in case the memory budget doesn't fit everything.
+        """
+        assets: list[tuple[str, tuple[int, int] | None]] = []
+        assets.extend((media_path + x.background, None) for x in regimes.values())
+        assets.extend((media_path + x.icon, ICON_SIZE) for x in economies.values())
+        assets.extend((media_path + x.background, None) for x in specials.values() if x.background)
+        assets.extend(
+            (media_path + x.collection_card, ARTWORK_SIZE) for x in balls.values() if x.enabled
+        )
+        return assets
+
+    def list_wild_cards(self, media_path: str = "./admin_panel/media/") -> list[str]:
+        """
+        List the images sent when spawning, most likely to spawn first.
+        """
+        enabled = sorted(
+            (x for x in balls.values() if x.enabled), key=lambda x: x.rarity, reverse=True
+        )
+        return [media_path + x.wild_card for x in enabled]
+
+    async def close(self) -> None:
+        self.render_pool.stop()
+        await super().close()
+
     async def blacklist_check(self, interaction: discord.Interaction[Self]) -> bool:
         if interaction.user.id in self.blacklist:
             if interaction.type != discord.InteractionType.autocomplete:
@@ -497,6 +555,13 @@ class BallsDexBot(commands.AutoShardedBot):
                 )
                 return
 
+            if isinstance(error.original, RenderPoolBusy):
+                await send(
+                    "Too many cards are being generated at the moment, please retry in a few "
+                    "seconds."
+                )
+                return
+
             if isinstance(error.original, discord.InteractionResponded):
                 # most likely an interaction received twice (happens sometimes),
                 # or two instances are running on the same token.
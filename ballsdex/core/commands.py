@@ -8,7 +8,8 @@ from discord.ext import commands
 from tortoise import Tortoise
 
 from ballsdex.core.dev import pagify, send_interactive
-from ballsdex.core.models import Ball
+from ballsdex.core.image_generator.cache import card_cache
+from ballsdex.core.models import Ball, CollectionSummary
 from ballsdex.settings import settings
 
 log = logging.getLogger("ballsdex.core.commands")
@@ -95,9 +96,10 @@ class Core(commands.Cog):
         Reload the cache of database models.
 
         This is needed each time the database is updated, otherwise changes won't reflect until
-        next start.
+        next start. The cache of generated cards is also emptied.
         """
         await self.bot.load_cache()
+        card_cache.clear(disk=True)
         await ctx.message.add_reaction("✅")
 
     @commands.command()
@@ -112,6 +114,20 @@ class Core(commands.Cog):
         t2 = time.time()
         await ctx.send(f"Analyzed database in {round((t2 - t1) * 1000)}ms.")
 
+    @commands.command()
+    @commands.is_owner()
+    async def rebuildsummaries(self, ctx: commands.Context):
+        """
+        Recompute the collection summaries of all players from their countryballs.
+
+        They are kept up to date by the database, this is only needed if they went out of sync.
+        Catches and trades are blocked until this finishes.
+        """
+        t1 = time.time()
+        await CollectionSummary.rebuild()
+        t2 = time.time()
+        await ctx.send(f"Rebuilt collection summaries in {round((t2 - t1) * 1000)}ms.")
+
     @commands.command()
     @commands.is_owner()
     async def migrateemotes(self, ctx: commands.Context):
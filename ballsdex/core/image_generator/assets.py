@@ -0,0 +1,125 @@
+import logging
+import os
+import threading
+from typing import Callable, Iterable
+
+from cachetools import LRUCache
+from PIL import Image, ImageOps
+
+log = logging.getLogger("ballsdex.core.image_generator.assets")
+
+
+def _image_size(item: tuple[str, Image.Image]) -> int:
+    image = item[1]
+    return image.width * image.height * len(image.getbands())
+
+
+def _signature(path: str) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+class AssetStore:
+    """
+    Decoded media files used to draw cards, already converted to RGBA and fitted to the size they
+    are pasted at. This avoids decoding and resizing the same backgrounds, icons and artworks on
+    every card.
+
+    The store is bounded by the memory used by the decoded images, least recently used assets
+    are evicted first. Every lookup compares the modification time and size of the file with the
+    ones it was loaded with, so replacing a media file invalidates only that asset, in every
+    process using the store.
+
+    Returned images are shared, callers must copy them before drawing on them.
+
+    Attributes
+    ----------
+    images: cachetools.LRUCache[tuple[str, tuple[int, int] | None], tuple[str, Image.Image]]
+        Maps a path and a size to the signature of the file and its decoded image. Composed
+        images are stored with their key as path, no size and an empty signature.
+    """
+
+    def __init__(self, max_size: int = 0):
+        self.images: LRUCache[tuple[str, tuple[int, int] | None], tuple[str, Image.Image]] = (
+            LRUCache(maxsize=max_size, getsizeof=_image_size)
+        )
+        self.lock = threading.Lock()
+
+    def resize(self, max_size: int):
+        """
+        Change the memory budget of the store in bytes. This empties the store.
+        """
+        with self.lock:
+            self.images = LRUCache(maxsize=max_size, getsizeof=_image_size)
+
+    def _load(self, path: str, size: tuple[int, int] | None) -> Image.Image:
+        with Image.open(path) as file:
+            image = file.convert("RGBA")
+        if size is not None:
+            image = ImageOps.fit(image, size)
+        return image
+
+    def get(self, path: str, size: tuple[int, int] | None = None) -> Image.Image:
+        """
+        Return the decoded asset, fitted to the given size if any. The file is loaded if it's not
+        stored yet or if it changed since.
+
+        Raises
+        ------
+        OSError
+            The file cannot be read or decoded.
+        """
+        signature = _signature(path)
+        with self.lock:
+            item = self.images.get((path, size))
+        if item is not None and item[0] == signature:
+            return item[1]
+        image = self._load(path, size)
+        if _image_size((signature, image)) <= self.images.maxsize:
+            with self.lock:
+                self.images[(path, size)] = (signature, image)
+        return image
+
+    def get_composed(self, key: str, build: Callable[[], Image.Image]) -> Image.Image:
+        """
+        Return an image composed from other assets, calling `build` if it's not stored yet.
+        Composed images share the memory budget of the assets. Unlike files, they are not checked
+        for changes, the key must include every input used to build the image.
+        """
+        with self.lock:
+            item = self.images.get((key, None))
+        if item is not None:
+            return item[1]
+        image = build()
+        if _image_size(("", image)) <= self.images.maxsize:
+            with self.lock:
+                self.images[(key, None)] = ("", image)
+        return image
+
+    def preload(self, assets: Iterable[tuple[str, tuple[int, int] | None]]):
+        """
+        Load the given assets until the memory budget is full. Files that cannot be read are
+        skipped.
+        """
+        count = 0
+        for path, size in assets:
+            if self.images.currsize >= self.images.maxsize:
+                break
+            try:
+                self.get(path, size)
+            except OSError:
+                log.warning(f"Failed to preload card asset {path}", exc_info=True)
+                continue
+            count += 1
+        log.debug(f"Preloaded {count} card assets ({self.images.currsize} bytes).")
+
+
+asset_store = AssetStore(256 * 1024 * 1024)
+
+
+def preload_assets(max_size: int, assets: list[tuple[str, tuple[int, int] | None]]):
+    """
+    Configure and fill the store of the current process. Used to initialize render workers.
+    """
+    asset_store.resize(max_size)
+    asset_store.preload(assets)
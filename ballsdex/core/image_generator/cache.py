@@ -0,0 +1,154 @@
+import logging
+import os
+import threading
+from pathlib import Path
+
+from cachetools import LRUCache
+from prometheus_client import Counter
+
+log = logging.getLogger("ballsdex.core.image_generator.cache")
+card_cache_lookups = Counter(
+    "card_cache_lookups", "Lookups of the generated cards cache", ["result"]
+)
+
+
+class CardCache:
+    """
+    Content-addressed cache of encoded cards, split in two tiers: an in-memory LRU cache
+    bounded by the total size of the stored files, and an optional directory on disk.
+
+    Keys are obtained with `get_card_key`, which hashes every input used to draw a card. A
+    modified ball, special or media file produces a new key, so stale entries are never served,
+    they just stop being hit and get evicted.
+
+    This object is thread-safe, cards are usually generated in an executor.
+
+    Attributes
+    ----------
+    memory: cachetools.LRUCache[str, bytes]
+        The memory tier, mapping a card key to its encoded bytes.
+    path: Path | None
+        Directory of the disk tier, or `None` if disabled.
+    max_disk_size: int
+        Maximum size in bytes of the disk tier. Oldest files are removed past this size.
+    """
+
+    def __init__(
+        self, memory_size: int = 0, path: Path | None = None, max_disk_size: int = 0
+    ) -> None:
+        self.memory: LRUCache[str, bytes] = LRUCache(maxsize=memory_size, getsizeof=len)
+        self.path = path
+        self.max_disk_size = max_disk_size
+        self.disk_size = 0
+        self.lock = threading.Lock()
+
+    def configure(self, memory_size: int, path: Path | None, max_disk_size: int = 0):
+        """
+        Resize the cache and set the directory of the disk tier. This clears the memory tier.
+        """
+        with self.lock:
+            self.memory = LRUCache(maxsize=memory_size, getsizeof=len)
+            self.path = path
+            self.max_disk_size = max_disk_size
+            self.disk_size = 0
+            if path is not None:
+                path.mkdir(parents=True, exist_ok=True)
+                self.disk_size = sum(x.stat().st_size for x in path.glob("*/*") if x.is_file())
+
+    def _disk_path(self, key: str) -> Path:
+        assert self.path
+        return self.path / key[:2] / key
+
+    def get(self, key: str) -> bytes | None:
+        """
+        Return the encoded card for this key if cached, trying memory first and then disk.
+        Cards found on disk are promoted to the memory tier.
+        """
+        with self.lock:
+            data = self.memory.get(key)
+        if data is not None:
+            card_cache_lookups.labels(result="memory").inc()
+            return data
+        if self.path is not None:
+            try:
+                data = self._disk_path(key).read_bytes()
+            except FileNotFoundError:
+                pass
+            except OSError:
+                log.warning(f"Failed to read cached card {key}", exc_info=True)
+            else:
+                card_cache_lookups.labels(result="disk").inc()
+                self._set_memory(key, data)
+                return data
+        card_cache_lookups.labels(result="miss").inc()
+        return None
+
+    def _set_memory(self, key: str, data: bytes):
+        if len(data) > self.memory.maxsize:
+            return
+        with self.lock:
+            self.memory[key] = data
+
+    def set(self, key: str, data: bytes):
+        """
+        Store a newly generated card in both tiers.
+        """
+        self._set_memory(key, data)
+        if self.path is None:
+            return
+        file = self._disk_path(key)
+        try:
+            file.parent.mkdir(exist_ok=True)
+            # write to a temporary file first so that concurrent readers never see partial data
+            tmp = file.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, file)
+        except OSError:
+            log.warning(f"Failed to write cached card {key}", exc_info=True)
+            return
+        with self.lock:
+            self.disk_size += len(data)
+            prune = self.max_disk_size and self.disk_size > self.max_disk_size
+        if prune:
+            self.prune_disk()
+
+    def prune_disk(self):
+        """
+        Remove the oldest files of the disk tier until it is back under 90% of its maximum size.
+        """
+        if self.path is None:
+            return
+        files = [x for x in self.path.glob("*/*") if x.is_file()]
+        files.sort(key=lambda x: x.stat().st_mtime)
+        size = sum(x.stat().st_size for x in files)
+        target = self.max_disk_size * 0.9
+        for file in files:
+            if size <= target:
+                break
+            try:
+                file_size = file.stat().st_size
+                file.unlink()
+            except OSError:
+                continue
+            size -= file_size
+        with self.lock:
+            self.disk_size = size
+        log.debug(f"Pruned card cache on disk, now {size} bytes.")
+
+    def clear(self, *, disk: bool = False):
+        """
+        Empty the memory tier, and the disk tier if `disk` is `True`.
+        """
+        with self.lock:
+            self.memory.clear()
+        if disk and self.path is not None:
+            for file in self.path.glob("*/*"):
+                try:
+                    file.unlink()
+                except OSError:
+                    pass
+            with self.lock:
+                self.disk_size = 0
+
+
+card_cache = CardCache()
@@ -1,10 +1,14 @@
+import hashlib
 import os
 import textwrap
+from dataclasses import astuple, dataclass, replace
+from io import BytesIO
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
-from PIL import Image, ImageDraw, ImageFont, ImageOps
+from PIL import Image, ImageDraw, ImageFont
 
+from ballsdex.core.image_generator.assets import asset_store
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
@@ -20,6 +24,8 @@ RECTANGLE_HEIGHT = (HEIGHT // 5) * 2
 
 CORNERS = ((34, 261), (1393, 992))
 artwork_size = [b - a for a, b in zip(*CORNERS)]
+ARTWORK_SIZE: tuple[int, int] = tuple(artwork_size)  # type: ignore
+ICON_SIZE = (192, 192)
 
 # ===== TIP =====
 #
@@ -48,39 +54,150 @@ def get_credit_color(image: Image.Image, region: tuple) -> tuple:
     return (0, 0, 0, 255) if brightness > 100 else (255, 255, 255, 255)
 
 
-def draw_card(
-    ball_instance: "BallInstance",
-    media_path: str = "./admin_panel/media/",
-) -> tuple[Image.Image, dict[str, Any]]:
-    ball = ball_instance.countryball
-    ball_health = (237, 115, 101, 255)
-    ball_credits = ball.credits
+def _file_signature(path: str) -> str:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return f"{path}:missing"
+    return f"{path}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+@dataclass(frozen=True, slots=True)
+class CardData:
+    """
+    Every input used to draw a card, detached from the database models. This can be pickled and
+    sent to another process for rendering.
+
+    Paths are complete, the media directory is already prefixed.
+    """
+
+    title: str
+    capacity_name: str
+    capacity_description: str
+    credits: str
+    card_name: str
+    special_credits: str | None
+    rarity: float | None
+    health: int
+    attack: int
+    background: str
+    icon: str | None
+    artwork: str
+
+    @classmethod
+    def from_instance(
+        cls, ball_instance: "BallInstance", media_path: str = "./admin_panel/media/"
+    ) -> "CardData":
+        ball = ball_instance.countryball
+        card_name = ball.cached_regime.name
+        special_credits = None
+        if special_image := ball_instance.special_card:
+            card_name = getattr(ball_instance.specialcard, "name", card_name)
+            background = special_image
+            if ball_instance.specialcard:
+                special_credits = ball_instance.specialcard.credits
+        else:
+            background = ball.cached_regime.background
+        economy = ball.cached_economy
+        return cls(
+            title=ball.short_name or ball.country,
+            capacity_name=ball.capacity_name,
+            capacity_description=ball.capacity_description,
+            credits=ball.credits,
+            card_name=card_name,
+            special_credits=special_credits,
+            rarity=ball.rarity if settings.show_rarity else None,
+            health=ball_instance.health,
+            attack=ball_instance.attack,
+            background=media_path + background,
+            icon=media_path + economy.icon if economy else None,
+            artwork=media_path + ball.collection_card,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class RenderProfile:
+    """
+    How a generated card is encoded before being sent.
+
+    Attributes
+    ----------
+    format: str
+        Image format passed to Pillow: WEBP, PNG or JPEG.
+    quality: int
+        Encoding quality from 0 to 100, ignored for PNG.
+    method: int
+        WEBP encoding method from 0 (fast) to 6 (slow but smaller).
+    scale: float
+        Resize factor applied to the card before encoding, 1 to keep the full size.
+    """
+
+    format: str = "WEBP"
+    quality: int = 80
+    method: int = 4
+    scale: float = 1
+
+    @classmethod
+    def from_settings(cls, name: str = "default") -> "RenderProfile":
+        """
+        Return the profile configured in the settings, either "default" or "preview".
+        """
+        options = settings.render_preview_profile if name == "preview" else settings.render_profile
+        return cls(
+            format=str(options.get("format", "WEBP")).upper(),
+            quality=int(options.get("quality", 80)),
+            method=int(options.get("method", 4)),
+            scale=float(options.get("scale", 1)),
+        )
+
+    @property
+    def extension(self) -> str:
+        return "jpg" if self.format == "JPEG" else self.format.lower()
+
+
+def get_card_key(data: CardData, profile: RenderProfile | None = None) -> str:
+    """
+    Return a hash of every input used to draw this card, including the modification time of the
+    media files, and the encoding profile if given. Two cards sharing the same key are the exact
+    same image, this is used for caching the result.
+    """
+    inputs = [str(x) for x in astuple(data)]
+    if profile:
+        inputs += [str(x) for x in astuple(profile)]
+    inputs += [_file_signature(x) for x in (data.background, data.icon, data.artwork) if x]
+    return hashlib.sha256("\0".join(inputs).encode()).hexdigest()
+
+
+def get_base_key(data: CardData) -> str:
+    """
+    Return a hash of every input used to draw the base layer of this card, which is everything
+    but the stats. Cards of the same ball and background share the same base layer.
+    """
+    return get_card_key(replace(data, health=0, attack=0))
+
+
+def render_base(data: CardData) -> Image.Image:
+    """
+    Draw everything on the card that doesn't depend on the instance: background, texts, artwork
+    and icon. The stats are added on a copy with `draw_stats`.
+    """
     special_credits = ""
-    card_name = ball.cached_regime.name
-    if special_image := ball_instance.special_card:
-        card_name = getattr(ball_instance.specialcard, "name", card_name)
-        image = Image.open(media_path + special_image)
-        if ball_instance.specialcard and ball_instance.specialcard.credits:
-            special_credits += f" • Special Author: {ball_instance.specialcard.credits}"
-    else:
-        image = Image.open(media_path + ball.cached_regime.background)
-    image = image.convert("RGBA")
-    icon = (
-        Image.open(media_path + ball.cached_economy.icon).convert("RGBA")
-        if ball.cached_economy
-        else None
-    )
+    if data.special_credits:
+        special_credits += f" • Special Author: {data.special_credits}"
+    # assets are shared, only the background is copied as we draw on it
+    image = asset_store.get(data.background).copy()
+    icon = asset_store.get(data.icon, ICON_SIZE) if data.icon else None
 
     draw = ImageDraw.Draw(image)
     draw.text(
         (50, 20),
-        ball.short_name or ball.country,
+        data.title,
         font=title_font,
         stroke_width=2,
         stroke_fill=(0, 0, 0, 255),
     )
 
-    cap_name = textwrap.wrap(f"Ability: {ball.capacity_name}", width=26)
+    cap_name = textwrap.wrap(f"Ability: {data.capacity_name}", width=26)
 
     for i, line in enumerate(cap_name):
         draw.text(
@@ -91,7 +208,7 @@ def draw_card(
             stroke_width=2,
             stroke_fill=(0, 0, 0, 255),
         )
-    for i, line in enumerate(textwrap.wrap(ball.capacity_description, width=32)):
+    for i, line in enumerate(textwrap.wrap(data.capacity_description, width=32)):
         draw.text(
             (60, 1100 + 100 * len(cap_name) + 80 * i),
             line,
@@ -100,56 +217,99 @@ def draw_card(
             stroke_fill=(0, 0, 0, 255),
         )
 
-    draw.text(
-        (320, 1670),
-        str(ball_instance.health),
-        font=stats_font,
-        fill=ball_health,
-        stroke_width=1,
-        stroke_fill=(0, 0, 0, 255),
-    )
-    draw.text(
-        (1120, 1670),
-        str(ball_instance.attack),
-        font=stats_font,
-        fill=(252, 194, 76, 255),
-        stroke_width=1,
-        stroke_fill=(0, 0, 0, 255),
-        anchor="ra",
-    )
-    if settings.show_rarity:
+    if data.rarity is not None:
         draw.text(
             (1200, 50),
-            str(ball.rarity),
+            str(data.rarity),
             font=stats_font,
             stroke_width=2,
             stroke_fill=(0, 0, 0, 255),
         )
-    if card_name in credits_color_cache:
-        credits_color = credits_color_cache[card_name]
+    if data.card_name in credits_color_cache:
+        credits_color = credits_color_cache[data.card_name]
     else:
         credits_color = get_credit_color(
             image, (0, int(image.height * 0.8), image.width, image.height)
         )
-        credits_color_cache[card_name] = credits_color
+        credits_color_cache[data.card_name] = credits_color
     draw.text(
         (30, 1870),
         # Modifying the line below is breaking the licence as you are removing credits
         # If you don't want to receive a DMCA, just don't
-        f"Created by El Laggron{special_credits}\n" f"Artwork author: {ball_credits}",
+        f"Created by El Laggron{special_credits}\n" f"Artwork author: {data.credits}",
         font=credits_font,
         fill=credits_color,
         stroke_width=0,
         stroke_fill=(255, 255, 255, 255),
     )
 
-    artwork = Image.open(media_path + ball.collection_card).convert("RGBA")
-    image.paste(ImageOps.fit(artwork, artwork_size), CORNERS[0])  # type: ignore
+    image.paste(asset_store.get(data.artwork, ARTWORK_SIZE), CORNERS[0])
 
     if icon:
-        icon = ImageOps.fit(icon, (192, 192))
         image.paste(icon, (1200, 30), mask=icon)
-        icon.close()
-    artwork.close()
 
+    return image
+
+
+def draw_stats(image: Image.Image, data: CardData):
+    """
+    Draw the health and attack of the instance on a base layer.
+    """
+    ball_health = (237, 115, 101, 255)
+    draw = ImageDraw.Draw(image)
+    draw.text(
+        (320, 1670),
+        str(data.health),
+        font=stats_font,
+        fill=ball_health,
+        stroke_width=1,
+        stroke_fill=(0, 0, 0, 255),
+    )
+    draw.text(
+        (1120, 1670),
+        str(data.attack),
+        font=stats_font,
+        fill=(252, 194, 76, 255),
+        stroke_width=1,
+        stroke_fill=(0, 0, 0, 255),
+        anchor="ra",
+    )
+
+
+def render_card(data: CardData) -> tuple[Image.Image, dict[str, Any]]:
+    base = asset_store.get_composed(get_base_key(data), lambda: render_base(data))
+    image = base.copy()
+    draw_stats(image, data)
     return image, {"format": "WEBP"}
+
+
+def replace_image(original: Image.Image, new: Image.Image) -> Image.Image:
+    """
+    Close an image replaced by a converted copy, freeing its buffer without waiting for the
+    garbage collector.
+    """
+    original.close()
+    return new
+
+
+def encode_card(data: CardData, profile: RenderProfile) -> bytes:
+    """
+    Draw the card and encode it according to the profile.
+    """
+    image = render_card(data)[0]
+    if profile.scale != 1:
+        size = (round(image.width * profile.scale), round(image.height * profile.scale))
+        image = replace_image(image, image.resize(size, Image.Resampling.LANCZOS, reducing_gap=2))
+    if profile.format == "JPEG":
+        image = replace_image(image, image.convert("RGB"))
+    buffer = BytesIO()
+    image.save(buffer, format=profile.format, quality=profile.quality, method=profile.method)
+    image.close()
+    return buffer.getvalue()
+
+
+def draw_card(
+    ball_instance: "BallInstance",
+    media_path: str = "./admin_panel/media/",
+) -> tuple[Image.Image, dict[str, Any]]:
+    return render_card(CardData.from_instance(ball_instance, media_path))
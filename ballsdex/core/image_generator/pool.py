@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+from io import BytesIO
+
+from prometheus_client import Counter, Gauge, Histogram, Info
+
+from ballsdex.core.image_generator.assets import preload_assets
+from ballsdex.core.image_generator.cache import card_cache
+from ballsdex.core.image_generator.image_gen import (
+    CardData,
+    RenderProfile,
+    encode_card,
+    get_card_key,
+)
+
+log = logging.getLogger("ballsdex.core.image_generator.pool")
+
+render_duration = Histogram(
+    "card_render_duration", "Time spent generating a card inside a worker", ["profile"]
+)
+render_wait = Histogram(
+    "card_render_wait", "Time between the submission of a card and its result", ["profile"]
+)
+render_size = Histogram(
+    "card_render_size",
+    "Size in bytes of the encoded cards",
+    ["profile"],
+    buckets=[2**x for x in range(14, 23)],
+)
+render_profile = Info("card_render_profile", "Encoding settings of each profile", ["profile"])
+render_queue = Gauge("card_render_queue", "Number of cards waiting or being generated")
+render_rejected = Counter(
+    "card_render_rejected", "Number of cards refused because the render queue was full"
+)
+
+
+class RenderPoolBusy(Exception):
+    """
+    Raised when too many cards are already waiting to be generated. The user should retry later.
+    """
+
+
+def _render(data: CardData, profile: RenderProfile) -> tuple[bytes, float]:
+    # executed inside a worker, must stay at the top level of the module to be picklable
+    t1 = time.perf_counter()
+    content = encode_card(data, profile)
+    return content, time.perf_counter() - t1
+
+
+def _lookup(data: CardData, profile: RenderProfile) -> tuple[str, bytes | None]:
+    key = get_card_key(data, profile)
+    return key, card_cache.get(key)
+
+
+class RenderPool:
+    """
+    A long-lived pool of processes generating cards, owned by the bot.
+
+    Image generation holds the GIL for most of its runtime, running it in threads of the bot
+    process blocks the event loop. Cards are generated in separate processes instead, and the
+    number of pending cards is bounded: once `max_queue` is reached, `RenderPoolBusy` is raised
+    instead of piling up requests that would expire before being answered.
+
+    Attributes
+    ----------
+    workers: int
+        Number of processes. If 0, cards are generated in a single thread of the bot's process.
+    max_queue: int
+        Maximum number of cards waiting or being generated at the same time.
+    assets_size: int
+        Memory budget in bytes of the asset store of each worker.
+    assets: list[tuple[str, tuple[int, int] | None]]
+        Assets preloaded by each worker when it starts, see `AssetStore.preload`.
+    pending: int
+        Number of cards currently waiting or being generated.
+    """
+
+    def __init__(self, workers: int, max_queue: int, assets_size: int = 0):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.assets_size = assets_size
+        self.assets: list[tuple[str, tuple[int, int] | None]] = []
+        self.pending = 0
+        self.executor: Executor | None = None
+
+    def start(self):
+        for name in ("default", "preview"):
+            profile = RenderProfile.from_settings(name)
+            render_profile.labels(profile=name).info(
+                {k: str(v) for k, v in asdict(profile).items()}
+            )
+        if self.workers > 0:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=preload_assets,
+                initargs=(self.assets_size, self.assets),
+            )
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="card-render")
+        log.debug(f"Started card render pool with {self.workers} workers.")
+
+    def stop(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    async def preload(self, assets: list[tuple[str, tuple[int, int] | None]]):
+        """
+        Set the assets to preload and load them in the workers, starting the pool if needed.
+
+        Workers are processes with their own memory, so a new pool is started with the updated
+        list. The previous one finishes the cards it has already accepted in the background.
+        Nothing is done if the list didn't change, stored assets are already read again when
+        their file is modified.
+        """
+        if self.executor is not None and assets == self.assets:
+            return
+        self.assets = assets
+        old = self.executor
+        if self.workers == 0:
+            if old is None:
+                self.start()
+            await asyncio.get_running_loop().run_in_executor(
+                self.executor, preload_assets, self.assets_size, assets
+            )
+            return
+        # new workers preload the assets when they start
+        self.start()
+        if old is not None:
+            old.shutdown(wait=False)
+
+    async def render(self, data: CardData, profile: str = "default") -> tuple[BytesIO, str]:
+        """
+        Obtain the encoded card for the given data, from the cache if possible, otherwise
+        generated by a worker.
+
+        Parameters
+        ----------
+        data: CardData
+            The card to generate.
+        profile: str
+            The encoding profile from the settings, "default" or "preview".
+
+        Returns
+        -------
+        tuple[BytesIO, str]
+            The encoded card and its file extension.
+
+        Raises
+        ------
+        RenderPoolBusy
+            Too many cards are already waiting to be generated.
+        """
+        loop = asyncio.get_running_loop()
+        # cache lookups may hit the disk, keep them off the event loop
+        encoding = RenderProfile.from_settings(profile)
+        key, content = await loop.run_in_executor(None, _lookup, data, encoding)
+        if content is not None:
+            return BytesIO(content), encoding.extension
+
+        if self.pending >= self.max_queue:
+            render_rejected.inc()
+            raise RenderPoolBusy()
+        if self.executor is None:
+            self.start()
+
+        self.pending += 1
+        render_queue.set(self.pending)
+        t1 = time.perf_counter()
+        try:
+            content, duration = await loop.run_in_executor(self.executor, _render, data, encoding)
+        except BrokenProcessPool:
+            log.error("A card render worker died unexpectedly, restarting the pool.")
+            self.restart()
+            raise
+        finally:
+            self.pending -= 1
+            render_queue.set(self.pending)
+        render_duration.labels(profile=profile).observe(duration)
+        render_wait.labels(profile=profile).observe(time.perf_counter() - t1)
+        render_size.labels(profile=profile).observe(len(content))
+
+        await loop.run_in_executor(None, card_cache.set, key, content)
+        return BytesIO(content), encoding.extension
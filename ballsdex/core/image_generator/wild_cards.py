@@ -0,0 +1,182 @@
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any
+
+from cachetools import LRUCache
+from PIL import Image
+
+log = logging.getLogger("ballsdex.core.image_generator.wild_cards")
+
+
+def _entry_size(item: tuple[str, bytes, str]) -> int:
+    return len(item[1])
+
+
+def _signature(path: str) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+@dataclass(frozen=True, slots=True)
+class WildCardProfile:
+    """
+    How wild cards are recompressed before being kept in memory.
+
+    Attributes
+    ----------
+    format: str
+        Image format passed to Pillow: WEBP, PNG or JPEG.
+    quality: int
+        Encoding quality from 0 to 100, ignored for PNG.
+    method: int
+        WEBP encoding method from 0 (fast) to 6 (slow but smaller).
+    size: int | None
+        Maximum width and height in pixels, larger images are downscaled keeping their ratio.
+    """
+
+    format: str = "WEBP"
+    quality: int = 80
+    method: int = 4
+    size: int | None = None
+
+    @classmethod
+    def from_options(cls, options: dict[str, Any] | None) -> "WildCardProfile | None":
+        """
+        Build a profile from the "wild-card-profile" setting, `None` if the files must be sent
+        unchanged.
+        """
+        if not options:
+            return None
+        return cls(
+            format=str(options.get("format", "WEBP")).upper(),
+            quality=int(options.get("quality", 80)),
+            method=int(options.get("method", 4)),
+            size=int(options["size"]) if options.get("size") else None,
+        )
+
+    @property
+    def extension(self) -> str:
+        return "jpg" if self.format == "JPEG" else self.format.lower()
+
+
+class WildCardStore:
+    """
+    Bytes of the images sent when a countryball spawns, kept in memory to avoid reading the same
+    files from disk on every spawn. If a profile is set, images are recompressed once when
+    loaded instead of being sent as uploaded in the admin panel.
+
+    The store is bounded by the total size of the stored files, least recently spawned images
+    are evicted first and read again from disk when needed. Files are not checked for changes on
+    every spawn, `refresh` must be called when the cache of models is reloaded.
+
+    This object is thread-safe, files are loaded in an executor.
+
+    Attributes
+    ----------
+    files: cachetools.LRUCache[str, tuple[str, bytes, str]]
+        Maps the path of a wild card to the signature of the file, the bytes to upload and their
+        file extension.
+    profile: WildCardProfile | None
+        Recompression applied to the files, `None` to keep them unchanged.
+    """
+
+    def __init__(self, max_size: int = 0, profile: WildCardProfile | None = None):
+        self.files: LRUCache[str, tuple[str, bytes, str]] = LRUCache(
+            maxsize=max_size, getsizeof=_entry_size
+        )
+        self.profile = profile
+        self.lock = threading.Lock()
+
+    def configure(self, max_size: int, profile: WildCardProfile | None):
+        """
+        Change the memory budget in bytes and the recompression profile. This empties the store.
+        """
+        with self.lock:
+            self.files = LRUCache(maxsize=max_size, getsizeof=_entry_size)
+            self.profile = profile
+
+    def _load(self, path: str) -> tuple[bytes, str]:
+        if self.profile is None:
+            with open(path, "rb") as file:
+                return file.read(), path.split(".")[-1]
+        with Image.open(path) as image:
+            image.load()
+            if self.profile.format == "JPEG":
+                image = image.convert("RGB")
+            if self.profile.size:
+                image.thumbnail((self.profile.size, self.profile.size))
+            buffer = BytesIO()
+            image.save(
+                buffer,
+                format=self.profile.format,
+                quality=self.profile.quality,
+                method=self.profile.method,
+            )
+        return buffer.getvalue(), self.profile.extension
+
+    def _store(self, path: str, signature: str, content: bytes, extension: str):
+        if len(content) <= self.files.maxsize:
+            with self.lock:
+                self.files[path] = (signature, content, extension)
+
+    def peek(self, path: str) -> tuple[bytes, str] | None:
+        """
+        Return the bytes to upload for this wild card and their file extension if they're
+        stored, without reading the disk. Safe to call from the event loop.
+        """
+        with self.lock:
+            item = self.files.get(path)
+        if item is None:
+            return None
+        return item[1], item[2]
+
+    def get(self, path: str) -> tuple[bytes, str]:
+        """
+        Return the bytes to upload for this wild card and their file extension, read from the
+        disk if they're not stored. This blocks, call it in an executor.
+
+        Raises
+        ------
+        OSError
+            The file cannot be read or decoded.
+        """
+        with self.lock:
+            item = self.files.get(path)
+        if item is not None:
+            return item[1], item[2]
+        signature = _signature(path)
+        content, extension = self._load(path)
+        self._store(path, signature, content, extension)
+        return content, extension
+
+    def refresh(self, paths: list[str]):
+        """
+        Load the given wild cards until the memory budget is full. Files that did not change
+        since they were stored are kept as is, files that are not listed anymore are removed.
+        """
+        with self.lock:
+            previous = dict(self.files.items())
+            self.files.clear()
+        count = 0
+        for path in paths:
+            if self.files.currsize >= self.files.maxsize:
+                break
+            try:
+                signature = _signature(path)
+                item = previous.get(path)
+                if item is not None and item[0] == signature:
+                    content, extension = item[1], item[2]
+                else:
+                    content, extension = self._load(path)
+            except OSError:
+                log.warning(f"Failed to load wild card {path}", exc_info=True)
+                continue
+            self._store(path, signature, content, extension)
+            count += 1
+        log.debug(f"Loaded {count} wild cards ({self.files.currsize} bytes).")
+
+
+wild_card_store = WildCardStore(128 * 1024 * 1024)
@@ -8,6 +8,8 @@ from typing import TYPE_CHECKING
 from aiohttp import web
 from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
 
+from ballsdex.core.image_generator.cache import card_cache
+
 if TYPE_CHECKING:
     from ballsdex.core.bot import BallsDexBot
 
@@ -16,6 +18,37 @@ log = logging.getLogger("ballsdex.core.metrics")
 caught_balls = Counter(
     "caught_cb", "Caught countryballs", ["country", "special", "guild_size", "spawn_algo"]
 )
+spawn_tracked_guilds = Gauge("spawn_tracked_guilds", "Guilds tracked by the spawn manager")
+spawn_state_size = Gauge(
+    "spawn_state_size", "Estimated memory in bytes used by the spawn manager's guild state"
+)
+spawn_queue_depth = Gauge("spawn_queue_depth", "Number of spawns waiting to be sent")
+spawn_queue_wait = Histogram(
+    "spawn_queue_wait",
+    "Time between a spawn decision and its upload",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+spawn_upload_size = Histogram(
+    "spawn_upload_size",
+    "Size in bytes of the image uploaded with each spawn",
+    buckets=[2**x for x in range(12, 23)],
+)
+spawn_queue_dropped = Counter(
+    "spawn_queue_dropped", "Spawns that were decided but never sent", ["reason"]
+)
+player_cache_requests = Counter(
+    "player_cache_requests", "Lookups of players by Discord ID", ["result"]
+)
+instance_autocomplete_duration = Histogram(
+    "instance_autocomplete_duration",
+    "Time taken to list the countryballs matching an autocomplete search",
+    ["index"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+live_spawns = Gauge("live_spawns", "Spawned countryballs that can still be caught or clicked")
+live_spawns_size = Gauge(
+    "live_spawns_size", "Estimated memory in bytes used by the records of live spawns"
+)
 
 
 class PrometheusServer:
@@ -36,6 +69,9 @@ class PrometheusServer:
         self.app.add_routes((web.get("/metrics", self.get),))
 
         self.guild_count = Gauge("guilds", "Number of guilds the server is in", ["size"])
+        self.card_cache_size = Gauge(
+            "card_cache_size", "Size in bytes of the generated cards cache", ["tier"]
+        )
         self.shards_latecy = Histogram(
             "gateway_latency", "Shard latency with the Discord gateway", ["shard_id"]
         )
@@ -73,6 +109,9 @@ class PrometheusServer:
         for size, count in guilds.items():
             self.guild_count.labels(size=size).set(count)
 
+        self.card_cache_size.labels(tier="memory").set(card_cache.memory.currsize)
+        self.card_cache_size.labels(tier="disk").set(card_cache.disk_size)
+
         for shard_id, latency in self.bot.latencies:
             self.shards_latecy.labels(shard_id=shard_id).observe(latency)
 
@@ -1,18 +1,21 @@
 from __future__ import annotations
 
-from concurrent.futures import ThreadPoolExecutor
+import unicodedata
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import IntEnum
-from io import BytesIO
 from typing import TYPE_CHECKING, Iterable, Tuple, Type
 
 import discord
 from discord.utils import format_dt
 from tortoise import exceptions, fields, models, signals, timezone, validators
 from tortoise.contrib.postgres.indexes import PostgreSQLIndex
-from tortoise.expressions import Q
+from tortoise.transactions import in_transaction
 
-from ballsdex.core.image_generator.image_gen import draw_card
+from ballsdex.core.image_generator.cache import card_cache
+from ballsdex.core.image_generator.image_gen import CardData
+from ballsdex.core.utils.relations import relation_index
+from ballsdex.core.utils.search import instance_search
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
@@ -21,11 +24,47 @@ if TYPE_CHECKING:
     from ballsdex.core.bot import BallsDexBot
 
 
+# trade locks older than this are ignored
+LOCK_DURATION = timedelta(minutes=30)
+LOCK_QUERY = """
+UPDATE ballinstance SET locked = $1
+WHERE id = ANY($2::bigint[]) AND (locked IS NULL OR locked <= $3)
+RETURNING id
+"""
+
 balls: dict[int, Ball] = {}
 regimes: dict[int, Regime] = {}
 economies: dict[int, Economy] = {}
 specials: dict[int, Special] = {}
 
+# fancy quotes are folded into plain ones, mobile keyboards tend to insert them
+QUOTES_TABLE = str.maketrans(
+    {
+        "\u2018": "'",
+        "\u2019": "'",
+        "\u201a": "'",
+        "\u201b": "'",
+        "\u2032": "'",
+        "\u00b4": "'",
+        "\u0060": "'",
+        "\u201c": '"',
+        "\u201d": '"',
+        "\u201e": '"',
+        "\u201f": '"',
+        "\u2033": '"',
+        "\u00ab": '"',
+        "\u00bb": '"',
+    }
+)
+
+
+def normalize_name(text: str) -> str:
+    """
+    Normalize a name for comparison: Unicode compatibility normalization (NFKC), case folding,
+    quote folding and removal of enclosing blank characters.
+    """
+    return unicodedata.normalize("NFKC", text).casefold().translate(QUOTES_TABLE).strip()
+
 
 async def lower_catch_names(
     model: Type[Ball],
@@ -53,6 +92,16 @@ async def lower_translations(
         ).lower()
 
 
+async def index_catch_names(
+    model: Type[Ball],
+    instance: Ball,
+    created: bool,
+    using_db: "BaseDBAsyncClient | None" = None,
+    update_fields: Iterable[str] | None = None,
+):
+    instance.index_catch_names()
+
+
 class DiscordSnowflakeValidator(validators.Validator):
     def __call__(self, value: int):
         if not 17 <= len(str(value)) <= 19:
@@ -185,9 +234,31 @@ class Ball(models.Model):
 
     instances: fields.BackwardFKRelation[BallInstance]
 
+    _catch_names_index: frozenset[str] | None = None
+
     def __str__(self) -> str:
         return self.country
 
+    @property
+    def catch_names_index(self) -> frozenset[str]:
+        """
+        Every accepted name when catching this ball, normalized with `normalize_name`.
+        """
+        if self._catch_names_index is None:
+            self.index_catch_names()
+        return self._catch_names_index  # type: ignore
+
+    def index_catch_names(self):
+        """
+        Build `catch_names_index` from the name, catch names and translations.
+        """
+        names = [self.country]
+        if self.catch_names:
+            names.extend(self.catch_names.split(";"))
+        if self.translations:
+            names.extend(self.translations.split(";"))
+        self._catch_names_index = frozenset(filter(None, map(normalize_name, names)))
+
     @property
     def cached_regime(self) -> Regime:
         return regimes.get(self.regime_id, self.regime)
@@ -197,8 +268,19 @@ class Ball(models.Model):
         return economies.get(self.economy_id, self.economy)
 
 
+async def clear_card_cache(model: Type[models.Model], instance: models.Model, *args, **kwargs):
+    # cache keys are derived from the model's content, stale entries won't be served again,
+    # but there is no reason to keep them in memory
+    card_cache.clear()
+
+
 Ball.register_listener(signals.Signals.pre_save, lower_catch_names)
 Ball.register_listener(signals.Signals.pre_save, lower_translations)
+# must stay after the two listeners above
+Ball.register_listener(signals.Signals.pre_save, index_catch_names)
+for _model in (Ball, Regime, Economy, Special):
+    _model.register_listener(signals.Signals.post_save, clear_card_cache)
+    _model.register_listener(signals.Signals.post_delete, clear_card_cache)
 
 
 class BallInstance(models.Model):
@@ -329,16 +411,8 @@ class BallInstance(models.Model):
                     text = f"{emoji} {text}"
         return text
 
-    def draw_card(self) -> BytesIO:
-        image, kwargs = draw_card(self)
-        buffer = BytesIO()
-        image.save(buffer, **kwargs)
-        buffer.seek(0)
-        image.close()
-        return buffer
-
     async def prepare_for_message(
-        self, interaction: discord.Interaction["BallsDexBot"]
+        self, interaction: discord.Interaction["BallsDexBot"], *, preview: bool = False
     ) -> Tuple[str, discord.File, discord.ui.View]:
         # message content
         trade_content = ""
@@ -375,25 +449,175 @@ class BallInstance(models.Model):
             f"HP: {self.health} ({self.health_bonus:+d}%)"
         )
 
-        # draw image
-        with ThreadPoolExecutor() as pool:
-            buffer = await interaction.client.loop.run_in_executor(pool, self.draw_card)
+        # draw image, this may raise RenderPoolBusy
+        buffer, extension = await interaction.client.render_pool.render(
+            CardData.from_instance(self), "preview" if preview else "default"
+        )
 
         view = discord.ui.View()
-        return content, discord.File(buffer, "card.webp"), view
+        return content, discord.File(buffer, f"card.{extension}"), view
 
     async def lock_for_trade(self):
         self.locked = timezone.now()
         await self.save(update_fields=("locked",))
+        instance_search.set_locked((self.pk,), self.locked)
 
     async def unlock(self):
         self.locked = None  # type: ignore
         await self.save(update_fields=("locked",))
+        instance_search.set_locked((self.pk,), None)
 
     async def is_locked(self):
         await self.refresh_from_db(fields=("locked",))
         self.locked
-        return self.locked is not None and (self.locked + timedelta(minutes=30)) > timezone.now()
+        return self.locked is not None and (self.locked + LOCK_DURATION) > timezone.now()
+
+    @classmethod
+    async def lock_many(cls, ids: Iterable[int]) -> set[int]:
+        """
+        Lock instances for a trade with a single query. Instances that are already locked are
+        left as is, their IDs are returned so the caller can report them, and unlock the
+        others with `unlock_many` if the operation must be cancelled.
+
+        Parameters
+        ----------
+        ids: Iterable[int]
+            Primary keys of the instances to lock.
+
+        Returns
+        -------
+        set[int]
+            The IDs that were already locked (or do not exist).
+        """
+        ids = set(ids)
+        if not ids:
+            return set()
+        now = timezone.now()
+        rows = await cls._meta.db.execute_query_dict(
+            LOCK_QUERY, [now, list(ids), now - LOCK_DURATION]
+        )
+        locked = {row["id"] for row in rows}
+        instance_search.set_locked(locked, now)
+        return ids - locked
+
+    @classmethod
+    async def unlock_many(cls, ids: Iterable[int]):
+        """
+        Unlock instances with a single query.
+        """
+        ids = set(ids)
+        if ids:
+            await cls.filter(id__in=ids).update(locked=None)
+            instance_search.set_locked(ids, None)
+
+
+# the single definition used by `CollectionSummary.rebuild` and the "rebuildsummaries" command
+# of the admin panel, the backfill of migration 0008 is a frozen copy that must not follow it
+REBUILD_SUMMARIES_QUERY = """
+LOCK TABLE ballinstance IN SHARE MODE;
+TRUNCATE collectionsummary, serversummary;
+INSERT INTO collectionsummary (player_id, ball_id, special_id, count, traded)
+SELECT player_id, ball_id, special_id, COUNT(*), COUNT(trade_player_id)
+FROM ballinstance GROUP BY player_id, ball_id, special_id;
+INSERT INTO serversummary (player_id, server_id, count)
+SELECT player_id, server_id, COUNT(*)
+FROM ballinstance WHERE server_id IS NOT NULL GROUP BY player_id, server_id;
+"""
+
+
+@dataclass
+class CollectionTotals:
+    """
+    What a player owns, read from `CollectionSummary`.
+
+    Attributes
+    ----------
+    total: int
+        Number of instances owned.
+    traded: int
+        Number of instances obtained from another player.
+    by_ball: dict[int, int]
+        Maps a ball ID to the number of instances owned.
+    by_special: dict[int, int]
+        Maps a special ID to the number of instances owned.
+    """
+
+    total: int = 0
+    traded: int = 0
+    by_ball: dict[int, int] = field(default_factory=dict)
+    by_special: dict[int, int] = field(default_factory=dict)
+
+    @property
+    def caught(self) -> int:
+        return self.total - self.traded
+
+    @property
+    def special_total(self) -> int:
+        return sum(self.by_special.values())
+
+
+class CollectionSummary(models.Model):
+    """
+    Number of instances owned by a player for each ball and special.
+
+    This table and `ServerSummary` are maintained by a trigger on `ballinstance`, they must not
+    be written by the bot, except to rebuild them.
+    """
+
+    player_id = fields.BigIntField()
+    ball_id = fields.BigIntField()
+    special_id = fields.BigIntField(null=True)
+    count = fields.IntField(default=0)
+    traded = fields.IntField(default=0, description="Instances obtained from another player")
+
+    @classmethod
+    async def totals(
+        cls,
+        player: Player,
+        *,
+        ball: Ball | None = None,
+        special: Special | None = None,
+    ) -> CollectionTotals:
+        """
+        Sum the summary rows of a player, optionally for a single ball or special.
+        """
+        query = cls.filter(player_id=player.pk)
+        if ball:
+            query = query.filter(ball_id=ball.pk)
+        if special:
+            query = query.filter(special_id=special.pk)
+        totals = CollectionTotals()
+        for ball_id, special_id, count, traded in await query.values_list(
+            "ball_id", "special_id", "count", "traded"
+        ):
+            totals.total += count
+            totals.traded += traded
+            totals.by_ball[ball_id] = totals.by_ball.get(ball_id, 0) + count
+            if special_id is not None:
+                totals.by_special[special_id] = totals.by_special.get(special_id, 0) + count
+        return totals
+
+    @classmethod
+    async def rebuild(cls):
+        """
+        Recompute the summaries from the `ballinstance` table, in case they went out of sync.
+        Writes to `ballinstance` are blocked meanwhile.
+        """
+        async with in_transaction() as connection:
+            await connection.execute_script(REBUILD_SUMMARIES_QUERY)
+
+
+class ServerSummary(models.Model):
+    """
+    Number of instances owned by a player for each server where they were caught.
+    """
+
+    player_id = fields.BigIntField()
+    server_id = fields.BigIntField()
+    count = fields.IntField(default=0)
+
+    class Meta:
+        unique_together = ("player_id", "server_id")
 
 
 class DonationPolicy(IntEnum):
@@ -461,13 +685,13 @@ class Player(models.Model):
         return str(self.discord_id)
 
     async def is_friend(self, other_player: "Player") -> bool:
-        return await Friendship.filter(
-            (Q(player1=self) & Q(player2=other_player))
-            | (Q(player1=other_player) & Q(player2=self))
-        ).exists()
+        return other_player.pk in (await relation_index.get(self.pk)).friends
 
     async def is_blocked(self, other_player: "Player") -> bool:
-        return await Block.filter((Q(player1=self) & Q(player2=other_player))).exists()
+        """
+        Whether this player blocked the other one.
+        """
+        return other_player.pk in (await relation_index.get(self.pk)).blocked
 
     @property
     def can_be_mentioned(self) -> bool:
@@ -516,6 +740,12 @@ class BlacklistHistory(models.Model):
     action_type = fields.CharField(max_length=64, default="blacklist")
 
 
+class OwnershipError(Exception):
+    """
+    A countryball was not owned by the expected player anymore when transferring it.
+    """
+
+
 class Trade(models.Model):
     id: int
     player1: fields.ForeignKeyRelation[Player] = fields.ForeignKeyField(
@@ -536,6 +766,80 @@ class Trade(models.Model):
             PostgreSQLIndex(fields=("player2_id",)),
         ]
 
+    @classmethod
+    async def transfer(
+        cls,
+        player1: Player,
+        player2: Player,
+        proposal1: list[BallInstance],
+        proposal2: list[BallInstance],
+    ) -> Trade:
+        """
+        Exchange countryballs between two players and record the trade. This runs in a single
+        transaction with a constant number of queries, whatever the number of countryballs.
+
+        Ownership is checked on the rows being updated, so an instance given away concurrently
+        cancels the whole trade. The given instances are updated in place: new owner, previous
+        owner in `trade_player`, removed from favorites and unlocked.
+
+        Parameters
+        ----------
+        player1: Player
+            The first player, giving `proposal1`.
+        player2: Player
+            The second player, giving `proposal2`.
+        proposal1: list[BallInstance]
+            The instances given by `player1` to `player2`.
+        proposal2: list[BallInstance]
+            The instances given by `player2` to `player1`.
+
+        Returns
+        -------
+        Trade
+            The created trade.
+
+        Raises
+        ------
+        OwnershipError
+            One of the instances is not owned by its giver anymore. Nothing was changed.
+        """
+        sides = ((player1, player2, proposal1), (player2, player1, proposal2))
+        async with in_transaction() as connection:
+            trade = await cls.create(player1=player1, player2=player2, using_db=connection)
+            for giver, receiver, proposal in sides:
+                if not proposal:
+                    continue
+                ids = {x.pk for x in proposal}
+                updated = (
+                    await BallInstance.filter(id__in=ids, player_id=giver.pk)
+                    .using_db(connection)
+                    .update(
+                        player_id=receiver.pk,
+                        trade_player_id=giver.pk,
+                        favorite=False,
+                        locked=None,
+                    )
+                )
+                if updated != len(ids):
+                    raise OwnershipError(
+                        f"{len(ids) - updated} countryballs are not owned by {giver} anymore"
+                    )
+            await TradeObject.bulk_create(
+                [
+                    TradeObject(trade=trade, ballinstance=instance, player=giver)
+                    for giver, _, proposal in sides
+                    for instance in proposal
+                ],
+                using_db=connection,
+            )
+        for giver, receiver, proposal in sides:
+            for instance in proposal:
+                instance.player = receiver
+                instance.trade_player = giver
+                instance.favorite = False
+                instance.locked = None  # type: ignore
+        return trade
+
 
 class TradeObject(models.Model):
     trade_id: int
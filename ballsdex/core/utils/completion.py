@@ -0,0 +1,131 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from cachetools import TTLCache
+from tortoise import Tortoise
+
+from ballsdex.core.utils.indexes import PlayerIndex
+
+log = logging.getLogger("ballsdex.core.utils.completion")
+
+LOAD_QUERY = """
+SELECT DISTINCT ball_id, special_id, trade_player_id IS NULL AS self_caught
+FROM ballinstance WHERE player_id = $1
+"""
+
+
+def ids_to_bits(ids: Iterable[int]) -> int:
+    """
+    Build a bitset where the bit at index N is set if N is in `ids`.
+    """
+    bits = 0
+    for x in ids:
+        bits |= 1 << x
+    return bits
+
+
+def bits_to_ids(bits: int) -> set[int]:
+    """
+    Return the indexes of the bits set in `bits`.
+    """
+    ids: set[int] = set()
+    while bits:
+        lowest = bits & -bits
+        ids.add(lowest.bit_length() - 1)
+        bits ^= lowest
+    return ids
+
+
+@dataclass(slots=True)
+class PlayerCompletion:
+    """
+    The countryballs owned by a player, as bitsets indexed by ball ID. Disabled balls are
+    included, mask them with `ids_to_bits` of the enabled balls when reading.
+
+    Attributes
+    ----------
+    owned: int
+        Balls owned by the player.
+    self_caught: int
+        Balls owned by the player, with at least one instance caught by themselves.
+    traded: int
+        Balls owned by the player, with at least one instance obtained from someone else.
+    specials: dict[int, int]
+        Maps a special ID to the balls owned by the player with that special.
+    """
+
+    owned: int = 0
+    self_caught: int = 0
+    traded: int = 0
+    specials: dict[int, int] = field(default_factory=dict)
+
+    def add(self, ball_id: int, special_id: int | None = None, traded: bool = False):
+        bit = 1 << ball_id
+        self.owned |= bit
+        if traded:
+            self.traded |= bit
+        else:
+            self.self_caught |= bit
+        if special_id is not None:
+            self.specials[special_id] = self.specials.get(special_id, 0) | bit
+
+    def has(self, ball_id: int) -> bool:
+        return bool(self.owned >> ball_id & 1)
+
+    def bits(self, special_id: int | None = None, self_caught: bool | None = None) -> int | None:
+        """
+        Return the bitset of owned balls with the given filters, or `None` if the combination
+        of filters is not indexed and must be queried.
+        """
+        if special_id is not None:
+            if self_caught is not None:
+                return None
+            return self.specials.get(special_id, 0)
+        if self_caught is True:
+            return self.self_caught
+        if self_caught is False:
+            return self.traded
+        return self.owned
+
+
+class CompletionIndex(PlayerIndex[PlayerCompletion]):
+    """
+    The completion of the most active players, loaded from the database on demand and kept up
+    to date when they obtain countryballs.
+
+    Losing a countryball doesn't always remove it from the completion, since the player may own
+    other instances. Entries of players who lost a countryball (trade, donation, deletion) must
+    be invalidated instead, they are loaded again on the next read.
+
+    Entries are kept for `ttl` seconds, which bounds how long a change made outside of the bot
+    (like in the admin panel) takes to be seen.
+
+    Attributes
+    ----------
+    entries: cachetools.TTLCache[int, PlayerCompletion]
+        Maps a player's primary key to their completion, least recently read players are
+        evicted first.
+    """
+
+    def __init__(self, max_players: int = 10000, ttl: float = 300):
+        super().__init__(TTLCache(maxsize=max_players, ttl=ttl))
+
+    async def _load(self, player_id: int) -> PlayerCompletion:
+        completion = PlayerCompletion()
+        connection = Tortoise.get_connection("default")
+        for row in await connection.execute_query_dict(LOAD_QUERY, [player_id]):
+            completion.add(row["ball_id"], row["special_id"], not row["self_caught"])
+        return completion
+
+    def add(
+        self, player_id: int, ball_id: int, special_id: int | None = None, traded: bool = False
+    ):
+        """
+        Register a countryball obtained by a player. Nothing is done if the player isn't loaded.
+        """
+        if completion := self._touch(player_id):
+            completion.add(ball_id, special_id, traded)
+
+
+completion_index = CompletionIndex()
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+from typing import Generic, TypeVar
+
+from cachetools import Cache
+
+log = logging.getLogger("ballsdex.core.utils.indexes")
+
+T = TypeVar("T")
+
+
+class PlayerIndex(Generic[T]):
+    """
+    Base class of the in-memory indexes of player data, loaded from the database on demand.
+
+    A single load runs at a time for each player, concurrent readers await the same result.
+    A change registered while a load is running may be missing from its result, so that load
+    is detached: it still answers the readers already waiting for it, but its result isn't
+    stored and the next reader starts a new load.
+
+    Subclasses implement `_load` and must call `_touch` before applying a change to an entry.
+
+    Attributes
+    ----------
+    entries: cachetools.Cache[int, T]
+        Maps a player's primary key to their data.
+    loads: dict[int, asyncio.Task[T]]
+        The running load of each player, if its result may be stored.
+    """
+
+    def __init__(self, entries: Cache):
+        self.entries: Cache[int, T] = entries
+        self.loads: dict[int, asyncio.Task[T]] = {}
+
+    def __contains__(self, player_id: int) -> bool:
+        return player_id in self.entries
+
+    async def _load(self, player_id: int) -> T:
+        raise NotImplementedError
+
+    async def _load_and_store(self, player_id: int) -> T:
+        task = asyncio.current_task()
+        try:
+            value = await self._load(player_id)
+        finally:
+            current = self.loads.get(player_id) is task
+            if current:
+                del self.loads[player_id]
+        if current:
+            self.entries[player_id] = value
+        return value
+
+    async def get(self, player_id: int) -> T:
+        """
+        Return the data of a player, loaded from the database if needed.
+        """
+        value = self.entries.get(player_id)
+        if value is not None:
+            return value
+        task = self.loads.get(player_id)
+        if task is None:
+            task = asyncio.create_task(self._load_and_store(player_id))
+            self.loads[player_id] = task
+        # a cancelled reader must not cancel the load awaited by the others
+        return await asyncio.shield(task)
+
+    def peek(self, player_id: int) -> T | None:
+        """
+        Return the data of a player if it is loaded, without querying the database.
+        """
+        return self.entries.get(player_id)
+
+    def _touch(self, player_id: int) -> T | None:
+        """
+        Detach the running load of a player that is about to change, and return their entry if
+        it is loaded.
+        """
+        self.loads.pop(player_id, None)
+        return self.entries.get(player_id)
+
+    def invalidate(self, *player_ids: int):
+        """
+        Forget the data of players, it is loaded again on the next read.
+        """
+        for player_id in player_ids:
+            self.loads.pop(player_id, None)
+            self.entries.pop(player_id, None)
+
+    def clear(self):
+        self.entries.clear()
+        self.loads.clear()
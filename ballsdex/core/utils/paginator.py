@@ -8,6 +8,7 @@ from typing import TYPE_CHECKING, Any, Dict, Optional
 import discord
 from discord.ext.commands import Paginator as CommandPaginator
 
+from ballsdex.core.image_generator.pool import RenderPoolBusy
 from ballsdex.core.utils import menus
 
 if TYPE_CHECKING:
@@ -176,13 +177,17 @@ class Pages(discord.ui.View):
         error: Exception,
         item: discord.ui.Item,
     ) -> None:
-        log.error("Error on pagination", exc_info=error)
+        if isinstance(error, RenderPoolBusy):
+            message = (
+                "Too many cards are being generated at the moment, please retry in a few seconds."
+            )
+        else:
+            log.error("Error on pagination", exc_info=error)
+            message = "An unknown error occurred, sorry"
         if interaction.response.is_done():
-            await interaction.followup.send("An unknown error occurred, sorry", ephemeral=True)
+            await interaction.followup.send(message, ephemeral=True)
         else:
-            await interaction.response.send_message(
-                "An unknown error occurred, sorry", ephemeral=True
-            )
+            await interaction.response.send_message(message, ephemeral=True)
 
     async def start(self, *, content: Optional[str] = None, ephemeral: bool = False) -> None:
         if (
@@ -0,0 +1,104 @@
+import logging
+
+from cachetools import TTLCache
+from tortoise.exceptions import DoesNotExist
+
+from ballsdex.core.metrics import player_cache_requests
+from ballsdex.core.models import Player
+
+log = logging.getLogger("ballsdex.core.utils.players")
+
+
+class PlayerCache:
+    """
+    The `Player` rows of recently active users, keyed by Discord ID.
+
+    Players rarely change their settings, but their row is read by almost every command. Rows
+    are kept for `ttl` seconds, which bounds how long a change made outside of the bot (like in
+    the admin panel) takes to be seen. Changes made by the bot must go through `put` or
+    `invalidate`.
+
+    The same object is returned to every caller until it expires, so changes made to it are
+    seen by the others even before being saved.
+
+    Attributes
+    ----------
+    players: cachetools.TTLCache[int, Player]
+        Maps a Discord ID to the player model.
+    """
+
+    def __init__(self, max_size: int = 20000, ttl: float = 300):
+        self.players: TTLCache[int, Player] = TTLCache(maxsize=max_size, ttl=ttl)
+
+    async def get(
+        self, discord_id: int, *, create: bool = True, bypass_cache: bool = False
+    ) -> Player:
+        """
+        Return the player with the given Discord ID.
+
+        Parameters
+        ----------
+        discord_id: int
+            The Discord ID of the user.
+        create: bool
+            Create the player if it doesn't exist yet.
+        bypass_cache: bool
+            Read the row from the database even if it is cached, and cache the fresh row. Use
+            this for staff tools that must see the latest data.
+
+        Raises
+        ------
+        tortoise.exceptions.DoesNotExist
+            `create` is `False` and the player doesn't exist.
+        """
+        if not bypass_cache:
+            player = self.players.get(discord_id)
+            if player is not None:
+                player_cache_requests.labels(result="hit").inc()
+                return player
+            player_cache_requests.labels(result="miss").inc()
+        else:
+            player_cache_requests.labels(result="bypass").inc()
+        if create:
+            player, _ = await Player.get_or_create(discord_id=discord_id)
+        else:
+            player = await Player.get(discord_id=discord_id)
+        self.players[discord_id] = player
+        return player
+
+    def put(self, player: Player):
+        """
+        Store a player that was just saved.
+        """
+        self.players[player.discord_id] = player
+
+    def invalidate(self, discord_id: int):
+        """
+        Forget a player, after it was deleted or modified without its model.
+        """
+        self.players.pop(discord_id, None)
+
+
+player_cache = PlayerCache()
+
+
+async def get_player(
+    discord_id: int, *, create: bool = True, bypass_cache: bool = False
+) -> Player:
+    """
+    Return the player with the given Discord ID, from the cache if possible. This should be used
+    instead of querying `Player` by Discord ID.
+
+    See `PlayerCache.get` for the parameters.
+    """
+    return await player_cache.get(discord_id, create=create, bypass_cache=bypass_cache)
+
+
+async def get_player_or_none(discord_id: int, *, bypass_cache: bool = False) -> Player | None:
+    """
+    Return the player with the given Discord ID, or `None` if they never used the bot.
+    """
+    try:
+        return await player_cache.get(discord_id, create=False, bypass_cache=bypass_cache)
+    except DoesNotExist:
+        return None
@@ -0,0 +1,124 @@
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from cachetools import LRUCache
+from tortoise import Tortoise
+
+from ballsdex.core.utils.indexes import PlayerIndex
+
+if TYPE_CHECKING:
+    from ballsdex.core.models import Player
+
+log = logging.getLogger("ballsdex.core.utils.relations")
+
+FRIENDS_QUERY = """
+SELECT p.id, p.discord_id, f.since FROM friendship f
+JOIN player p ON p.id = CASE WHEN f.player1_id = $1 THEN f.player2_id ELSE f.player1_id END
+WHERE f.player1_id = $1 OR f.player2_id = $1
+ORDER BY f.since
+"""
+BLOCKS_QUERY = """
+SELECT p.id, p.discord_id, b.date AS since FROM block b
+JOIN player p ON p.id = b.player2_id
+WHERE b.player1_id = $1
+ORDER BY b.date
+"""
+
+
+@dataclass(slots=True)
+class Relation:
+    """
+    The other side of a friendship or a block.
+
+    Attributes
+    ----------
+    discord_id: int
+        Discord ID of the other player.
+    since: datetime
+        When the friendship or the block was created.
+    """
+
+    discord_id: int
+    since: datetime
+
+
+@dataclass(slots=True)
+class PlayerRelations:
+    """
+    The friends of a player and the players they blocked.
+
+    Attributes
+    ----------
+    friends: dict[int, Relation]
+        Maps the primary key of a friend to the friendship, from the oldest to the newest.
+    blocked: dict[int, Relation]
+        Maps the primary key of a player blocked by this one to the block, from the oldest to the
+        newest. Players who blocked this one are not included.
+    """
+
+    friends: dict[int, Relation] = field(default_factory=dict)
+    blocked: dict[int, Relation] = field(default_factory=dict)
+
+
+class RelationIndex(PlayerIndex[PlayerRelations]):
+    """
+    The friendships and blocks of the most active players, loaded from the database on demand.
+
+    The index is not aware of changes made outside of the bot, all changes made by the bot must
+    be registered with the methods below after being saved.
+
+    Attributes
+    ----------
+    entries: cachetools.LRUCache[int, PlayerRelations]
+        Maps a player's primary key to their relations, least recently read players are evicted
+        first.
+    """
+
+    def __init__(self, max_players: int = 10000):
+        super().__init__(LRUCache(maxsize=max_players))
+
+    async def _load(self, player_id: int) -> PlayerRelations:
+        relations = PlayerRelations()
+        connection = Tortoise.get_connection("default")
+        for row in await connection.execute_query_dict(FRIENDS_QUERY, [player_id]):
+            relations.friends[row["id"]] = Relation(row["discord_id"], row["since"])
+        for row in await connection.execute_query_dict(BLOCKS_QUERY, [player_id]):
+            relations.blocked[row["id"]] = Relation(row["discord_id"], row["since"])
+        return relations
+
+    def add_friend(self, player1: "Player", player2: "Player", since: datetime):
+        """
+        Register a friendship between two players.
+        """
+        if relations := self._touch(player1.pk):
+            relations.friends[player2.pk] = Relation(player2.discord_id, since)
+        if relations := self._touch(player2.pk):
+            relations.friends[player1.pk] = Relation(player1.discord_id, since)
+
+    def remove_friend(self, player1: "Player", player2: "Player"):
+        """
+        Register the end of a friendship between two players.
+        """
+        if relations := self._touch(player1.pk):
+            relations.friends.pop(player2.pk, None)
+        if relations := self._touch(player2.pk):
+            relations.friends.pop(player1.pk, None)
+
+    def add_block(self, player: "Player", blocked: "Player", since: datetime):
+        """
+        Register a player blocking another one.
+        """
+        if relations := self._touch(player.pk):
+            relations.blocked[blocked.pk] = Relation(blocked.discord_id, since)
+
+    def remove_block(self, player: "Player", blocked: "Player"):
+        """
+        Register a player unblocking another one.
+        """
+        if relations := self._touch(player.pk):
+            relations.blocked.pop(blocked.pk, None)
+
+
+relation_index = RelationIndex()
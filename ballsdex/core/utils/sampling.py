@@ -0,0 +1,161 @@
+import logging
+import random
+from datetime import datetime
+from typing import Generic, Sequence, TypeVar
+
+from tortoise.timezone import now as tortoise_now
+
+from ballsdex.core.models import Ball, Special, balls, specials
+
+log = logging.getLogger("ballsdex.core.utils.sampling")
+
+T = TypeVar("T")
+
+
+class AliasTable(Generic[T]):
+    """
+    Weighted random sampling in constant time, using Vose's alias method.
+
+    Building the table is O(n), then each draw costs one random index and one random float,
+    regardless of the size of the population. Draws follow the same distribution as
+    `random.choices(population, weights)`.
+
+    Parameters
+    ----------
+    population: Sequence[T]
+        The items to pick from.
+    weights: Sequence[float]
+        The relative weight of each item. Must be positive with a sum greater than 0.
+
+    Raises
+    ------
+    ValueError
+        The population is empty or the weights are invalid.
+    """
+
+    __slots__ = ("population", "probabilities", "aliases")
+
+    def __init__(self, population: Sequence[T], weights: Sequence[float]):
+        if len(population) != len(weights):
+            raise ValueError("The number of weights does not match the population")
+        total = sum(weights)
+        if not population or total <= 0 or any(x < 0 for x in weights):
+            raise ValueError("Weights must be positive with a sum greater than zero")
+
+        count = len(population)
+        self.population = list(population)
+        self.probabilities = [0.0] * count
+        self.aliases = list(range(count))
+
+        scaled = [x * count / total for x in weights]
+        small = [i for i, x in enumerate(scaled) if x < 1]
+        large = [i for i, x in enumerate(scaled) if x >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probabilities[less] = scaled[less]
+            self.aliases[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1
+            (small if scaled[more] < 1 else large).append(more)
+        # leftovers are only caused by rounding errors, they always keep their own slot
+        for i in small + large:
+            self.probabilities[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.population)
+
+    def sample(self) -> T:
+        i = random.randrange(len(self.population))
+        if random.random() < self.probabilities[i]:
+            return self.population[i]
+        return self.population[self.aliases[i]]
+
+
+class SpawnSampler:
+    """
+    Precomputed tables used to pick the spawned ball and the special event of caught balls.
+
+    The ball table is rebuilt with `rebuild` when the cache is loaded. The special table only
+    contains the events active at the time it was built, and is rebuilt automatically once the
+    next start or end date of an event is reached.
+
+    Attributes
+    ----------
+    balls: AliasTable[Ball] | None
+        Enabled balls weighted by rarity, or `None` if there is nothing to spawn.
+    specials: AliasTable[Special | None] | None
+        Active specials weighted by rarity, `None` being the common card. This is `None` if no
+        special is active.
+    next_boundary: datetime | None
+        The next time a special starts or ends, when `specials` must be rebuilt.
+    """
+
+    def __init__(self):
+        self.balls: AliasTable[Ball] | None = None
+        self.specials: AliasTable[Special | None] | None = None
+        self.next_boundary: datetime | None = None
+
+    def rebuild(self):
+        """
+        Rebuild all tables from the cached balls and specials.
+        """
+        population = [x for x in balls.values() if x.enabled and x.rarity > 0]
+        if population:
+            self.balls = AliasTable(population, [x.rarity for x in population])
+        else:
+            self.balls = None
+        self.rebuild_specials()
+
+    def rebuild_specials(self):
+        """
+        Rebuild the table of active specials and find the next time it must be rebuilt.
+        """
+        now = tortoise_now()
+        population: list[Special | None] = []
+        boundaries: list[datetime] = []
+        for special in specials.values():
+            if special.start_date and special.start_date > now:
+                boundaries.append(special.start_date)
+                continue
+            if special.end_date and special.end_date < now:
+                continue
+            if special.end_date:
+                boundaries.append(special.end_date)
+            if special.rarity > 0:
+                population.append(special)
+        self.next_boundary = min(boundaries, default=None)
+
+        if not population:
+            self.specials = None
+            return
+        weights = [x.rarity for x in population]  # type: ignore
+        # None is added representing the common countryball
+        weights.append(max(1 - sum(weights), 0))
+        population.append(None)
+        self.specials = AliasTable(population, weights)
+        log.debug(f"Rebuilt specials table with {len(population) - 1} active events.")
+
+    def get_ball(self) -> Ball:
+        """
+        Pick a random enabled ball, rarity values are taken into account.
+
+        Raises
+        ------
+        RuntimeError
+            There is no ball to spawn.
+        """
+        if self.balls is None:
+            raise RuntimeError("No ball to spawn")
+        return self.balls.sample()
+
+    def get_special(self) -> Special | None:
+        """
+        Pick a random special among the active events, or `None` for a common card.
+        """
+        if self.next_boundary and tortoise_now() >= self.next_boundary:
+            self.rebuild_specials()
+        if self.specials is None:
+            return None
+        return self.specials.sample()
+
+
+spawn_sampler = SpawnSampler()
@@ -0,0 +1,161 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable
+
+from cachetools import TTLCache
+from tortoise import Tortoise
+
+from ballsdex.core.utils.indexes import PlayerIndex
+
+log = logging.getLogger("ballsdex.core.utils.search")
+
+LOAD_QUERY = """
+SELECT id, ball_id, special_id, favorite, locked, attack_bonus, health_bonus
+FROM ballinstance WHERE player_id = $1 ORDER BY id
+"""
+
+# ranks of a search result, lower is better
+EXACT_ID = 0
+PREFIX = 1
+SUBSTRING = 2
+NO_MATCH = 3
+
+
+@dataclass(slots=True)
+class IndexedInstance:
+    """
+    The columns of a `BallInstance` needed to search it and to describe it in an autocomplete
+    choice.
+    """
+
+    id: int
+    hex_id: str
+    ball_id: int
+    special_id: int | None
+    favorite: bool
+    locked: datetime | None
+    attack_bonus: int
+    health_bonus: int
+
+
+class InstanceSearchIndex(PlayerIndex[dict[int, IndexedInstance]]):
+    """
+    The countryballs of players currently using autocompletion, so that each keystroke searches
+    in memory instead of scanning their collection in the database.
+
+    Entries live for a short time, long enough to type a search. Countryballs gained or lost by a
+    player must invalidate their entry, lock changes are applied in place with `set_locked`.
+
+    Attributes
+    ----------
+    entries: cachetools.TTLCache[int, dict[int, IndexedInstance]]
+        Maps a player's primary key to their instances, by instance ID.
+    """
+
+    def __init__(self, max_players: int = 1000, ttl: float = 60):
+        super().__init__(TTLCache(maxsize=max_players, ttl=ttl))
+
+    async def _load(self, player_id: int) -> dict[int, IndexedInstance]:
+        connection = Tortoise.get_connection("default")
+        return {
+            row["id"]: IndexedInstance(
+                id=row["id"],
+                hex_id=f"{row['id']:x}",
+                ball_id=row["ball_id"],
+                special_id=row["special_id"],
+                favorite=row["favorite"],
+                locked=row["locked"],
+                attack_bonus=row["attack_bonus"],
+                health_bonus=row["health_bonus"],
+            )
+            for row in await connection.execute_query_dict(LOAD_QUERY, [player_id])
+        }
+
+    def set_locked(self, ids: Iterable[int], locked: datetime | None):
+        """
+        Update the lock date of instances, in the entries where they are loaded.
+        """
+        ids = set(ids)
+        for instances in self.entries.values():
+            for instance_id in ids & instances.keys():
+                instances[instance_id].locked = locked
+        # the owners of the instances are unknown, detach every running load
+        self.loads.clear()
+
+
+instance_search = InstanceSearchIndex()
+
+
+def search_instances(
+    instances: Iterable[IndexedInstance],
+    value: str,
+    ball_names: dict[int, tuple[str, str]],
+    *,
+    special_id: int | None = None,
+    locked: bool | None = None,
+    unlocked_before: datetime | None = None,
+    limit: int = 25,
+) -> list[IndexedInstance]:
+    """
+    Return the instances matching a search, best matches first.
+
+    Instances whose hexadecimal ID is the search come first, then those whose ID or country
+    starts with it, then those containing it in their ID, country, catch names or translations.
+    A search starting with ``=`` returns the instances of the country with that exact name.
+
+    Parameters
+    ----------
+    instances: Iterable[IndexedInstance]
+        The instances to search, in the order used for equal matches.
+    value: str
+        The text typed by the user.
+    ball_names: dict[int, tuple[str, str]]
+        Maps a ball ID to its lowercase country, and to its lowercase country, catch names and
+        translations separated with spaces.
+    special_id: int | None
+        Only return instances with this special.
+    locked: bool | None
+        Only return instances locked for a trade if `True`, not locked if `False`.
+    unlocked_before: datetime | None
+        Locks older than this date have expired. Required when `locked` is set.
+    limit: int
+        The maximum number of results.
+    """
+    value = value.replace(".", "").lower()
+    exact_country = value[1:] if value.startswith("=") else None
+
+    # rank each ball once instead of each instance
+    ball_ranks: dict[int, int] = {}
+    for ball_id, (country, searchable) in ball_names.items():
+        if exact_country is not None:
+            ball_ranks[ball_id] = SUBSTRING if country == exact_country else NO_MATCH
+        elif country.startswith(value):
+            ball_ranks[ball_id] = PREFIX
+        elif value in searchable:
+            ball_ranks[ball_id] = SUBSTRING
+        else:
+            ball_ranks[ball_id] = NO_MATCH
+
+    ranked: list[list[IndexedInstance]] = [[], [], []]
+    for instance in instances:
+        if special_id is not None and instance.special_id != special_id:
+            continue
+        if locked is not None:
+            is_locked = instance.locked is not None and (
+                unlocked_before is None or instance.locked > unlocked_before
+            )
+            if is_locked != locked:
+                continue
+        rank = ball_ranks.get(instance.ball_id, NO_MATCH)
+        if exact_country is None and rank > EXACT_ID:
+            if instance.hex_id == value:
+                rank = EXACT_ID
+            elif rank > PREFIX and instance.hex_id.startswith(value):
+                rank = PREFIX
+            elif rank > SUBSTRING and value in instance.hex_id:
+                rank = SUBSTRING
+        if rank != NO_MATCH:
+            ranked[rank].append(instance)
+    results = ranked[EXACT_ID] + ranked[PREFIX] + ranked[SUBSTRING]
+    return results[:limit]
@@ -1,7 +1,8 @@
 import enum
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from tortoise.expressions import F, RawSQL
+from tortoise.functions import Coalesce, Count
 
 if TYPE_CHECKING:
     from tortoise.queryset import QuerySet
@@ -79,6 +80,56 @@ def sort_balls(
         return queryset.order_by(sort.value)
 
 
+async def sort_keys(
+    sort: SortingChoices | None, queryset: "QuerySet[BallInstance]"
+) -> list[tuple[Any, bool]]:
+    """
+    Return the expressions sorting a queryset like `sort_balls`, for keyset pagination. Unlike
+    `sort_balls`, every key is a column or an expression that can be compared in a filter, and
+    nullable columns are coalesced. The instance ID must be added as the last key to have a
+    total order.
+
+    Parameters
+    ----------
+    sort: SortingChoices | None
+        One of the supported sorting methods, or `None` for the default order of the lists
+        (favorites first).
+    queryset: QuerySet[BallInstance]
+        The filtered queryset that will be paginated. Only used to count the duplicates.
+
+    Returns
+    -------
+    list[tuple[Any, bool]]
+        The expressions to annotate and sort by, with whether the order is descending.
+    """
+    if sort is None:
+        return [(F("favorite"), True)]
+    if sort == SortingChoices.duplicates:
+        # the number of duplicates is the same for all instances of a ball, count them once
+        counts = (
+            await queryset.annotate(count=Count("id"))
+            .group_by("ball_id")
+            .values_list("ball_id", "count")
+        )
+        cases = " ".join(f"WHEN {int(ball_id)} THEN {int(count)}" for ball_id, count in counts)
+        count = RawSQL(f'CASE "ballinstance"."ball_id" {cases} ELSE 0 END' if cases else "0")
+        return [(count, True), (F("ball_id"), False)]
+    if sort == SortingChoices.stats_bonus:
+        return [(F("health_bonus") + F("attack_bonus"), True)]
+    if sort == SortingChoices.health or sort == SortingChoices.attack:
+        return [(F(f"{sort.value}_bonus") + F(f"ball__{sort.value}"), True)]
+    if sort == SortingChoices.total_stats:
+        return [(F("ball__health") + F("ball__attack"), True)]
+    if sort == SortingChoices.rarity:
+        return [(F("ball__rarity"), False), (F("ball__country"), False)]
+    if sort == SortingChoices.special:
+        # instances without a special come last, like with the order of PostgreSQL
+        return [(Coalesce("special_id", 2**31 - 1), False)]
+    if sort.value.startswith("-"):
+        return [(F(sort.value[1:]), True)]
+    return [(F(sort.value), False)]
+
+
 def filter_balls(
     filter: FilteringChoices, queryset: "QuerySet[BallInstance]", guild_id: int | None = None
 ) -> "QuerySet[BallInstance]":
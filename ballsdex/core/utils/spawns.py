@@ -0,0 +1,149 @@
+import random
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+
+# same as the default timeout of discord.py views, refreshed on every interaction
+SPAWN_TTL = 180
+
+
+@dataclass(slots=True)
+class SpawnRecord:
+    """
+    What must be remembered about a spawned countryball until it's caught or expires. Live spawns
+    are routed through a single dynamic button, this is all the state they keep.
+
+    Attributes
+    ----------
+    ball_id: int
+        Primary key of the spawned `Ball`.
+    algo: str | None
+        The spawn algorithm used, for metrics.
+    channel_id: int
+        The channel where the countryball was spawned.
+    message_id: int
+        The spawn message, set once it's sent.
+    spawned_at: datetime | None
+        Creation date of the spawn message.
+    special_id: int | None
+        Primary key of a `Special` forced on the caught instance.
+    atk_bonus: int | None
+        Attack bonus forced on the caught instance.
+    hp_bonus: int | None
+        Health bonus forced on the caught instance.
+    ballinstance_id: int | None
+        Primary key of an existing `BallInstance` transferred to the catcher instead of creating
+        a new one.
+    og_id: int | None
+        Discord ID of the owner of `ballinstance_id`.
+    caught: bool
+        Whether the countryball was caught.
+    expires: float
+        Monotonic time after which the spawn cannot be caught anymore.
+    """
+
+    ball_id: int
+    algo: str | None = None
+    channel_id: int = 0
+    message_id: int = 0
+    spawned_at: datetime | None = None
+    special_id: int | None = None
+    atk_bonus: int | None = None
+    hp_bonus: int | None = None
+    ballinstance_id: int | None = None
+    og_id: int | None = None
+    caught: bool = False
+    expires: float = field(default=0.0)
+
+
+class SpawnStore:
+    """
+    The live spawns, keyed by the ID written in the custom ID of their catch button.
+
+    Records are ordered by expiry: they share the same TTL and are moved to the end when
+    refreshed. This lives outside of the countryballs package, so spawns survive reloading it.
+
+    Attributes
+    ----------
+    records: OrderedDict[int, SpawnRecord]
+        Maps a spawn ID to its record, from the first to the last to expire.
+    ttl: float
+        Number of seconds after the spawn or the last interaction before a record expires.
+    """
+
+    def __init__(self, ttl: float = SPAWN_TTL):
+        self.records: OrderedDict[int, SpawnRecord] = OrderedDict()
+        self.ttl = ttl
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def add(self, record: SpawnRecord) -> int:
+        """
+        Store a new spawn and return its ID. IDs are random, so buttons left from before a
+        restart do not point to new spawns.
+        """
+        spawn_id = random.getrandbits(63)
+        while spawn_id in self.records:
+            spawn_id = random.getrandbits(63)
+        record.expires = time.monotonic() + self.ttl
+        self.records[spawn_id] = record
+        return spawn_id
+
+    def get(self, spawn_id: int) -> SpawnRecord | None:
+        """
+        Return the record of a spawn, or `None` if it's unknown or expired.
+        """
+        record = self.records.get(spawn_id)
+        if record is None or record.expires < time.monotonic():
+            return None
+        return record
+
+    def refresh(self, spawn_id: int):
+        """
+        Postpone the expiry of a spawn, after an interaction.
+        """
+        if record := self.records.get(spawn_id):
+            record.expires = time.monotonic() + self.ttl
+            self.records.move_to_end(spawn_id)
+
+    def remove(self, spawn_id: int):
+        self.records.pop(spawn_id, None)
+
+    def pop_expired(self) -> list[tuple[int, SpawnRecord]]:
+        """
+        Remove and return the expired records with their ID.
+        """
+        now = time.monotonic()
+        expired: list[tuple[int, SpawnRecord]] = []
+        while self.records:
+            spawn_id, record = next(iter(self.records.items()))
+            if record.expires >= now:
+                break
+            del self.records[spawn_id]
+            expired.append((spawn_id, record))
+        return expired
+
+    def memory_size(self) -> int:
+        """
+        Return an estimation of the memory used by the records in bytes.
+        """
+        if not self.records:
+            return sys.getsizeof(self.records)
+        # records have the same layout, a sample is enough
+        sample = list(islice(self.records.items(), 100))
+        total = 0
+        for spawn_id, record in sample:
+            total += sys.getsizeof(spawn_id) + sys.getsizeof(record)
+            total += sum(
+                sys.getsizeof(x)
+                for x in (record.channel_id, record.message_id, record.spawned_at, record.og_id)
+                if x is not None
+            )
+        return sys.getsizeof(self.records) + total * len(self.records) // len(sample)
+
+
+spawn_store = SpawnStore()
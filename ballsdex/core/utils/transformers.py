@@ -1,6 +1,5 @@
 import logging
 import time
-from datetime import timedelta
 from enum import Enum
 from typing import TYPE_CHECKING, Generic, Iterable, Optional, TypeVar
 
@@ -8,11 +7,12 @@ import discord
 from discord import app_commands
 from discord.interactions import Interaction
 from tortoise.exceptions import DoesNotExist
-from tortoise.expressions import Q, RawSQL
 from tortoise.models import Model
 from tortoise.timezone import now as tortoise_now
 
+from ballsdex.core.metrics import instance_autocomplete_duration
 from ballsdex.core.models import (
+    LOCK_DURATION,
     Ball,
     BallInstance,
     Economy,
@@ -22,6 +22,8 @@ from ballsdex.core.models import (
     economies,
     regimes,
 )
+from ballsdex.core.utils.players import get_player_or_none
+from ballsdex.core.utils.search import instance_search, search_instances
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
@@ -161,45 +163,54 @@ class BallInstanceTransformer(ModelTransformer[BallInstance]):
     async def get_options(
         self, interaction: Interaction["BallsDexBot"], value: str
     ) -> list[app_commands.Choice[int]]:
-        balls_queryset = BallInstance.filter(player__discord_id=interaction.user.id)
-
+        t1 = time.perf_counter()
+        player = await get_player_or_none(interaction.user.id)
+        if player is None:
+            return []
+        index = "hit" if player.pk in instance_search else "miss"
+        instances = await instance_search.get(player.pk)
+
+        special_id: int | None = None
         if (special := getattr(interaction.namespace, "special", None)) and special.isdigit():
-            balls_queryset = balls_queryset.filter(special_id=int(special))
+            special_id = int(special)
 
+        locked: bool | None = None
         if interaction.command and (trade_type := interaction.command.extras.get("trade", None)):
-            if trade_type == TradeCommandType.PICK:
-                balls_queryset = balls_queryset.filter(
-                    Q(
-                        Q(locked__isnull=True)
-                        | Q(locked__lt=tortoise_now() - timedelta(minutes=30))
-                    )
-                )
-            else:
-                balls_queryset = balls_queryset.filter(
-                    locked__isnull=False, locked__gt=tortoise_now() - timedelta(minutes=30)
-                )
+            locked = trade_type != TradeCommandType.PICK
 
-        if value.startswith("="):
-            ball_name = value[1:]
-            balls_queryset = balls_queryset.filter(ball__country__iexact=ball_name)
-        else:
-            balls_queryset = (
-                balls_queryset.select_related("ball")
-                .annotate(
-                    searchable=RawSQL(
-                        "to_hex(ballinstance.id) || ' ' || ballinstance__ball.country || ' ' || "
-                        "COALESCE(ballinstance__ball.catch_names, '') || ' ' || "
-                        "COALESCE(ballinstance__ball.translations, '')"
-                    )
-                )
-                .filter(searchable__icontains=value.replace(".", ""))
+        ball_names = {
+            pk: (
+                ball.country.lower(),
+                f"{ball.country} {ball.catch_names or ''} {ball.translations or ''}".lower(),
             )
-        balls_queryset = balls_queryset.limit(25)
+            for pk, ball in balls.items()
+        }
+        results = search_instances(
+            instances.values(),
+            value,
+            ball_names,
+            special_id=special_id,
+            locked=locked,
+            unlocked_before=tortoise_now() - LOCK_DURATION,
+        )
 
-        choices: list[app_commands.Choice] = [
-            app_commands.Choice(name=x.description(bot=interaction.client), value=str(x.pk))
-            for x in await balls_queryset
-        ]
+        choices: list[app_commands.Choice] = []
+        for x in results:
+            # unsaved models, only used to format the description
+            instance = BallInstance(
+                id=x.id,
+                ball_id=x.ball_id,
+                special_id=x.special_id,
+                favorite=x.favorite,
+                attack_bonus=x.attack_bonus,
+                health_bonus=x.health_bonus,
+            )
+            choices.append(
+                app_commands.Choice(
+                    name=instance.description(bot=interaction.client), value=str(x.id)
+                )
+            )
+        instance_autocomplete_duration.labels(index=index).observe(time.perf_counter() - t1)
         return choices
 
 
@@ -13,7 +13,10 @@ from tortoise.exceptions import BaseORMException, DoesNotExist
 from ballsdex.core.bot import BallsDexBot
 from ballsdex.core.models import Ball, BallInstance, Player, Special, Trade, TradeObject
 from ballsdex.core.utils.buttons import ConfirmChoiceView
+from ballsdex.core.utils.completion import completion_index
 from ballsdex.core.utils.logging import log_action
+from ballsdex.core.utils.players import get_player, get_player_or_none
+from ballsdex.core.utils.search import instance_search
 from ballsdex.core.utils.transformers import (
     BallTransform,
     EconomyTransform,
@@ -234,7 +237,7 @@ class Balls(app_commands.Group):
             return
         await interaction.response.defer(ephemeral=True, thinking=True)
 
-        player, created = await Player.get_or_create(discord_id=user.id)
+        player = await get_player(user.id, bypass_cache=True)
         instance = await BallInstance.create(
             ball=countryball,
             player=player,
@@ -250,6 +253,8 @@ class Balls(app_commands.Group):
             ),
             special=special,
         )
+        completion_index.add(player.pk, countryball.pk, special.pk if special else None)
+        instance_search.invalidate(player.pk)
         await interaction.followup.send(
             f"`{countryball.country}` {settings.collectible_name} was successfully given to "
             f"`{user}`.\nSpecial: `{special.name if special else None}` • ATK: "
@@ -346,6 +351,8 @@ class Balls(app_commands.Group):
             )
             return
         await ball.delete()
+        completion_index.invalidate(ball.player_id)
+        instance_search.invalidate(ball.player_id)
         await interaction.response.send_message(
             f"{settings.collectible_name.title()} {countryball_id} deleted.", ephemeral=True
         )
@@ -384,9 +391,14 @@ class Balls(app_commands.Group):
                 f"The {settings.collectible_name} ID you gave does not exist.", ephemeral=True
             )
             return
-        player, _ = await Player.get_or_create(discord_id=user.id)
+        player = await get_player(user.id, bypass_cache=True)
         ball.player = player
         await ball.save()
+        completion_index.invalidate(original_player.pk)
+        instance_search.invalidate(original_player.pk, player.pk)
+        completion_index.add(
+            player.pk, ball.ball_id, ball.special_id, traded=ball.trade_player_id is not None
+        )
 
         trade = await Trade.create(player1=original_player, player2=player)
         await TradeObject.create(trade=trade, ballinstance=ball, player=original_player)
@@ -417,7 +429,7 @@ class Balls(app_commands.Group):
         percentage: int | None
             The percentage of countryballs to delete, if not all. Used for sanctions.
         """
-        player = await Player.get_or_none(discord_id=user.id)
+        player = await get_player_or_none(user.id, bypass_cache=True)
         if not player:
             await interaction.response.send_message(
                 "The user you gave does not exist.", ephemeral=True
@@ -458,6 +470,8 @@ class Balls(app_commands.Group):
             count = len(to_delete)
         else:
             count = await BallInstance.filter(player=player).delete()
+        completion_index.invalidate(player.pk)
+        instance_search.invalidate(player.pk)
         await interaction.followup.send(
             f"{count} {settings.plural_collectible_name} from {user} have been deleted.",
             ephemeral=True,
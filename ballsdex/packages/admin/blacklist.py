@@ -4,15 +4,10 @@ from discord.utils import format_dt
 from tortoise.exceptions import DoesNotExist, IntegrityError
 
 from ballsdex.core.bot import BallsDexBot
-from ballsdex.core.models import (
-    BlacklistedGuild,
-    BlacklistedID,
-    BlacklistHistory,
-    GuildConfig,
-    Player,
-)
+from ballsdex.core.models import BlacklistedGuild, BlacklistedID, BlacklistHistory, GuildConfig
 from ballsdex.core.utils.logging import log_action
 from ballsdex.core.utils.paginator import Pages
+from ballsdex.core.utils.players import get_player_or_none
 from ballsdex.packages.admin.menu import BlacklistViewFormat
 from ballsdex.settings import settings
 
@@ -130,7 +125,9 @@ class Blacklist(app_commands.Group):
                 )
             else:
                 moderator_msg = "Moderator: Unknown"
-            if settings.admin_url and (player := await Player.get_or_none(discord_id=user.id)):
+            if settings.admin_url and (
+                player := await get_player_or_none(user.id, bypass_cache=True)
+            ):
                 admin_url = (
                     "\n[View history online]"
                     f"(<{settings.admin_url}/bd_models/player/{player.pk}/change/>)"
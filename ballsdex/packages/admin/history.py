@@ -6,8 +6,9 @@ from tortoise.exceptions import DoesNotExist
 from tortoise.expressions import Q
 
 from ballsdex.core.bot import BallsDexBot
-from ballsdex.core.models import BallInstance, Player, Trade
+from ballsdex.core.models import BallInstance, Trade
 from ballsdex.core.utils.paginator import Pages
+from ballsdex.core.utils.players import get_player
 from ballsdex.core.utils.transformers import BallEnabledTransform
 from ballsdex.packages.trade.display import TradeViewFormat, fill_trade_embed_fields
 from ballsdex.packages.trade.trade_user import TradingUser
@@ -63,9 +64,9 @@ class History(app_commands.Group):
 
         queryset = Trade.filter()
         try:
-            player1 = await Player.get(discord_id=user.id)
+            player1 = await get_player(user.id, create=False, bypass_cache=True)
             if user2:
-                player2 = await Player.get(discord_id=user2.id)
+                player2 = await get_player(user2.id, create=False, bypass_cache=True)
                 query = f"?q={user.id}+{user2.id}"
                 queryset = queryset.filter(
                     (Q(player1=player1) & Q(player2=player2))
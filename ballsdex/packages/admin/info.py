@@ -5,7 +5,7 @@ from discord import app_commands
 from discord.utils import format_dt
 
 from ballsdex.core.bot import BallsDexBot
-from ballsdex.core.models import BallInstance, GuildConfig, Player
+from ballsdex.core.models import BallInstance, CollectionSummary, GuildConfig, ServerSummary
 from ballsdex.core.utils.enums import (
     DONATION_POLICY_MAP,
     FRIEND_POLICY_MAP,
@@ -13,6 +13,7 @@ from ballsdex.core.utils.enums import (
     PRIVATE_POLICY_MAP,
 )
 from ballsdex.core.utils.enums import TRADE_COOLDOWN_POLICY_MAP as TRADE_POLICY_MAP
+from ballsdex.core.utils.players import get_player_or_none
 from ballsdex.settings import settings
 
 
@@ -117,7 +118,7 @@ class Info(app_commands.Group):
             The amount of days to look back for the amount of countryballs caught.
         """
         await interaction.response.defer(ephemeral=True, thinking=True)
-        player = await Player.get_or_none(discord_id=user.id)
+        player = await get_player_or_none(user.id, bypass_cache=True)
         if not player:
             await interaction.followup.send("The user you gave does not exist.", ephemeral=True)
             return
@@ -154,17 +155,18 @@ class Info(app_commands.Group):
             name=f"Total servers with {settings.plural_collectible_name} caught ({days} days):",
             value=len(set([x.server_id for x in total_user_balls])),
         )
+        totals = await CollectionSummary.totals(player)
         embed.add_field(
             name=f"Total {settings.plural_collectible_name} caught:",
-            value=await BallInstance.filter(player__discord_id=user.id).count(),
+            value=totals.total,
         )
         embed.add_field(
             name=f"Total unique {settings.plural_collectible_name} caught:",
-            value=len(set([x.countryball for x in total_user_balls])),
+            value=len(totals.by_ball),
         )
         embed.add_field(
             name=f"Total servers with {settings.plural_collectible_name} caught:",
-            value=len(set([x.server_id for x in total_user_balls])),
+            value=await ServerSummary.filter(player_id=player.pk).count(),
         )
         embed.set_thumbnail(url=user.display_avatar)  # type: ignore
         await interaction.followup.send(embed=embed, ephemeral=True)
@@ -3,9 +3,10 @@ from typing import TYPE_CHECKING, Iterable
 import discord
 from discord.utils import format_dt
 
-from ballsdex.core.models import BlacklistHistory, Player
+from ballsdex.core.models import BlacklistHistory
 from ballsdex.core.utils import menus
 from ballsdex.core.utils.paginator import Pages
+from ballsdex.core.utils.players import get_player_or_none
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
@@ -36,7 +37,9 @@ class BlacklistViewFormat(menus.ListPageSource):
                 inline=True,
             )
         embed.add_field(name="Action Time", value=format_dt(blacklist.date, "R"), inline=True)
-        if settings.admin_url and (player := await Player.get_or_none(discord_id=self.header)):
+        if settings.admin_url and (
+            player := await get_player_or_none(self.header, bypass_cache=True)
+        ):
             embed.add_field(
                 name="\u200B",
                 value="[View history online]"
@@ -1,6 +1,5 @@
 import enum
 import logging
-from collections import defaultdict
 from typing import TYPE_CHECKING, cast
 
 import discord
@@ -12,16 +11,20 @@ from tortoise.functions import Count
 
 from ballsdex.core.models import (
     BallInstance,
+    CollectionSummary,
     DonationPolicy,
     Player,
-    Special,
     Trade,
     TradeObject,
     balls,
+    specials,
 )
 from ballsdex.core.utils.buttons import ConfirmChoiceView
+from ballsdex.core.utils.completion import bits_to_ids, completion_index, ids_to_bits
 from ballsdex.core.utils.paginator import FieldPageSource, Pages
-from ballsdex.core.utils.sorting import FilteringChoices, SortingChoices, filter_balls, sort_balls
+from ballsdex.core.utils.players import get_player, get_player_or_none
+from ballsdex.core.utils.search import instance_search
+from ballsdex.core.utils.sorting import FilteringChoices, SortingChoices, filter_balls
 from ballsdex.core.utils.transformers import (
     BallEnabledTransform,
     BallInstanceTransform,
@@ -29,7 +32,11 @@ from ballsdex.core.utils.transformers import (
     TradeCommandType,
 )
 from ballsdex.core.utils.utils import inventory_privacy, is_staff
-from ballsdex.packages.balls.countryballs_paginator import CountryballsViewer, DuplicateViewMenu
+from ballsdex.packages.balls.countryballs_paginator import (
+    CountryballsViewer,
+    DuplicateViewMenu,
+    LazyCountryballsSource,
+)
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
@@ -69,7 +76,7 @@ class DonationRequest(View):
             )
         except discord.NotFound:
             pass
-        await self.countryball.unlock()
+        await BallInstance.unlock_many([self.countryball.pk])
 
     @button(
         style=discord.ButtonStyle.success, emoji="\N{HEAVY CHECK MARK}\N{VARIATION SELECTOR-16}"
@@ -82,6 +89,14 @@ class DonationRequest(View):
         self.countryball.trade_player = self.countryball.player
         self.countryball.player = self.new_player
         await self.countryball.save()
+        completion_index.invalidate(self.countryball.trade_player.pk)
+        instance_search.invalidate(self.countryball.trade_player.pk, self.new_player.pk)
+        completion_index.add(
+            self.new_player.pk,
+            self.countryball.ball_id,
+            self.countryball.special_id,
+            traded=True,
+        )
         trade = await Trade.create(player1=self.countryball.trade_player, player2=self.new_player)
         await TradeObject.create(
             trade=trade, ballinstance=self.countryball, player=self.countryball.trade_player
@@ -91,7 +106,7 @@ class DonationRequest(View):
             + "\n\N{WHITE HEAVY CHECK MARK} The donation was accepted!",
             view=self,
         )
-        await self.countryball.unlock()
+        await BallInstance.unlock_many([self.countryball.pk])
 
     @button(
         style=discord.ButtonStyle.danger,
@@ -106,7 +121,7 @@ class DonationRequest(View):
             + "\n\N{CROSS MARK} The donation was denied.",
             view=self,
         )
-        await self.countryball.unlock()
+        await BallInstance.unlock_many([self.countryball.pk])
 
 
 class DuplicateType(enum.StrEnum):
@@ -156,7 +171,7 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
         await interaction.response.defer(thinking=True)
 
         try:
-            player = await Player.get(discord_id=user_obj.id)
+            player = await get_player(user_obj.id, create=False)
         except DoesNotExist:
             if user_obj == interaction.user:
                 await interaction.followup.send(
@@ -171,7 +186,7 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
             if await inventory_privacy(self.bot, interaction, player, user_obj) is False:
                 return
 
-        interaction_player, _ = await Player.get_or_create(discord_id=interaction.user.id)
+        interaction_player = await get_player(interaction.user.id)
 
         blocked = await player.is_blocked(interaction_player)
         if blocked and not is_staff(interaction):
@@ -180,20 +195,17 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
             )
             return
 
-        await player.fetch_related("balls")
-        query = player.balls.all()
+        query = BallInstance.filter(player=player)
         if filter:
             query = filter_balls(filter, query, interaction.guild_id)
         if countryball:
             query = query.filter(ball__id=countryball.pk)
         if special:
             query = query.filter(special=special)
-        if sort:
-            countryballs = await sort_balls(sort, query)
-        else:
-            countryballs = await query.order_by("-favorite")
+        source = LazyCountryballsSource(query, sort, reverse)
+        await source.prepare()
 
-        if len(countryballs) < 1:
+        if source.total < 1:
             ball_txt = countryball.country if countryball else ""
             special_txt = special if special else ""
 
@@ -216,10 +228,8 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
                     f"{settings.plural_collectible_name} yet."
                 )
             return
-        if reverse:
-            countryballs.reverse()
 
-        paginator = CountryballsViewer(interaction, countryballs)
+        paginator = CountryballsViewer(interaction, source)
         if user_obj == interaction.user:
             await paginator.start()
         else:
@@ -251,9 +261,12 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
         user_obj = user or interaction.user
         await interaction.response.defer(thinking=True)
         extra_text = f"{special.name} " if special else ""
-        if user is not None:
+        player: Player | None
+        if user is None:
+            player = await get_player_or_none(user_obj.id)
+        else:
             try:
-                player = await Player.get(discord_id=user_obj.id)
+                player = await get_player(user_obj.id, create=False)
             except DoesNotExist:
                 await interaction.followup.send(
                     f"{user_obj.name} doesn't have any "
@@ -261,7 +274,7 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
                 )
                 return
 
-            interaction_player, _ = await Player.get_or_create(discord_id=interaction.user.id)
+            interaction_player = await get_player(interaction.user.id)
 
             blocked = await player.is_blocked(interaction_player)
             if blocked and not is_staff(interaction):
@@ -298,12 +311,19 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
             )
             return
 
-        owned_countryballs = set(
-            x[0]
-            for x in await BallInstance.filter(**filters)
-            .distinct()  # Do not query everything
-            .values_list("ball_id")
-        )
+        owned_countryballs: set[int] = set()
+        if player is not None:
+            completion = await completion_index.get(player.pk)
+            bits = completion.bits(special.pk if special else None, self_caught)
+            if bits is not None:
+                owned_countryballs = bits_to_ids(bits & ids_to_bits(bot_countryballs))
+            else:
+                owned_countryballs = set(
+                    x[0]
+                    for x in await BallInstance.filter(**filters)
+                    .distinct()  # Do not query everything
+                    .values_list("ball_id")
+                )
 
         entries: list[tuple[str, str]] = []
 
@@ -412,7 +432,7 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
         user_obj = user if user else interaction.user
         await interaction.response.defer(thinking=True)
         try:
-            player = await Player.get(discord_id=user_obj.id)
+            player = await get_player(user_obj.id, create=False)
         except DoesNotExist:
             msg = f"{'You do' if user is None else f'{user_obj.display_name} does'}"
             await interaction.followup.send(
@@ -425,7 +445,7 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
             if await inventory_privacy(self.bot, interaction, player, user_obj) is False:
                 return
 
-        interaction_player, _ = await Player.get_or_create(discord_id=interaction.user.id)
+        interaction_player = await get_player(interaction.user.id)
 
         blocked = await player.is_blocked(interaction_player)
         if blocked and not is_staff(interaction):
@@ -482,7 +502,7 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
 
         if not countryball.favorite:
             try:
-                player = await Player.get(discord_id=interaction.user.id).prefetch_related("balls")
+                player = await get_player(interaction.user.id, create=False)
             except DoesNotExist:
                 await interaction.response.send_message(
                     f"You don't have any {settings.plural_collectible_name} yet.", ephemeral=True
@@ -503,6 +523,7 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
 
             countryball.favorite = True  # type: ignore
             await countryball.save()
+            instance_search.invalidate(countryball.player_id)
             emoji = self.bot.get_emoji(countryball.countryball.emoji_id) or ""
             await interaction.response.send_message(
                 f"{emoji} `#{countryball.pk:0X}` {countryball.countryball.country} "
@@ -513,6 +534,7 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
         else:
             countryball.favorite = False  # type: ignore
             await countryball.save()
+            instance_search.invalidate(countryball.player_id)
             emoji = self.bot.get_emoji(countryball.countryball.emoji_id) or ""
             await interaction.response.send_message(
                 f"{emoji} `#{countryball.pk:0X}` {countryball.countryball.country} "
@@ -550,7 +572,8 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
         if user.bot:
             await interaction.response.send_message("You cannot donate to bots.", ephemeral=True)
             return
-        if await countryball.is_locked():
+        # locked now and not after the confirmation, to avoid trading it meanwhile
+        if await BallInstance.lock_many([countryball.pk]):
             await interaction.response.send_message(
                 f"This {settings.collectible_name} is currently locked for a trade. "
                 "Please try again later.",
@@ -572,26 +595,26 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
             )
             await view.wait()
             if not view.value:
+                await BallInstance.unlock_many([countryball.pk])
                 return
             interaction = view.interaction_response
         else:
             await interaction.response.defer()
-        await countryball.lock_for_trade()
-        new_player, _ = await Player.get_or_create(discord_id=user.id)
+        new_player = await get_player(user.id)
         old_player = countryball.player
 
         if new_player == old_player:
             await interaction.followup.send(
                 f"You cannot give a {settings.collectible_name} to yourself.", ephemeral=True
             )
-            await countryball.unlock()
+            await BallInstance.unlock_many([countryball.pk])
             return
         if new_player.donation_policy == DonationPolicy.ALWAYS_DENY:
             await interaction.followup.send(
                 "This player does not accept donations. You can use trades instead.",
                 ephemeral=True,
             )
-            await countryball.unlock()
+            await BallInstance.unlock_many([countryball.pk])
             return
 
         friendship = await new_player.is_friend(old_player)
@@ -601,20 +624,20 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
                     "This player only accepts donations from friends, use trades instead.",
                     ephemeral=True,
                 )
-                await countryball.unlock()
+                await BallInstance.unlock_many([countryball.pk])
                 return
         blocked = await new_player.is_blocked(old_player)
         if blocked:
             await interaction.followup.send(
                 "You cannot interact with a user that has blocked you.", ephemeral=True
             )
-            await countryball.unlock()
+            await BallInstance.unlock_many([countryball.pk])
             return
         if new_player.discord_id in self.bot.blacklist:
             await interaction.followup.send(
                 "You cannot donate to a blacklisted user.", ephemeral=True
             )
-            await countryball.unlock()
+            await BallInstance.unlock_many([countryball.pk])
             return
         elif new_player.donation_policy == DonationPolicy.REQUEST_APPROVAL:
             await interaction.followup.send(
@@ -630,6 +653,11 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
         countryball.trade_player = old_player
         countryball.favorite = False
         await countryball.save()
+        completion_index.invalidate(old_player.pk)
+        instance_search.invalidate(old_player.pk, new_player.pk)
+        completion_index.add(
+            new_player.pk, countryball.ball_id, countryball.special_id, traded=True
+        )
 
         trade = await Trade.create(player1=old_player, player2=new_player)
         await TradeObject.create(trade=trade, ballinstance=countryball, player=old_player)
@@ -649,7 +677,7 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
                 f"You just gave the {settings.collectible_name} {cb_txt} to {user.mention}!",
                 allowed_mentions=discord.AllowedMentions(users=new_player.can_be_mentioned),
             )
-        await countryball.unlock()
+        await BallInstance.unlock_many([countryball.pk])
 
     @app_commands.command()
     async def count(
@@ -717,8 +745,7 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
         """
         await interaction.response.defer(thinking=True, ephemeral=True)
 
-        player, _ = await Player.get_or_create(discord_id=interaction.user.id)
-        await player.fetch_related("balls")
+        player = await get_player(interaction.user.id)
         is_special = type == DuplicateType.specials
         queryset = BallInstance.filter(player=player)
 
@@ -785,7 +812,7 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
             return
 
         try:
-            player = await Player.get(discord_id=user.id)
+            player = await get_player(user.id, create=False)
         except DoesNotExist:
             await interaction.followup.send(
                 f"{user.display_name} doesn't have any {settings.plural_collectible_name} yet."
@@ -803,8 +830,8 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
                 if y.enabled and (special.end_date is None or y.created_at < special.end_date)
             }
 
-        player1, _ = await Player.get_or_create(discord_id=interaction.user.id)
-        player2, _ = await Player.get_or_create(discord_id=user.id)
+        player1 = await get_player(interaction.user.id)
+        player2 = await get_player(user.id)
 
         blocked = await player.is_blocked(player1)
         if blocked and not is_staff(interaction):
@@ -819,21 +846,14 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
                 "You cannot compare with a user that has you blocked.", ephemeral=True
             )
             return
-        queryset = BallInstance.filter(ball__enabled=True).distinct()
-        if special:
-            queryset = queryset.filter(special=special)
-        user1_balls = cast(
-            list[int],
-            await queryset.filter(player=player1).values_list("ball_id", flat=True),
-        )
-        user2_balls = cast(
-            list[int],
-            await queryset.filter(player=player2).values_list("ball_id", flat=True),
-        )
-        both = set(user1_balls) & set(user2_balls)
-        user1_only = set(user1_balls) - set(user2_balls)
-        user2_only = set(user2_balls) - set(user1_balls)
-        neither = set(bot_countryballs.keys()) - both - user1_only - user2_only
+        enabled = ids_to_bits(bot_countryballs)
+        special_id = special.pk if special else None
+        user1_balls = cast(int, (await completion_index.get(player1.pk)).bits(special_id))
+        user2_balls = cast(int, (await completion_index.get(player2.pk)).bits(special_id))
+        both = bits_to_ids(user1_balls & user2_balls & enabled)
+        user1_only = bits_to_ids(user1_balls & ~user2_balls & enabled)
+        user2_only = bits_to_ids(user2_balls & ~user1_balls & enabled)
+        neither = bits_to_ids(enabled & ~(user1_balls | user2_balls))
 
         entries = []
 
@@ -900,16 +920,11 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
             Whether or not to send the command ephemerally.
         """
         await interaction.response.defer(thinking=True, ephemeral=ephemeral)
-        player, _ = await Player.get_or_create(discord_id=interaction.user.id)
+        player = await get_player(interaction.user.id)
 
-        query = BallInstance.filter(player=player).prefetch_related(
-            "player", "trade_player", "special"
-        )
-        if countryball:
-            query = query.filter(ball=countryball)
-        balls = await query
+        totals = await CollectionSummary.totals(player, ball=countryball)
 
-        if not balls:
+        if not totals.total:
             if countryball:
                 await interaction.followup.send(
                     f"You don't have any {countryball.country} "
@@ -921,27 +936,22 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
                     f"You don't have any {settings.plural_collectible_name} yet."
                 )
             return
-        total = len(balls)
-        total_traded = len([x for x in balls if x.trade_player])
-        total_caught_self = total - total_traded
-        special_count = len([x for x in balls if x.special])
-        specials = defaultdict(int)
-        all_specials = await Special.filter(hidden=False)
-        special_emojis = {x.name: x.emoji for x in all_specials}
-        for ball in balls:
-            if ball.special:
-                specials[ball.special] += 1
 
         desc = (
-            f"**Total**: {total:,} ({total_caught_self:,} caught, "
-            f"{total_traded:,} received from trade)\n"
-            f"**Total Specials**: {special_count:,}\n\n"
+            f"**Total**: {totals.total:,} ({totals.caught:,} caught, "
+            f"{totals.traded:,} received from trade)\n"
+            f"**Total Specials**: {totals.special_total:,}\n\n"
         )
-        if specials:
+        if totals.by_special:
             desc += "**Specials**:\n"
-        for special, count in sorted(specials.items(), key=lambda x: x[1], reverse=True):
-            emoji = special_emojis.get(special.name, "")
-            desc += f"{emoji} {special.name}: {count:,}\n"
+        for special_id, count in sorted(
+            totals.by_special.items(), key=lambda x: x[1], reverse=True
+        ):
+            special = specials.get(special_id)
+            if special is None:
+                continue
+            emoji = special.emoji if not special.hidden else ""
+            desc += f"{emoji or ''} {special.name}: {count:,}\n"
 
         embed = discord.Embed(
             title=f"Collection of {countryball.country}" if countryball else "Total Collection",
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, List
+import asyncio
+from typing import TYPE_CHECKING, Any, List
 
 import discord
+from tortoise.expressions import Q
 
 from ballsdex.core.models import BallInstance
 from ballsdex.core.utils import menus
 from ballsdex.core.utils.paginator import Pages
+from ballsdex.core.utils.sorting import SortingChoices, sort_keys
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
+    from tortoise.queryset import QuerySet
+
     from ballsdex.core.bot import BallsDexBot
 
 
@@ -22,10 +27,118 @@ class CountryballsSource(menus.ListPageSource):
         return True  # signal to edit the page
 
 
+class LazyCountryballsSource(menus.PageSource):
+    """
+    Pages of a queryset of countryballs, fetched when they are shown instead of all at once.
+
+    Pages are fetched with keyset pagination: the query of a page starts after the sort keys of
+    the last instance of the previous page, so its cost doesn't depend on the page number. Pages
+    reached without going through the previous one (first, last or numbered page) use an offset
+    instead. The next page is fetched in the background while the current one is shown.
+
+    `prepare` must be awaited before using the source.
+
+    Parameters
+    ----------
+    queryset: QuerySet[BallInstance]
+        The filtered countryballs, not sorted.
+    sort: SortingChoices | None
+        How the countryballs are sorted, see `sort_balls`.
+    reverse: bool
+        Reverse the order of the countryballs.
+    per_page: int
+        The number of countryballs in a page.
+    """
+
+    def __init__(
+        self,
+        queryset: "QuerySet[BallInstance]",
+        sort: SortingChoices | None = None,
+        reverse: bool = False,
+        per_page: int = 25,
+    ):
+        self.queryset = queryset
+        self.sort = sort
+        self.reverse = reverse
+        self.per_page = per_page
+        self.total = 0
+        self.query: "QuerySet[BallInstance]" = queryset
+        self.keys: list[tuple[str, bool]] = []
+        # the sort keys of the last instance of the previous page, by page number
+        self.cursors: dict[int, tuple[Any, ...]] = {}
+        self.pages: dict[int, asyncio.Task[list[BallInstance]]] = {}
+
+    async def prepare(self):
+        self.total = await self.queryset.count()
+        expressions = await sort_keys(self.sort, self.queryset)
+        annotations = {f"sort_key{i}": expression for i, (expression, _) in enumerate(expressions)}
+        self.keys = [(name, desc) for name, (_, desc) in zip(annotations, expressions)]
+        self.keys.append(("id", False))
+        if self.reverse:
+            self.keys = [(name, not desc) for name, desc in self.keys]
+        self.query = self.queryset.annotate(**annotations).order_by(
+            *(f"-{name}" if desc else name for name, desc in self.keys)
+        )
+
+    def is_paginating(self) -> bool:
+        return self.total > self.per_page
+
+    def get_max_pages(self) -> int:
+        return max(1, -(-self.total // self.per_page))
+
+    async def _fetch(self, page_number: int) -> list[BallInstance]:
+        query = self.query.limit(self.per_page)
+        cursor = self.cursors.get(page_number)
+        if cursor is None:
+            query = query.offset(page_number * self.per_page)
+        else:
+            # (a, b, c) > (x, y, z) is a > x or (a = x and (b > y or (b = y and c > z))), with
+            # the comparison reversed for descending keys
+            conditions: list[Q] = []
+            for i, (name, desc) in enumerate(self.keys):
+                previous = {self.keys[j][0]: cursor[j] for j in range(i)}
+                conditions.append(
+                    Q(**previous, **{f"{name}__{'lt' if desc else 'gt'}": cursor[i]})
+                )
+            query = query.filter(Q(*conditions, join_type="OR"))
+        balls = await query
+        if balls:
+            self.cursors[page_number + 1] = tuple(getattr(balls[-1], x) for x, _ in self.keys)
+        return balls
+
+    def _schedule(self, page_number: int) -> asyncio.Task[list[BallInstance]]:
+        task = self.pages.get(page_number)
+        if task is None or (task.done() and (task.cancelled() or task.exception())):
+            task = asyncio.create_task(self._fetch(page_number))
+            self.pages[page_number] = task
+        return task
+
+    async def get_page(self, page_number: int) -> list[BallInstance]:
+        balls = await self._schedule(page_number)
+        # keep the neighbours of the current page, going back and forth is common
+        for number in list(self.pages):
+            if abs(number - page_number) > 1:
+                self.pages.pop(number).cancel()
+        if page_number + 1 < self.get_max_pages():
+            self._schedule(page_number + 1)
+        return balls
+
+    async def format_page(self, menu: CountryballsSelector, balls: List[BallInstance]):
+        menu.set_options(balls)
+        return True  # signal to edit the page
+
+
 class CountryballsSelector(Pages):
-    def __init__(self, interaction: discord.Interaction["BallsDexBot"], balls: List[BallInstance]):
+    def __init__(
+        self,
+        interaction: discord.Interaction["BallsDexBot"],
+        balls: List[BallInstance] | LazyCountryballsSource,
+    ):
         self.bot = interaction.client
-        source = CountryballsSource(balls)
+        if isinstance(balls, LazyCountryballsSource):
+            source = balls
+        else:
+            source = CountryballsSource(balls)
         super().__init__(source, interaction=interaction)
         self.add_item(self.select_ball_menu)
 
@@ -69,7 +182,7 @@ class CountryballsViewer(CountryballsSelector):
     async def ball_selected(
         self, interaction: discord.Interaction["BallsDexBot"], ball_instance: BallInstance
     ):
-        content, file, view = await ball_instance.prepare_for_message(interaction)
+        content, file, view = await ball_instance.prepare_for_message(interaction, preview=True)
         await interaction.followup.send(content=content, file=file, view=view)
         file.close()
 
@@ -15,9 +15,9 @@ import io
 from ballsdex.core.models import (
     Ball,
     BallInstance,
-    Player
 )
 from ballsdex.core.models import balls as countryballs
+from ballsdex.core.utils.players import get_player
 from ballsdex.settings import settings
 
 from ballsdex.core.utils.transformers import (
@@ -666,7 +666,7 @@ class Battle(commands.GroupCog):
                     break
             if maxallowed != 0:
                 return await interaction.followup.send("Bulk adding is not available when there is a max amount limit!",ephemeral=True)
-            player, _ = await Player.get_or_create(discord_id=interaction.user.id)
+            player = await get_player(interaction.user.id)
             filters = {}
             filters["player__discord_id"] = interaction.user.id
             filters["ball__tradeable"] = True
@@ -704,7 +704,7 @@ class Battle(commands.GroupCog):
         """
         try:
             await interaction.response.defer(ephemeral=True, thinking=True)
-            player, _ = await Player.get_or_create(discord_id=interaction.user.id)
+            player = await get_player(interaction.user.id)
             if countryball:
                 balls = await countryball.ballinstances.filter(player=player)
             else:
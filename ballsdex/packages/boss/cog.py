@@ -16,6 +16,9 @@ from ballsdex.core.utils.transformers import BallEnabledTransform
 from ballsdex.core.utils.transformers import SpecialTransform, BallTransform
 from ballsdex.core.utils.transformers import SpecialEnabledTransform
 from ballsdex.core.utils.paginator import FieldPageSource, Pages
+from ballsdex.core.utils.completion import completion_index
+from ballsdex.core.utils.search import instance_search
+from ballsdex.core.utils.players import get_player
 from ballsdex.core.bot import BallsDexBot
 
 if TYPE_CHECKING:
@@ -30,7 +33,6 @@ from ballsdex.core.models import (
     BlacklistedGuild,
     BlacklistedID,
     GuildConfig,
-    Player,
     Trade,
     TradeObject,
     balls,
@@ -657,7 +659,7 @@ class Boss(commands.GroupCog):
             self.lasthitter = 0
             return
         if winner != "None":
-            player, created = await Player.get_or_create(discord_id=bosswinner)
+            player = await get_player(bosswinner)
             special = special = [x for x in specials.values() if x.name == "Boss"][0]
             instance = await BallInstance.create(
                 ball=self.bossball,
@@ -666,6 +668,8 @@ class Boss(commands.GroupCog):
                 attack_bonus=random.randint(-100,1000),
                 health_bonus=random.randint(-100,1000),
             )
+            completion_index.add(player.pk, self.bossball.pk, special.pk)
+            instance_search.invalidate(player.pk)
             await interaction.followup.send(
                 f"Boss successfully concluded", ephemeral=True
             )
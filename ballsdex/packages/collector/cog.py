@@ -9,7 +9,7 @@ from tortoise.exceptions import DoesNotExist
 from typing import TYPE_CHECKING, Optional, cast
 
 from ballsdex.core.models import BallInstance
-from ballsdex.core.models import Player
+from ballsdex.core.models import CollectionSummary
 from ballsdex.core.models import specials
 from ballsdex.core.models import balls
 from ballsdex.core.utils.transformers import BallEnabledTransform
@@ -18,9 +18,12 @@ from ballsdex.core.utils.transformers import SpecialEnabledTransform
 from ballsdex.core.utils.transformers import SpecialTransform
 from ballsdex.core.utils.buttons import ConfirmChoiceView
 from ballsdex.core.utils.paginator import FieldPageSource, Pages
+from ballsdex.core.utils.completion import completion_index
+from ballsdex.core.utils.search import instance_search
 from ballsdex.core.utils.sorting import SortingChoices, sort_balls
 from ballsdex.settings import settings
 from ballsdex.core.utils.logging import log_action
+from ballsdex.core.utils.players import get_player
 
 if TYPE_CHECKING:
     from ballsdex.core.bot import BallsDexBot
@@ -96,7 +99,6 @@ class Collector(commands.GroupCog):
             return
         assert interaction.guild
         filters = {}
-        checkfilter = {}
         if countryball:
             filters["ball"] = countryball
         await interaction.response.defer(ephemeral=True, thinking=True)
@@ -104,10 +106,9 @@ class Collector(commands.GroupCog):
             special = [x for x in specials.values() if x.name == "Diamond"][0]
         else:
             special = [x for x in specials.values() if x.name == "Collector"][0]
-        checkfilter["special"] = special
-        checkfilter["player__discord_id"] = interaction.user.id
-        checkfilter["ball"] = countryball
-        checkcounter = await BallInstance.filter(**checkfilter).count()
+        player = await get_player(interaction.user.id)
+        totals = await CollectionSummary.totals(player, ball=countryball, special=special)
+        checkcounter = totals.total
         if checkcounter >= 1:
             if diamond:
                 return await interaction.followup.send(
@@ -117,11 +118,10 @@ class Collector(commands.GroupCog):
                 return await interaction.followup.send(
                     f"You already have a {countryball.country} collector card."
                 )
-        filters["player__discord_id"] = interaction.user.id
         if diamond:
             shiny = [x for x in specials.values() if x.name == "Shiny"][0]
             filters["special"] = shiny
-        balls = await BallInstance.filter(**filters).count()
+        balls = (await CollectionSummary.totals(player, **filters)).total
 
         if diamond:
             collector_number = int(int((dgradient*(countryball.rarity-dT1Rarity) + dT1Req)/dRoundingOption)*dRoundingOption)
@@ -129,7 +129,6 @@ class Collector(commands.GroupCog):
             collector_number = int(int((gradient*(countryball.rarity-T1Rarity) + T1Req)/RoundingOption)*RoundingOption)
 
         country = f"{countryball.country}"
-        player, created = await Player.get_or_create(discord_id=interaction.user.id)
         if balls >= collector_number:
             if diamond:
                 diamondtext = " diamond"
@@ -146,6 +145,8 @@ class Collector(commands.GroupCog):
             health_bonus=0,
             special=special,
             )
+            completion_index.add(player.pk, countryball.pk, special.pk if special else None)
+            instance_search.invalidate(player.pk)
         else:
             if diamond:
                 text0 = "diamond"
@@ -272,7 +273,6 @@ class Collector(commands.GroupCog):
         for ball in balls:
             player = await self.bot.fetch_user(int(f"{ball.player}"))
             checkfilter = {}
-            checkfilter["player__discord_id"] = int(f"{ball.player}")
             checkfilter["ball"] = ball.ball
             
             if diamond:
@@ -281,7 +281,7 @@ class Collector(commands.GroupCog):
             else:
                 shinytext = ""
                 
-            checkballs = await BallInstance.filter(**checkfilter).count()
+            checkballs = (await CollectionSummary.totals(ball.player, **checkfilter)).total
             if checkballs == 1:
                 collectiblename = settings.collectible_name
             else:
@@ -345,6 +345,8 @@ class Collector(commands.GroupCog):
                 return
             for b in unmetlist:
                 await b.delete()
+                completion_index.invalidate(b.player_id)
+                instance_search.invalidate(b.player_id)
             if unmetcount == 1:
                 collectiblename1 = settings.collectible_name
             else:
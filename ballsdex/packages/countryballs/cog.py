@@ -1,13 +1,17 @@
+import asyncio
 import importlib
 import logging
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING
 
 import discord
 from discord.ext import commands
 from tortoise.exceptions import DoesNotExist
 
+from ballsdex.core.metrics import live_spawns, live_spawns_size
 from ballsdex.core.models import GuildConfig
-from ballsdex.packages.countryballs.countryball import BallSpawnView
+from ballsdex.core.utils.spawns import spawn_store
+from ballsdex.packages.countryballs.countryball import BallSpawnView, CatchButton, expire_spawn
+from ballsdex.packages.countryballs.dispatch import SpawnDispatcher
 from ballsdex.packages.countryballs.spawn import BaseSpawnManager
 from ballsdex.settings import settings
 
@@ -16,6 +20,9 @@ if TYPE_CHECKING:
 
 log = logging.getLogger("ballsdex.packages.countryballs")
 
+# seconds between two checks of expired spawns
+EXPIRY_INTERVAL = 5
+
 
 class CountryBallsSpawner(commands.Cog):
     spawn_manager: BaseSpawnManager
@@ -23,7 +30,9 @@ class CountryBallsSpawner(commands.Cog):
     def __init__(self, bot: "BallsDexBot"):
         self.bot = bot
         self.cache: dict[int, int] = {}
-        self.countryball_cls = BallSpawnView
+        # class spawning countryballs and handling their catch button, replace this with a
+        # subclass of BallSpawnView to customize spawns (it isn't a discord.ui.View)
+        self.countryball_cls: type[BallSpawnView] = BallSpawnView
 
         module_path, class_name = settings.spawn_manager.rsplit(".", 1)
         module = importlib.import_module(module_path)
@@ -31,6 +40,41 @@ class CountryBallsSpawner(commands.Cog):
         importlib.reload(module)
         spawn_manager = getattr(module, class_name)
         self.spawn_manager = spawn_manager(bot)
+        self.dispatcher = SpawnDispatcher(
+            self,
+            queue_size=settings.spawn_queue_size,
+            workers=settings.spawn_workers,
+            global_rate=settings.spawn_global_rate,
+            channel_interval=settings.spawn_channel_interval,
+            max_wait=settings.spawn_max_wait,
+        )
+        self.expiry_task: asyncio.Task[None] | None = None
+
+    async def cog_load(self):
+        self.bot.add_dynamic_items(CatchButton)
+        self.dispatcher.start()
+        self.expiry_task = asyncio.create_task(self.expire_spawns(), name="spawn-expiry")
+
+    async def cog_unload(self):
+        self.dispatcher.stop()
+        if self.expiry_task:
+            self.expiry_task.cancel()
+        self.bot.remove_dynamic_items(CatchButton)
+
+    async def expire_spawns(self):
+        """
+        Close the spawns that timed out. Records are kept in `spawn_store` across reloads, the
+        next instance of the cog picks them up.
+        """
+        while True:
+            await asyncio.sleep(EXPIRY_INTERVAL)
+            for spawn_id, record in spawn_store.pop_expired():
+                try:
+                    await expire_spawn(self.bot, spawn_id, record)
+                except Exception:
+                    log.exception(f"Failed to expire spawn in channel {record.channel_id}")
+            live_spawns.set(len(spawn_store))
+            live_spawns_size.set(spawn_store.memory_size())
 
     async def load_cache(self):
         i = 0
@@ -62,15 +106,8 @@ class CountryBallsSpawner(commands.Cog):
             result, algo = result
         else:
             algo = settings.spawn_manager
-
-        channel = guild.get_channel(self.cache[guild.id])
-        if not channel:
-            log.warning(f"Lost channel {self.cache[guild.id]} for guild {guild.name}.")
-            del self.cache[guild.id]
-            return
-        ball = await BallSpawnView.get_random(self.bot)
-        ball.algo = algo
-        await ball.spawn(cast(discord.TextChannel, channel))
+        # uploading is left to the dispatcher, which spreads bursts of spawns over time
+        self.dispatcher.submit(guild.id, algo)
 
     @commands.Cog.listener()
     async def on_ballsdex_settings_change(
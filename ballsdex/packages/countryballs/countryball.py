@@ -1,28 +1,35 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import math
 import random
+import re
 import string
-from datetime import datetime
+from io import BytesIO
 from typing import TYPE_CHECKING
 
 import discord
-from discord.ui import Button, Modal, TextInput, View, button
-from tortoise.timezone import get_default_timezone
+from discord.ui import Button, DynamicItem, Modal, TextInput, View
+from tortoise import Tortoise
 from tortoise.timezone import now as tortoise_now
 
-from ballsdex.core.metrics import caught_balls
+from ballsdex.core.image_generator.wild_cards import wild_card_store
+from ballsdex.core.metrics import caught_balls, spawn_upload_size
 from ballsdex.core.models import (
     Ball,
     BallInstance,
     Player,
     Special,
-    Trade,
-    TradeObject,
     balls,
+    normalize_name,
     specials,
 )
+from ballsdex.core.utils.completion import completion_index
+from ballsdex.core.utils.players import get_player
+from ballsdex.core.utils.sampling import spawn_sampler
+from ballsdex.core.utils.search import instance_search
+from ballsdex.core.utils.spawns import SpawnRecord, spawn_store
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
@@ -30,6 +37,129 @@ if TYPE_CHECKING:
 
 log = logging.getLogger("ballsdex.packages.countryballs")
 
+# A catch is a single statement, so it's atomic and costs one round trip to the database.
+# Sub-statements of a query all see the same snapshot, the first catch check cannot see the
+# inserted row. The check is skipped when the player's completion is already in memory.
+INSERT_QUERY = """
+INSERT INTO ballinstance (
+    player_id, ball_id, special_id, attack_bonus, health_bonus, server_id, spawned_time,
+    catch_date, favorite, tradeable, extra_data
+)
+VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11::jsonb)
+RETURNING *
+"""
+CATCH_QUERY = f"""
+WITH previous AS (
+    SELECT EXISTS (SELECT 1 FROM ballinstance WHERE player_id = $1 AND ball_id = $2) AS caught
+), inserted AS ({INSERT_QUERY})
+SELECT inserted.*, NOT previous.caught AS is_new FROM inserted, previous
+"""
+# Transferring an existing instance is registered as a trade to avoid bypasses.
+TRANSFER_STATEMENTS = """
+trade AS (
+    INSERT INTO trade (player1_id, player2_id, date) VALUES ($1, $2, $4) RETURNING id
+), trade_object AS (
+    INSERT INTO tradeobject (trade_id, ballinstance_id, player_id) SELECT id, $3, $1 FROM trade
+), transferred AS (
+    UPDATE ballinstance SET player_id = $2, trade_player_id = $1, locked = NULL WHERE id = $3
+)
+"""
+TRANSFER_ONLY_QUERY = f"WITH {TRANSFER_STATEMENTS} SELECT 1"
+TRANSFER_QUERY = f"""
+WITH previous AS (
+    SELECT EXISTS (SELECT 1 FROM ballinstance WHERE player_id = $2 AND ball_id = $5) AS caught
+), {TRANSFER_STATEMENTS}
+SELECT NOT previous.caught AS is_new FROM previous
+"""
+
+
+class CatchButton(DynamicItem[Button], template=r"spawn:(?P<id>[0-9]+)"):
+    """
+    The button of all spawn messages. Its custom ID holds the ID of the spawn in `spawn_store`,
+    the state needed to catch the countryball is rebuilt from there on click.
+
+    This is registered as a dynamic item by the cog, so a single handler serves every spawn and
+    keeps working across reloads of the package. Clicks are handled by the class configured in
+    the cog's `countryball_cls`.
+    """
+
+    def __init__(self, spawn_id: int, *, disabled: bool = False):
+        super().__init__(
+            Button(
+                style=discord.ButtonStyle.primary,
+                label="Take me :3",
+                custom_id=f"spawn:{spawn_id}",
+                disabled=disabled,
+            )
+        )
+        self.spawn_id = spawn_id
+        self.spawn_view: BallSpawnView | None = None
+
+    @classmethod
+    async def from_custom_id(
+        cls,
+        interaction: discord.Interaction["BallsDexBot"],
+        item: discord.ui.Item,
+        match: re.Match[str],
+        /,  # noqa: W504
+    ):
+        return cls(int(match["id"]))
+
+    async def interaction_check(self, interaction: discord.Interaction["BallsDexBot"], /) -> bool:
+        cog = interaction.client.get_cog("CountryBallsSpawner")
+        view_cls: type[BallSpawnView] = getattr(cog, "countryball_cls", BallSpawnView)
+        record = spawn_store.get(self.spawn_id)
+        if record:
+            self.spawn_view = view_cls.from_record(interaction.client, self.spawn_id, record)
+        if self.spawn_view is None:
+            return await interaction.client.blacklist_check(interaction)
+        return await self.spawn_view.interaction_check(interaction)
+
+    async def callback(self, interaction: discord.Interaction["BallsDexBot"]):
+        view = self.spawn_view
+        if view is None:
+            await interaction.response.send_message(
+                f"This {settings.collectible_name} is not here anymore.", ephemeral=True
+            )
+        elif view.caught:
+            await interaction.response.send_message(
+                f"{interaction.user.mention} was too slow, maybe next time -w-!", ephemeral=True
+            )
+        else:
+            spawn_store.refresh(self.spawn_id)
+            await interaction.response.send_modal(CountryballNamePrompt(view))
+
+
+def catch_view(spawn_id: int, *, disabled: bool = False) -> View:
+    """
+    Build the view attached to a spawn message. It is only used to send the component, clicks
+    are handled by `CatchButton`.
+    """
+    view = View(timeout=None)
+    view.add_item(CatchButton(spawn_id, disabled=disabled))
+    # a finished view is not stored by discord.py when sent
+    view.stop()
+    return view
+
+
+async def expire_spawn(bot: "BallsDexBot", spawn_id: int, record: SpawnRecord):
+    """
+    Disable the button of a spawn that timed out, and unlock the transferred instance if it
+    wasn't caught.
+    """
+    if record.caught:
+        return
+    if record.message_id:
+        message = bot.get_partial_messageable(record.channel_id).get_partial_message(
+            record.message_id
+        )
+        try:
+            await message.edit(view=catch_view(spawn_id, disabled=True))
+        except discord.HTTPException:
+            pass
+    if record.ballinstance_id:
+        await BallInstance.unlock_many((record.ballinstance_id,))
+
 
 class CountryballNamePrompt(Modal, title=f"Catch this {settings.collectible_name}!"):
     name = TextInput(
@@ -58,7 +188,7 @@ class CountryballNamePrompt(Modal, title=f"Catch this {settings.collectible_name
     async def on_submit(self, interaction: discord.Interaction["BallsDexBot"]):
         await interaction.response.defer(thinking=True)
 
-        player, _ = await Player.get_or_create(discord_id=interaction.user.id)
+        player = await get_player(interaction.user.id)
         if self.view.caught:
             slow_message = random.choice(settings.slow_messages).format(
                 user=interaction.user.mention,
@@ -105,14 +235,24 @@ class CountryballNamePrompt(Modal, title=f"Catch this {settings.collectible_name
             self.view.get_catch_message(ball, has_caught_before, interaction.user.mention),
             allowed_mentions=discord.AllowedMentions(users=player.can_be_mentioned),
         )
-        await interaction.followup.edit_message(self.view.message.id, view=self.view)
+        await interaction.followup.edit_message(
+            self.view.record.message_id, view=catch_view(self.view.spawn_id, disabled=True)
+        )
 
 
-class BallSpawnView(View):
+class BallSpawnView:
     """
-    BallSpawnView is a Discord UI view that represents the spawning and interaction logic for a
-    countryball in the BallsDex bot. It handles user interactions, spawning mechanics, and
-    countryball catching logic.
+    BallSpawnView represents the spawning and catching logic for a countryball in the BallsDex
+    bot. It handles spawning mechanics and countryball catching logic, while clicks on the spawn
+    message are routed by `CatchButton`.
+
+    Once spawned, the state is kept in a `SpawnRecord` of `spawn_store`, and a new object is
+    built from it for each interaction.
+
+    This is not a `discord.ui.View` anymore: spawn messages only carry a `CatchButton`, and
+    views are not kept in memory. Subclasses set as the cog's `countryball_cls` may override
+    `interaction_check`, `spawn`, `catch_ball` and the messages, but extra components must be
+    registered as dynamic items of their own.
 
     Attributes
     ----------
@@ -122,7 +262,12 @@ class BallSpawnView(View):
     algo: str | None
         The algorithm used for spawning, used for metrics.
     message: discord.Message
-        The Discord message associated with this view once created with `spawn`.
+        The Discord message associated with this view once created with `spawn`. Missing when
+        rebuilt from a record.
+    record: SpawnRecord
+        The state of the spawn, stored in `spawn_store` once spawned.
+    spawn_id: int
+        The ID of the spawn in `spawn_store`, 0 until spawned.
     caught: bool
         Whether the countryball has been caught yet.
     ballinstance: BallInstance | None
@@ -139,39 +284,54 @@ class BallSpawnView(View):
     """
 
     def __init__(self, bot: "BallsDexBot", model: Ball):
-        super().__init__()
         self.bot = bot
         self.model = model
         self.algo: str | None = None
         self.message: discord.Message = discord.utils.MISSING
-        self.caught = False
+        self.record = SpawnRecord(ball_id=model.pk)
+        self.spawn_id = 0
         self.ballinstance: BallInstance | None = None
         self.special: Special | None = None
         self.atk_bonus: int | None = None
         self.hp_bonus: int | None = None
         self.og_id: int
 
+    @property
+    def caught(self) -> bool:
+        return self.record.caught
+
     async def interaction_check(self, interaction: discord.Interaction["BallsDexBot"], /) -> bool:
+        """
+        Whether a click on the catch button should be handled, checked before `CatchButton`
+        opens the prompt.
+        """
         return await interaction.client.blacklist_check(interaction)
 
-    async def on_timeout(self):
-        self.catch_button.disabled = True
-        if self.message:
-            try:
-                await self.message.edit(view=self)
-            except discord.HTTPException:
-                pass
-        if self.ballinstance and not self.caught:
-            await self.ballinstance.unlock()
-
-    @button(style=discord.ButtonStyle.primary, label="Take me :3")
-    async def catch_button(self, interaction: discord.Interaction["BallsDexBot"], button: Button):
-        if self.caught:
-            await interaction.response.send_message(
-                f"{interaction.user.mention} was too slow, maybe next time -w-!", ephemeral=True
-            )
-        else:
-            await interaction.response.send_modal(CountryballNamePrompt(self))
+    @caught.setter
+    def caught(self, value: bool):
+        self.record.caught = value
+
+    @classmethod
+    def from_record(
+        cls, bot: "BallsDexBot", spawn_id: int, record: SpawnRecord
+    ) -> BallSpawnView | None:
+        """
+        Rebuild the view of a live spawn from its record, `None` if its ball was removed from
+        the cache meanwhile. The transferred instance, if any, is fetched when caught.
+        """
+        model = balls.get(record.ball_id)
+        if model is None:
+            return None
+        view = cls(bot, model)
+        view.record = record
+        view.spawn_id = spawn_id
+        view.algo = record.algo
+        view.special = specials.get(record.special_id) if record.special_id else None
+        view.atk_bonus = record.atk_bonus
+        view.hp_bonus = record.hp_bonus
+        if record.og_id is not None:
+            view.og_id = record.og_id
+        return view
 
     @classmethod
     async def from_existing(cls, bot: "BallsDexBot", ball_instance: BallInstance):
@@ -182,11 +342,9 @@ class BallSpawnView(View):
         The ball instance must be unlocked from trades, and will be locked until caught or timed
         out.
         """
-        if await ball_instance.is_locked():
-            raise RuntimeError("This countryball is locked for a trade")
-
         # prevent countryball from being traded while spawned
-        await ball_instance.lock_for_trade()
+        if await BallInstance.lock_many([ball_instance.pk]):
+            raise RuntimeError("This countryball is locked for a trade")
 
         view = cls(bot, ball_instance.ball)
         view.ballinstance = ball_instance
@@ -198,42 +356,14 @@ class BallSpawnView(View):
         """
         Get a new instance with a random countryball. Rarity values are taken into account.
         """
-        countryballs = list(filter(lambda m: m.enabled, balls.values()))
-        if not countryballs:
-            raise RuntimeError("No ball to spawn")
-        rarities = [x.rarity for x in countryballs]
-        cb = random.choices(population=countryballs, weights=rarities, k=1)[0]
-        return cls(bot, cb)
+        return cls(bot, spawn_sampler.get_ball())
 
     @property
     def name(self):
         return self.model.country
 
     def get_random_special(self) -> Special | None:
-        population = [
-            x
-            for x in specials.values()
-            # handle null start/end dates with infinity times
-            if (x.start_date or datetime.min.replace(tzinfo=get_default_timezone()))
-            <= tortoise_now()
-            <= (x.end_date or datetime.max.replace(tzinfo=get_default_timezone()))
-        ]
-
-        if not population:
-            return None
-
-        common_weight: float = 1 - sum(x.rarity for x in population)
-
-        if common_weight < 0:
-            common_weight = 0
-
-        weights = [x.rarity for x in population] + [common_weight]
-        # None is added representing the common countryball
-        special: Special | None = random.choices(
-            population=population + [None], weights=weights, k=1
-        )[0]
-
-        return special
+        return spawn_sampler.get_special()
 
     async def spawn(self, channel: discord.TextChannel) -> bool:
         """
@@ -256,9 +386,7 @@ class BallSpawnView(View):
             source = string.ascii_uppercase + string.ascii_lowercase + string.ascii_letters
             return "".join(random.choices(source, k=15))
 
-        extension = self.model.wild_card.split(".")[-1]
         file_location = "./admin_panel/media/" + self.model.wild_card
-        file_name = f"nt_{generate_random_name()}.{extension}"
         try:
             permissions = channel.permissions_for(channel.guild.me)
             if permissions.attach_files and permissions.send_messages:
@@ -268,11 +396,38 @@ class BallSpawnView(View):
                     collectibles=settings.plural_collectible_name,
                 )
 
-                self.message = await channel.send(
-                    spawn_message,
-                    view=self,
-                    file=discord.File(file_location, filename=file_name),
-                )
+                stored = wild_card_store.peek(file_location)
+                if stored is None:
+                    # a miss reads and possibly recompresses the file, off the event loop
+                    stored = await asyncio.get_running_loop().run_in_executor(
+                        None, wild_card_store.get, file_location
+                    )
+                content, extension = stored
+                file_name = f"nt_{generate_random_name()}.{extension}"
+                record = self.record
+                record.algo = self.algo
+                record.channel_id = channel.id
+                record.special_id = self.special.pk if self.special else None
+                record.atk_bonus = self.atk_bonus
+                record.hp_bonus = self.hp_bonus
+                if self.ballinstance:
+                    record.ballinstance_id = self.ballinstance.pk
+                    record.og_id = self.og_id
+                # stored before sending, the button may be clicked before the message returns
+                spawn_id = spawn_store.add(record)
+                try:
+                    self.message = await channel.send(
+                        spawn_message,
+                        view=catch_view(spawn_id),
+                        file=discord.File(BytesIO(content), filename=file_name),
+                    )
+                except BaseException:
+                    spawn_store.remove(spawn_id)
+                    raise
+                self.spawn_id = spawn_id
+                record.message_id = self.message.id
+                record.spawned_at = self.message.created_at
+                spawn_upload_size.observe(len(content))
                 return True
             else:
                 log.error("Missing permission to spawn ball in channel %s.", channel)
@@ -289,27 +444,15 @@ class BallSpawnView(View):
         Parameters
         ----------
         text: str
-            The text entered by the user. It will be lowered and stripped of enclosing blank
-            characters.
+            The text entered by the user. It will be normalized with `normalize_name` (case,
+            quotes, Unicode forms and enclosing blank characters are ignored).
 
         Returns
         -------
         bool
             Whether the name matches or not.
         """
-        if self.model.catch_names:
-            possible_names = (self.name.lower(), *self.model.catch_names.split(";"))
-        else:
-            possible_names = (self.name.lower(),)
-        if self.model.translations:
-            possible_names += tuple(x.lower() for x in self.model.translations.split(";"))
-        cname = text.lower().strip()
-        # Remove fancy unicode characters like ’ to replace to '
-        cname = cname.replace("\u2019", "'")
-        cname = cname.replace("\u2018", "'")
-        cname = cname.replace("\u201c", '"')
-        cname = cname.replace("\u201d", '"')
-        return cname in possible_names
+        return normalize_name(text) in self.model.catch_names_index
 
     async def catch_ball(
         self,
@@ -349,21 +492,34 @@ class BallSpawnView(View):
         if self.caught:
             raise RuntimeError("This ball was already caught!")
         self.caught = True
-        self.catch_button.disabled = True
-        player = player or (await Player.get_or_create(discord_id=user.id))[0]
-        is_new = not await BallInstance.filter(player=player, ball=self.model).exists()
-
+        player = player or await get_player(user.id)
+        connection = Tortoise.get_connection("default")
+        completion = completion_index.peek(player.pk)
+
+        if self.ballinstance is None and self.record.ballinstance_id:
+            self.ballinstance = await BallInstance.get(
+                id=self.record.ballinstance_id
+            ).prefetch_related("player")
         if self.ballinstance:
             # if specified, do not create a countryball but switch owner
-            # it's important to register this as a trade to avoid bypass
-            trade = await Trade.create(player1=self.ballinstance.player, player2=player)
-            await TradeObject.create(
-                trade=trade, player=self.ballinstance.player, ballinstance=self.ballinstance
+            previous_owner = self.ballinstance.player
+            params = [previous_owner.pk, player.pk, self.ballinstance.pk, tortoise_now()]
+            if completion is None:
+                rows = await connection.execute_query_dict(
+                    TRANSFER_QUERY, params + [self.model.pk]
+                )
+                is_new = rows[0]["is_new"]
+            else:
+                is_new = not completion.has(self.model.pk)
+                await connection.execute_query(TRANSFER_ONLY_QUERY, params)
+            completion_index.invalidate(previous_owner.pk)
+            instance_search.invalidate(previous_owner.pk, player.pk)
+            completion_index.add(
+                player.pk, self.model.pk, self.ballinstance.special_id, traded=True
             )
-            self.ballinstance.trade_player = self.ballinstance.player
+            self.ballinstance.trade_player = previous_owner
             self.ballinstance.player = player
             self.ballinstance.locked = None  # type: ignore
-            await self.ballinstance.save(update_fields=("player_id", "trade_player_id", "locked"))
             return self.ballinstance, is_new
 
         # stat may vary by +/- 20% of base stat
@@ -384,15 +540,44 @@ class BallSpawnView(View):
         if not special:
             special = self.get_random_special()
 
-        ball = await BallInstance.create(
+        ball = BallInstance(
             ball=self.model,
             player=player,
             special=special,
             attack_bonus=bonus_attack,
             health_bonus=bonus_health,
             server_id=guild.id if guild else None,
-            spawned_time=self.message.created_at,
+            spawned_time=self.record.spawned_at,
+            catch_date=tortoise_now(),
         )
+        params = [
+            player.pk,
+            self.model.pk,
+            special.pk if special else None,
+            bonus_attack,
+            bonus_health,
+            ball.server_id,
+            ball.spawned_time,
+            ball.catch_date,
+            # the remaining columns take the defaults of the model
+            ball.favorite,
+            ball.tradeable,
+            BallInstance._meta.fields_map["extra_data"].to_db_value(ball.extra_data, ball),
+        ]
+        if completion is None:
+            row = (await connection.execute_query_dict(CATCH_QUERY, params))[0]
+            is_new = row.pop("is_new")
+        else:
+            is_new = not completion.has(self.model.pk)
+            row = (await connection.execute_query_dict(INSERT_QUERY, params))[0]
+        # build the model from the inserted row like a query would, then attach the relations
+        # already in memory
+        ball = BallInstance._init_from_db(**row)
+        ball.ball = self.model
+        ball.player = player
+        ball.special = special
+        completion_index.add(player.pk, self.model.pk, special.pk if special else None)
+        instance_search.invalidate(player.pk)
 
         # logging and stats
         log.log(
@@ -0,0 +1,209 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, cast
+
+import discord
+
+from ballsdex.core.metrics import spawn_queue_depth, spawn_queue_dropped, spawn_queue_wait
+
+if TYPE_CHECKING:
+    from ballsdex.core.bot import BallsDexBot
+    from ballsdex.packages.countryballs.cog import CountryBallsSpawner
+
+log = logging.getLogger("ballsdex.packages.countryballs.dispatch")
+
+
+@dataclass(slots=True)
+class SpawnRequest:
+    """
+    A spawn decided by the spawn manager, waiting to be sent.
+
+    Attributes
+    ----------
+    guild_id: int
+        The guild where the countryball should spawn.
+    algo: str
+        The spawn algorithm that took the decision, used for metrics.
+    queued_at: float
+        Event loop time of the decision.
+    """
+
+    guild_id: int
+    algo: str
+    queued_at: float
+
+
+class UploadBudget:
+    """
+    Spaces out uploads to a steady rate, with bursts of up to `burst` uploads. This is the
+    generic cell rate algorithm, a token bucket that only needs one timestamp.
+
+    Each call to `reserve` takes a slot and returns how long to wait before using it, so
+    concurrent callers are spread over time instead of all waiting for the same token.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.interval = 1 / rate
+        self.tolerance = (max(burst, 1) - 1) * self.interval
+        self.theoretical_time = 0.0
+
+    def reserve(self, now: float) -> float:
+        start = max(self.theoretical_time, now)
+        self.theoretical_time = start + self.interval
+        return max(start - self.tolerance - now, 0)
+
+
+class SpawnDispatcher:
+    """
+    Sends the spawns decided by the spawn manager from a bounded queue, drained by a few worker
+    tasks, instead of uploading from the message handler.
+
+    Uploads go through a global budget shared by all workers, so a burst of spawns across many
+    guilds doesn't hit Discord's rate limits. Each channel also receives at most one spawn every
+    `channel_interval` seconds, later spawns are deferred. When the request is taken out of the
+    queue, the spawn is dropped if it waited for more than `max_wait` seconds, or if the spawn
+    channel is not available anymore.
+
+    Parameters
+    ----------
+    cog: CountryBallsSpawner
+        The cog owning the dispatcher, its cache of spawn channels is read when dispatching.
+    queue_size: int
+        Maximum number of pending spawns, new spawns are dropped past this number.
+    workers: int
+        Number of tasks sending spawns concurrently.
+    global_rate: float
+        Maximum number of spawns sent per second, across all guilds.
+    channel_interval: float
+        Minimum number of seconds between two spawns in the same channel.
+    max_wait: float
+        Number of seconds after which a pending spawn is considered stale.
+    """
+
+    def __init__(
+        self,
+        cog: "CountryBallsSpawner",
+        *,
+        queue_size: int,
+        workers: int,
+        global_rate: float,
+        channel_interval: float,
+        max_wait: float,
+    ):
+        self.cog = cog
+        self.bot: "BallsDexBot" = cog.bot
+        self.queue: asyncio.Queue[SpawnRequest] = asyncio.Queue(maxsize=queue_size)
+        self.workers = workers
+        self.budget = UploadBudget(global_rate, burst=max(int(global_rate), 1))
+        self.channel_interval = channel_interval
+        self.max_wait = max_wait
+        # channel ID -> loop time until which the channel doesn't accept another spawn
+        self.busy_channels: dict[int, float] = {}
+        self.tasks: list[asyncio.Task[None]] = []
+        self.deferred: set[asyncio.TimerHandle] = set()
+
+    def start(self):
+        self.tasks = [
+            asyncio.create_task(self._work(), name=f"spawn-dispatch-{i}")
+            for i in range(self.workers)
+        ]
+        log.debug(f"Started spawn dispatcher with {self.workers} workers.")
+
+    def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        for handle in self.deferred:
+            handle.cancel()
+        self.tasks.clear()
+        self.deferred.clear()
+        spawn_queue_depth.set(0)
+
+    def submit(self, guild_id: int, algo: str) -> bool:
+        """
+        Queue a spawn for the guild. Returns `False` if the queue is full and the spawn was
+        dropped.
+        """
+        request = SpawnRequest(guild_id, algo, asyncio.get_running_loop().time())
+        return self._put(request)
+
+    def _put(self, request: SpawnRequest) -> bool:
+        try:
+            self.queue.put_nowait(request)
+        except asyncio.QueueFull:
+            log.warning(f"Spawn queue is full, dropped spawn in guild {request.guild_id}.")
+            spawn_queue_dropped.labels(reason="full").inc()
+            return False
+        spawn_queue_depth.set(self.queue.qsize())
+        return True
+
+    def _defer(self, request: SpawnRequest, delay: float):
+        def requeue():
+            self.deferred.discard(handle)
+            self._put(request)
+
+        handle = asyncio.get_running_loop().call_later(delay, requeue)
+        self.deferred.add(handle)
+
+    def _release_channel(self, channel_id: int, until: float):
+        # a newer spawn may have extended the delay meanwhile
+        if self.busy_channels.get(channel_id) == until:
+            del self.busy_channels[channel_id]
+
+    def _get_channel(self, guild_id: int) -> discord.TextChannel | None:
+        if guild_id in self.bot.blacklist_guild:
+            return None
+        channel_id = self.cog.cache.get(guild_id)
+        guild = self.bot.get_guild(guild_id)
+        if channel_id is None or guild is None:
+            return None
+        channel = guild.get_channel(channel_id)
+        if not channel:
+            log.warning(f"Lost channel {channel_id} for guild {guild.name}.")
+            del self.cog.cache[guild_id]
+            return None
+        return cast(discord.TextChannel, channel)
+
+    async def dispatch(self, request: SpawnRequest):
+        """
+        Send one spawn, or drop or defer it according to the budgets.
+        """
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if now - request.queued_at > self.max_wait:
+            spawn_queue_dropped.labels(reason="stale").inc()
+            return
+        channel = self._get_channel(request.guild_id)
+        if channel is None:
+            spawn_queue_dropped.labels(reason="channel").inc()
+            return
+
+        busy_until = self.busy_channels.get(channel.id, 0)
+        if busy_until > now:
+            self._defer(request, busy_until - now)
+            return
+        until = now + self.channel_interval
+        self.busy_channels[channel.id] = until
+        loop.call_later(self.channel_interval, self._release_channel, channel.id, until)
+
+        delay = self.budget.reserve(now)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        spawn_queue_wait.observe(loop.time() - request.queued_at)
+
+        ball = await self.cog.countryball_cls.get_random(self.bot)
+        ball.algo = request.algo
+        if not await ball.spawn(channel):
+            spawn_queue_dropped.labels(reason="failed").inc()
+
+    async def _work(self):
+        while True:
+            request = await self.queue.get()
+            spawn_queue_depth.set(self.queue.qsize())
+            try:
+                await self.dispatch(request)
+            except Exception:
+                log.exception(f"Failed to dispatch spawn in guild {request.guild_id}")
+                spawn_queue_dropped.labels(reason="failed").inc()
+            finally:
+                self.queue.task_done()
@@ -0,0 +1,178 @@
+"""
+Replay of message streams through spawn managers, without Discord.
+
+Messages are replayed on an event loop with a virtual clock: sleeping advances the time
+instantly, so hours of messages are replayed in seconds while timers behave exactly as they
+would live.
+
+`compare` is used by the tests to check that `SpawnManager` takes the same spawn decisions as
+the previous implementation, which held a lock while sleeping to rate limit messages.
+"""
+
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Callable, cast
+
+from ballsdex.packages.countryballs.spawn import BaseSpawnManager
+
+if TYPE_CHECKING:
+    import discord
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    """
+    An event loop whose clock jumps to the next scheduled timer whenever there is nothing else
+    to run.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._virtual_time = 0.0
+
+    def time(self) -> float:
+        return self._virtual_time
+
+    def _run_once(self):
+        if not self._ready and self._scheduled:  # type: ignore
+            self._virtual_time = max(self._virtual_time, self._scheduled[0].when())  # type: ignore
+        super()._run_once()  # type: ignore
+
+
+def run_virtual(coro):
+    """
+    Run the coroutine to completion on a new `VirtualClockLoop`.
+    """
+    loop = VirtualClockLoop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def make_message(
+    guild_id: int,
+    member_count: int,
+    author_id: int,
+    content: str,
+    offset: float,
+    *,
+    message_content: bool = True,
+) -> "discord.Message":
+    """
+    Build an object with the attributes of `discord.Message` read by spawn managers. `offset` is
+    the number of seconds between `START` and the creation of the message.
+    """
+    return cast(
+        "discord.Message",
+        SimpleNamespace(
+            id=random.getrandbits(63),
+            guild=SimpleNamespace(id=guild_id, member_count=member_count),
+            author=SimpleNamespace(id=author_id, bot=False),
+            content=content,
+            created_at=START + timedelta(seconds=offset),
+            webhook_id=None,
+            _state=SimpleNamespace(intents=SimpleNamespace(message_content=message_content)),
+        ),
+    )
+
+
+def synthetic_stream(
+    guilds: int, hours: float, seed: int = 0, member_counts: tuple[int, ...] = (3, 50, 500, 5000)
+) -> list["discord.Message"]:
+    """
+    Generate the messages of `guilds` guilds over `hours` hours, sorted by creation time.
+
+    Each guild gets a random size among `member_counts`, a random number of chatters with
+    uneven activity, and a random message rate. Messages arrive in bursts of conversation
+    separated by silences.
+    """
+    rng = random.Random(seed)
+    duration = hours * 3600
+    messages: list[tuple[float, "discord.Message"]] = []
+    for guild_id in range(1, guilds + 1):
+        member_count = rng.choice(member_counts)
+        chatters = [rng.getrandbits(60) for _ in range(rng.randint(1, min(member_count, 30)))]
+        # a few chatters send most messages
+        weights = [1 / (i + 1) for i in range(len(chatters))]
+        rate = rng.uniform(0.01, 0.5)  # messages per second while active
+        offset = rng.uniform(0, 600)
+        while offset < duration:
+            for _ in range(rng.randint(5, 200)):
+                offset += rng.expovariate(rate)
+                author = rng.choices(chatters, weights)[0]
+                content = "x" * int(rng.lognormvariate(3, 1))
+                messages.append(
+                    (offset, make_message(guild_id, member_count, author, content, offset))
+                )
+            offset += rng.expovariate(1 / 3600)
+    messages.sort(key=lambda x: x[0])
+    return [x for offset, x in messages if offset < duration]
+
+
+def offset_of(message: "discord.Message") -> float:
+    return (message.created_at - START).total_seconds()
+
+
+async def replay(
+    manager: BaseSpawnManager,
+    messages: list["discord.Message"],
+    on_result: Callable[["discord.Message", bool, float], None] | None = None,
+) -> list[bool]:
+    """
+    Feed the messages to the manager at the time they were created, relative to the current
+    time of the loop. Return whether each message triggered a spawn.
+
+    `on_result` is called for each message with the decision and the real time taken by
+    `handle_message`. Sleeping is instantaneous on a virtual clock, but if the manager awaits,
+    the time of the other tasks running meanwhile is included.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    decisions = [False] * len(messages)
+
+    async def handle(index: int, message: "discord.Message"):
+        t1 = time.perf_counter()
+        result = await manager.handle_message(message)
+        duration = time.perf_counter() - t1
+        decisions[index] = result is not False
+        if on_result:
+            on_result(message, decisions[index], duration)
+
+    # only unfinished tasks are kept, like the tasks of discord.py's event handlers
+    pending: set[asyncio.Task[None]] = set()
+    for index, message in enumerate(messages):
+        delay = start + offset_of(message) - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(handle(index, message))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    await asyncio.gather(*pending)
+    return decisions
+
+
+async def compare(
+    managers: tuple[type[BaseSpawnManager], type[BaseSpawnManager]],
+    messages: list["discord.Message"],
+    seed: int = 0,
+) -> tuple[list[bool], list[bool]]:
+    """
+    Replay the messages through both managers and return their decisions.
+
+    Guilds are independent, so each guild is replayed separately with the random generator
+    seeded identically for both managers, making the random thresholds match.
+    """
+    results: tuple[list[bool], list[bool]] = ([], [])
+    by_guild = sorted(messages, key=lambda x: x.guild.id)  # type: ignore
+    for guild_id, guild_messages in groupby(by_guild, key=lambda x: x.guild.id):  # type: ignore
+        guild_messages = list(guild_messages)
+        for manager_class, result in zip(managers, results):
+            random.seed(f"{seed}-{guild_id}")
+            result.extend(await replay(manager_class(None), guild_messages))  # type: ignore
+    return results
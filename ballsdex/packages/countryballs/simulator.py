@@ -0,0 +1,291 @@
+"""
+Offline simulator of spawn managers, to evaluate an algorithm before deploying it.
+
+Usage: "python3 -m ballsdex.packages.countryballs.simulator --help"
+
+Recorded or synthetic message streams are replayed through any `BaseSpawnManager` subclass on
+a virtual clock (see `replay`), without Discord nor the database. For each manager, this
+reports:
+
+- the number of spawns per guild-hour, overall and by guild size
+- the latency of `handle_message` per message
+- the memory retained by the manager per tracked guild
+
+Recorded streams are CSV files with one message per line and the following columns, without
+header: unix timestamp, guild ID, member count, author ID, content length.
+
+Managers are instanciated without a bot, they must not use it in `handle_message`.
+"""
+
+import argparse
+import csv
+import gc
+import importlib
+import random
+import statistics
+import sys
+import tracemalloc
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from ballsdex.packages.countryballs.replay import (
+    make_message,
+    offset_of,
+    replay,
+    run_virtual,
+    synthetic_stream,
+)
+from ballsdex.packages.countryballs.spawn import BaseSpawnManager
+
+if TYPE_CHECKING:
+    import discord
+
+
+@dataclass
+class SimulationResult:
+    """
+    Measurements of a manager over a message stream.
+
+    Attributes
+    ----------
+    manager: str
+        Name of the manager class.
+    messages: int
+        Number of messages replayed.
+    guilds: int
+        Number of distinct guilds in the stream.
+    hours: float
+        Duration of the stream.
+    spawns: int
+        Total number of spawns.
+    spawns_by_size: dict[int, tuple[int, int]]
+        Maps a member count to the number of guilds of that size and their total spawns.
+    latencies: list[float]
+        Time taken by `handle_message` for each message, in seconds.
+    memory: int
+        Bytes still allocated by the manager at the end of the stream.
+    """
+
+    manager: str
+    messages: int
+    guilds: int
+    hours: float
+    spawns: int = 0
+    spawns_by_size: dict[int, tuple[int, int]] = field(default_factory=dict)
+    latencies: list[float] = field(default_factory=list)
+    memory: int = 0
+
+    @property
+    def spawn_rate(self) -> float:
+        """
+        Spawns per guild-hour.
+        """
+        return self.spawns / (self.guilds * self.hours) if self.guilds and self.hours else 0
+
+    @property
+    def memory_per_guild(self) -> float:
+        return self.memory / self.guilds if self.guilds else 0
+
+    def latency_percentiles(self) -> tuple[float, float, float]:
+        """
+        Return the 50th, 95th and 99th percentiles of the latency in microseconds.
+        """
+        if len(self.latencies) < 2:
+            value = self.latencies[0] * 1e6 if self.latencies else 0
+            return value, value, value
+        quantiles = statistics.quantiles(self.latencies, n=100, method="inclusive")
+        return quantiles[49] * 1e6, quantiles[94] * 1e6, quantiles[98] * 1e6
+
+
+def load_manager(path: str) -> type[BaseSpawnManager]:
+    """
+    Import a manager class from its path, as written in the "spawn-manager" setting.
+    """
+    module_path, class_name = path.rsplit(".", 1)
+    manager_class = getattr(importlib.import_module(module_path), class_name)
+    if not isinstance(manager_class, type) or not issubclass(manager_class, BaseSpawnManager):
+        raise TypeError(f"{path} is not a subclass of BaseSpawnManager")
+    return manager_class
+
+
+def load_stream(path: str) -> list["discord.Message"]:
+    """
+    Read a recorded message stream, see the module's documentation for the format.
+    Timestamps are made relative to the first message.
+    """
+    rows: list[tuple[float, int, int, int, int]] = []
+    with open(path, newline="") as file:
+        for row in csv.reader(file):
+            if not row:
+                continue
+            timestamp, guild_id, member_count, author_id, length = row
+            rows.append(
+                (float(timestamp), int(guild_id), int(member_count), int(author_id), int(length))
+            )
+    if not rows:
+        return []
+    rows.sort(key=lambda x: x[0])
+    start = rows[0][0]
+    return [
+        make_message(guild_id, member_count, author_id, "x" * length, timestamp - start)
+        for timestamp, guild_id, member_count, author_id, length in rows
+    ]
+
+
+def save_stream(path: str, messages: list["discord.Message"]):
+    """
+    Write a message stream in the format read by `load_stream`.
+    """
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        for message in messages:
+            writer.writerow(
+                (
+                    f"{message.created_at.timestamp():.3f}",
+                    message.guild.id,  # type: ignore
+                    message.guild.member_count,  # type: ignore
+                    message.author.id,
+                    len(message.content),
+                )
+            )
+
+
+async def _retained_memory(manager_class: type[BaseSpawnManager], messages: list) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        manager = manager_class(None)  # type: ignore
+        decisions = await replay(manager, messages)
+        gc.collect()
+        # only the list of decisions is allocated outside of the manager
+        memory = tracemalloc.get_traced_memory()[0] - baseline - sys.getsizeof(decisions)
+        del manager
+        return max(memory, 0)
+    finally:
+        tracemalloc.stop()
+
+
+def simulate(
+    manager_class: type[BaseSpawnManager], messages: list["discord.Message"], seed: int = 0
+) -> SimulationResult:
+    """
+    Replay the messages through a new instance of the manager and measure it.
+
+    The stream is replayed twice with the same random seed: once to measure the decisions and
+    latency, then once with memory tracing, which slows down allocations.
+    """
+    member_counts: dict[int, int] = {}
+    for message in messages:
+        member_counts[message.guild.id] = message.guild.member_count  # type: ignore
+    hours = offset_of(messages[-1]) / 3600 if messages else 0
+    result = SimulationResult(
+        manager=manager_class.__name__,
+        messages=len(messages),
+        guilds=len(member_counts),
+        hours=hours,
+    )
+
+    spawns: Counter[int] = Counter()
+
+    def on_result(message: "discord.Message", decision: bool, duration: float):
+        result.latencies.append(duration)
+        if decision:
+            spawns[message.guild.id] += 1  # type: ignore
+
+    random.seed(seed)
+    run_virtual(replay(manager_class(None), messages, on_result))  # type: ignore
+    result.spawns = sum(spawns.values())
+
+    by_size: defaultdict[int, list[int]] = defaultdict(lambda: [0, 0])
+    for guild_id, member_count in member_counts.items():
+        by_size[member_count][0] += 1
+        by_size[member_count][1] += spawns[guild_id]
+    result.spawns_by_size = {k: (v[0], v[1]) for k, v in sorted(by_size.items())}
+
+    random.seed(seed)
+    result.memory = run_virtual(_retained_memory(manager_class, messages))
+    return result
+
+
+def report(result: SimulationResult):
+    p50, p95, p99 = result.latency_percentiles()
+    print(result.manager)
+    print(
+        f"  spawns      {result.spawns} total, {result.spawn_rate:.3f} per guild-hour "
+        f"(one every {60 / result.spawn_rate if result.spawn_rate else float('inf'):.0f} min)"
+    )
+    for member_count, (guilds, spawns) in result.spawns_by_size.items():
+        rate = spawns / (guilds * result.hours) if result.hours else 0
+        print(f"    {member_count:>7} members  {guilds:>5} guilds  {rate:.3f} per guild-hour")
+    print(f"  latency     p50 {p50:.2f}µs   p95 {p95:.2f}µs   p99 {p99:.2f}µs")
+    print(
+        f"  memory      {result.memory / 1024:.1f}KB, "
+        f"{result.memory_per_guild:.0f} bytes per tracked guild"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate spawn managers on a message stream.")
+    parser.add_argument(
+        "managers",
+        nargs="*",
+        default=["ballsdex.packages.countryballs.spawn.SpawnManager"],
+        help="Paths of the spawn manager classes to compare.",
+    )
+    parser.add_argument("--stream", help="Recorded message stream to replay, as CSV.")
+    parser.add_argument("--save-stream", help="Write the replayed stream to this CSV file.")
+    parser.add_argument("--guilds", type=int, default=100, help="Number of synthetic guilds.")
+    parser.add_argument("--hours", type=float, default=24, help="Duration of the stream.")
+    parser.add_argument(
+        "--member-counts",
+        type=int,
+        nargs="+",
+        default=[3, 50, 500, 5000],
+        help="Sizes of the synthetic guilds, picked randomly.",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the stream and managers.")
+    gates = parser.add_argument_group(
+        "gates", "Exit with status 1 if a manager goes over one of these limits."
+    )
+    gates.add_argument("--max-spawn-rate", type=float, help="Spawns per guild-hour.")
+    gates.add_argument("--max-latency", type=float, help="p95 latency in microseconds.")
+    gates.add_argument("--max-memory", type=float, help="Bytes per tracked guild.")
+    args = parser.parse_args()
+
+    managers = [load_manager(x) for x in args.managers]
+    if args.stream:
+        messages = load_stream(args.stream)
+    else:
+        messages = synthetic_stream(
+            args.guilds, args.hours, args.seed, member_counts=tuple(args.member_counts)
+        )
+    if not messages:
+        parser.error("The message stream is empty.")
+    if args.save_stream:
+        save_stream(args.save_stream, messages)
+
+    guilds = len(set(x.guild.id for x in messages))  # type: ignore
+    print(
+        f"{len(messages)} messages in {guilds} guilds over {offset_of(messages[-1]) / 3600:.1f}h"
+    )
+
+    failed = False
+    for manager_class in managers:
+        result = simulate(manager_class, messages, args.seed)
+        report(result)
+        if args.max_spawn_rate is not None and result.spawn_rate > args.max_spawn_rate:
+            print(f"  FAILED: spawn rate above {args.max_spawn_rate}")
+            failed = True
+        if args.max_latency is not None and result.latency_percentiles()[1] > args.max_latency:
+            print(f"  FAILED: p95 latency above {args.max_latency}µs")
+            failed = True
+        if args.max_memory is not None and result.memory_per_guild > args.max_memory:
+            print(f"  FAILED: memory above {args.max_memory} bytes per guild")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
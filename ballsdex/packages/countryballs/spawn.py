@@ -1,15 +1,19 @@
 import asyncio
 import logging
 import random
+import sys
 from abc import abstractmethod
-from collections import deque, namedtuple
+from array import array
+from collections import Counter, OrderedDict
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
+from itertools import islice
 from typing import TYPE_CHECKING, Literal
 
 import discord
 from discord.utils import format_dt
 
+from ballsdex.core.metrics import spawn_state_size, spawn_tracked_guilds
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
@@ -19,7 +23,17 @@ log = logging.getLogger("ballsdex.packages.countryballs")
 
 SPAWN_CHANCE_RANGE = (40, 55)
 
-CachedMessage = namedtuple("CachedMessage", ["content", "author_id"])
+MESSAGE_CACHE_SIZE = 100
+# guilds without messages for this long are forgotten to save memory
+# past 10 hours, the time-based progress alone always reaches the threshold, so an evicted guild
+# is recreated with a cooldown started COOLDOWN_TTL ago and spawns on its next counted message,
+# like it would have if it was kept
+COOLDOWN_TTL = 12 * 3600
+# evicted guilds are remembered for this long, then treated like new guilds
+EVICTED_TTL = 7 * 24 * 3600
+EVICTION_INTERVAL = 60
+# minimum number of seconds between two messages increasing the counter
+RATE_LIMIT = 10
 
 
 class BaseSpawnManager:
@@ -76,12 +90,15 @@ class BaseSpawnManager:
         raise NotImplementedError
 
 
-@dataclass
+@dataclass(slots=True)
 class SpawnCooldown:
     """
     Represents the default spawn internal system per guild. Contains the counters that will
     determine if a countryball should be spawned next or not.
 
+    One of these exists for every active guild, so it only stores what the algorithm needs. The
+    recent messages are kept in fixed-size ring buffers instead of a deque of objects.
+
     Attributes
     ----------
     time: datetime
@@ -92,61 +109,161 @@ class SpawnCooldown:
     threshold: int
         The number `scaled_message_count` has to reach for spawn.
         Determined randomly with `SPAWN_CHANCE_RANGE`
-    lock: asyncio.Lock
-        Used to ratelimit messages and ignore fast spam
-    message_cache: ~collections.deque[CachedMessage]
-        A list of recent messages used to reduce the spawn chance when too few different chatters
-        are present. Limited to the 100 most recent messages in the guild.
+    last_increase: float
+        Event loop time of the last message that increased the counter. Messages sent less than
+        `RATE_LIMIT` seconds after that are ignored, to avoid rewarding fast spam.
+    authors: array.array[int]
+        Ring buffer of the authors of the `MESSAGE_CACHE_SIZE` most recent messages, used to
+        reduce the spawn chance when too few different chatters are present.
+    lengths: bytearray
+        Ring buffer of the length of those messages, capped at 255.
+    cached_messages: int
+        Number of messages currently stored in the ring buffers.
+    position: int
+        Index of the ring buffers where the next message will be written.
+    author_counts: ~collections.Counter[int]
+        Number of messages of each author within the cache, kept in sync by `cache_message`.
+    short_messages: int
+        Number of messages within the cache shorter than 5 characters.
+    last_seen: float
+        Event loop time of the last message, used to evict idle guilds.
     """
 
     time: datetime
     # initialize partially started, to reduce the dead time after starting the bot
     scaled_message_count: float = field(default=SPAWN_CHANCE_RANGE[0] // 2)
     threshold: int = field(default_factory=lambda: random.randint(*SPAWN_CHANCE_RANGE))
-    lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False)
-    message_cache: deque[CachedMessage] = field(default_factory=lambda: deque(maxlen=100))
+    last_increase: float = field(default=float("-inf"), init=False)
+    authors: array = field(
+        default_factory=lambda: array("Q", bytes(8 * MESSAGE_CACHE_SIZE)), init=False
+    )
+    lengths: bytearray = field(default_factory=lambda: bytearray(MESSAGE_CACHE_SIZE), init=False)
+    cached_messages: int = field(default=0, init=False)
+    position: int = field(default=0, init=False)
+    author_counts: Counter[int] = field(default_factory=Counter, init=False)
+    short_messages: int = field(default=0, init=False)
+    last_seen: float = field(default=0, init=False)
 
     def reset(self, time: datetime):
         self.scaled_message_count = 1.0
         self.threshold = random.randint(*SPAWN_CHANCE_RANGE)
-        try:
-            self.lock.release()
-        except RuntimeError:  # lock is not acquired
-            pass
         self.time = time
 
-    async def increase(self, message: discord.Message) -> bool:
-        # this is a deque, not a list
-        # its property is that, once the max length is reached (100 for us),
-        # the oldest element is removed, thus we only have the last 100 messages in memory
-        self.message_cache.append(
-            CachedMessage(content=message.content, author_id=message.author.id)
+    def cache_message(self, length: int, author_id: int):
+        """
+        Store a message in the ring buffers and update the counters in constant time. Once the
+        buffers are full, the oldest message is overwritten.
+        """
+        position = self.position
+        if self.cached_messages == MESSAGE_CACHE_SIZE:
+            evicted = self.authors[position]
+            count = self.author_counts[evicted] - 1
+            if count:
+                self.author_counts[evicted] = count
+            else:
+                del self.author_counts[evicted]
+            if self.lengths[position] < 5:
+                self.short_messages -= 1
+        else:
+            self.cached_messages += 1
+        self.authors[position] = author_id
+        self.lengths[position] = min(length, 255)
+        self.position = (position + 1) % MESSAGE_CACHE_SIZE
+        self.author_counts[author_id] += 1
+        if length < 5:
+            self.short_messages += 1
+
+    @property
+    def distinct_authors(self) -> int:
+        return len(self.author_counts)
+
+    def author_share(self, author_id: int) -> float:
+        """
+        Return the proportion of the full cache (not only the current messages) occupied by this
+        author.
+        """
+        return self.author_counts[author_id] / MESSAGE_CACHE_SIZE
+
+    def is_rate_limited(self, now: float | None = None) -> bool:
+        """
+        Whether a message sent now would be ignored because of `RATE_LIMIT`.
+        """
+        if now is None:
+            now = asyncio.get_running_loop().time()
+        return now - self.last_increase < RATE_LIMIT
+
+    def memory_size(self) -> int:
+        """
+        Return an estimation of the memory used by this object in bytes.
+        """
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.authors)
+            + sys.getsizeof(self.lengths)
+            + sys.getsizeof(self.author_counts)
         )
 
-        if self.lock.locked():
-            return False
+    async def increase(self, message: discord.Message) -> bool:
+        self.cache_message(len(message.content), message.author.id)
 
-        async with self.lock:
-            message_multiplier = 1 * 3
-            if message.guild.member_count < 5 or message.guild.member_count > 1000:  # type: ignore
-                message_multiplier /= 2
-            if message._state.intents.message_content and len(message.content) < 5:
-                message_multiplier /= 2
-            if len(set(x.author_id for x in self.message_cache)) < 4 or (
-                len(list(filter(lambda x: x.author_id == message.author.id, self.message_cache)))
-                / self.message_cache.maxlen  # type: ignore
-                > 0.4
-            ):
-                message_multiplier /= 2
-            self.scaled_message_count += message_multiplier
-            await asyncio.sleep(10)
+        now = asyncio.get_running_loop().time()
+        if self.is_rate_limited(now):
+            return False
+        self.last_increase = now
+
+        message_multiplier = 1 * 3
+        if message.guild.member_count < 5 or message.guild.member_count > 1000:  # type: ignore
+            message_multiplier /= 2
+        if message._state.intents.message_content and len(message.content) < 5:
+            message_multiplier /= 2
+        if self.distinct_authors < 4 or self.author_share(message.author.id) > 0.4:
+            message_multiplier /= 2
+        self.scaled_message_count += message_multiplier
         return True
 
 
 class SpawnManager(BaseSpawnManager):
+    cooldown_class: type[SpawnCooldown] = SpawnCooldown
+
     def __init__(self, bot: "BallsDexBot"):
         super().__init__(bot)
-        self.cooldowns: dict[int, SpawnCooldown] = {}
+        # ordered from the least to the most recently active guild
+        self.cooldowns: OrderedDict[int, SpawnCooldown] = OrderedDict()
+        # time of eviction of the guilds evicted for inactivity, to tell them apart from new
+        # guilds, ordered from the oldest to the most recent eviction
+        self.evicted: OrderedDict[int, float] = OrderedDict()
+        self.last_eviction = 0.0
+
+    def evict_idle(self):
+        """
+        Forget the guilds without messages for more than `COOLDOWN_TTL` seconds and the guilds
+        evicted more than `EVICTED_TTL` seconds ago, and update the metrics of the tracked guilds.
+        """
+        now = asyncio.get_running_loop().time()
+        self.last_eviction = now
+        while self.cooldowns:
+            guild_id, cooldown = next(iter(self.cooldowns.items()))
+            if now - cooldown.last_seen < COOLDOWN_TTL:
+                break
+            del self.cooldowns[guild_id]
+            self.evicted[guild_id] = now
+        while self.evicted:
+            guild_id, evicted_at = next(iter(self.evicted.items()))
+            if now - evicted_at < EVICTED_TTL:
+                break
+            del self.evicted[guild_id]
+        spawn_tracked_guilds.set(len(self.cooldowns))
+        if self.cooldowns:
+            # all cooldowns have the same layout, only the authors counter varies
+            sample = list(islice(reversed(self.cooldowns.values()), 100))
+            average = sum(x.memory_size() for x in sample) / len(sample)
+            spawn_state_size.set(
+                average * len(self.cooldowns)
+                + sys.getsizeof(self.cooldowns)
+                + sys.getsizeof(self.evicted)
+            )
+        else:
+            spawn_state_size.set(sys.getsizeof(self.cooldowns) + sys.getsizeof(self.evicted))
 
     async def handle_message(self, message: discord.Message) -> bool:
         guild = message.guild
@@ -155,8 +272,18 @@ class SpawnManager(BaseSpawnManager):
 
         cooldown = self.cooldowns.get(guild.id, None)
         if not cooldown:
-            cooldown = SpawnCooldown(message.created_at)
+            if self.evicted.pop(guild.id, None) is not None:
+                cooldown = self.cooldown_class(
+                    message.created_at - timedelta(seconds=COOLDOWN_TTL)
+                )
+            else:
+                cooldown = self.cooldown_class(message.created_at)
             self.cooldowns[guild.id] = cooldown
+        else:
+            self.cooldowns.move_to_end(guild.id)
+        cooldown.last_seen = asyncio.get_running_loop().time()
+        if cooldown.last_seen - self.last_eviction > EVICTION_INTERVAL:
+            self.evict_idle()
 
         delta_t = (message.created_at - cooldown.time).total_seconds()
         # change how the threshold varies according to the member count, while nuking farm servers
@@ -227,20 +354,12 @@ class SpawnManager(BaseSpawnManager):
         penalities: list[str] = []
         if guild.member_count < 5 or guild.member_count > 1000:
             penalities.append("Server has less than 5 or more than 1000 members")
-        if any(len(x.content) < 5 for x in cooldown.message_cache):
+        if cooldown.short_messages:
             penalities.append("Some cached messages are less than 5 characters long")
 
-        authors_set = set(x.author_id for x in cooldown.message_cache)
-        low_chatters = len(authors_set) < 4
+        low_chatters = cooldown.distinct_authors < 4
         # check if one author has more than 40% of messages in cache
-        major_chatter = any(
-            (
-                len(list(filter(lambda x: x.author_id == author, cooldown.message_cache)))
-                / cooldown.message_cache.maxlen  # type: ignore
-                > 0.4
-            )
-            for author in authors_set
-        )
+        major_chatter = any(cooldown.author_share(x) > 0.4 for x in cooldown.author_counts)
         # this mess is needed since either conditions make up to a single penality
         if low_chatters:
             if not major_chatter:
@@ -266,7 +385,7 @@ class SpawnManager(BaseSpawnManager):
         embed.description = (
             f"Manager initiated **{format_dt(cooldown.time, style='R')}**\n"
             f"Initial number of points to reach: **{cooldown.threshold}**\n"
-            f"Message cache length: **{len(cooldown.message_cache)}**\n\n"
+            f"Message cache length: **{cooldown.cached_messages}**\n\n"
             f"Time-based multiplier: **x{multiplier}** *({range} members)*\n"
             "*This affects how much the number of points to reach reduces over time*\n"
             f"Penality multiplier: **x{penality_multiplier}**\n"
@@ -275,7 +394,7 @@ class SpawnManager(BaseSpawnManager):
         )
 
         informations: list[str] = []
-        if cooldown.lock.locked():
+        if cooldown.is_rate_limited():
             informations.append("The manager is currently on cooldown.")
         if delta < 600:
             informations.append(
@@ -12,6 +12,7 @@ from tortoise.expressions import Q
 from ballsdex.core.models import (
     BallInstance,
     Block,
+    CollectionSummary,
     DonationPolicy,
     FriendPolicy,
     Friendship,
@@ -20,6 +21,7 @@ from ballsdex.core.models import (
 from ballsdex.core.models import Player as PlayerModel
 from ballsdex.core.models import PrivacyPolicy, Trade, TradeCooldownPolicy, TradeObject, balls
 from ballsdex.core.utils.buttons import ConfirmChoiceView
+from ballsdex.core.utils.completion import bits_to_ids, completion_index, ids_to_bits
 from ballsdex.core.utils.enums import (
     DONATION_POLICY_MAP,
     FRIEND_POLICY_MAP,
@@ -28,6 +30,9 @@ from ballsdex.core.utils.enums import (
 )
 from ballsdex.core.utils.enums import TRADE_COOLDOWN_POLICY_MAP as TRADE_POLICY_MAP
 from ballsdex.core.utils.paginator import FieldPageSource, Pages
+from ballsdex.core.utils.players import get_player, get_player_or_none, player_cache
+from ballsdex.core.utils.relations import relation_index
+from ballsdex.core.utils.search import instance_search
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
@@ -71,14 +76,15 @@ class Player(commands.GroupCog):
         policy: PrivacyPolicy
             The new privacy policy to choose.
         """
-        player, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
+        player = await get_player(interaction.user.id)
         if policy == PrivacyPolicy.SAME_SERVER and not self.bot.intents.members:
             await interaction.response.send_message(
                 "I need the `members` intent to use this policy.", ephemeral=True
             )
             return
         player.privacy_policy = PrivacyPolicy(policy.value)
-        await player.save()
+        await player.save(update_fields=("privacy_policy",))
+        player_cache.put(player)
         await interaction.response.send_message(
             f"Your privacy policy has been set to **{policy.name}**.", ephemeral=True
         )
@@ -107,8 +113,7 @@ class Player(commands.GroupCog):
         policy: DonationPolicy
             The new policy for accepting donations
         """
-        player, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
-        player.donation_policy = DonationPolicy(policy.value)
+        player = await get_player(interaction.user.id)
         if policy.value == DonationPolicy.ALWAYS_ACCEPT:
             await interaction.response.send_message(
                 "Setting updated, you will now receive all donated "
@@ -137,7 +142,10 @@ class Player(commands.GroupCog):
         else:
             await interaction.response.send_message("Invalid input!", ephemeral=True)
             return
-        await player.save()  # do not save if the input is invalid
+        # the player is shared by the cache, only change it once the input is validated
+        player.donation_policy = DonationPolicy(policy.value)
+        await player.save(update_fields=("donation_policy",))
+        player_cache.put(player)
 
     @policy.command()
     @app_commands.choices(
@@ -157,9 +165,10 @@ class Player(commands.GroupCog):
         policy: MentionPolicy
             The new policy for mentions
         """
-        player, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
+        player = await get_player(interaction.user.id)
         player.mention_policy = policy
-        await player.save()
+        await player.save(update_fields=("mention_policy",))
+        player_cache.put(player)
         await interaction.response.send_message(
             f"Your mention policy has been set to **{policy.name.lower()}**.", ephemeral=True
         )
@@ -180,9 +189,10 @@ class Player(commands.GroupCog):
         policy: FriendPolicy
             The new policy for friend requests.
         """
-        player, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
+        player = await get_player(interaction.user.id)
         player.friend_policy = policy
-        await player.save()
+        await player.save(update_fields=("friend_policy",))
+        player_cache.put(player)
         await interaction.response.send_message(
             f"Your friend request policy has been set to **{policy.name.lower()}**.",
             ephemeral=True,
@@ -208,9 +218,10 @@ class Player(commands.GroupCog):
         policy: TradeCooldownPolicy
             The new policy for trade acceptance cooldown.
         """
-        player, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
+        player = await get_player(interaction.user.id)
         player.trade_cooldown_policy = policy
-        await player.save()
+        await player.save(update_fields=("trade_cooldown_policy",))
+        player_cache.put(player)
         await interaction.response.send_message(
             f"Your trade acceptance cooldown policy has been set to **{policy.name.lower()}**.",
             ephemeral=True,
@@ -228,8 +239,13 @@ class Player(commands.GroupCog):
         await view.wait()
         if view.value is None or not view.value:
             return
-        player, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
+        player = await get_player(interaction.user.id, bypass_cache=True)
         await player.delete()
+        player_cache.invalidate(player.discord_id)
+        # friendships and blocks of the player are gone, on the other side too
+        relation_index.clear()
+        completion_index.invalidate(player.pk)
+        instance_search.invalidate(player.pk)
 
     @friend.command(name="add")
     async def friend_add(
@@ -243,8 +259,8 @@ class Player(commands.GroupCog):
         user: discord.User
             The user you want to add as a friend.
         """
-        player1, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
-        player2, _ = await PlayerModel.get_or_create(discord_id=user.id)
+        player1 = await get_player(interaction.user.id)
+        player2 = await get_player(user.id)
 
         if player1 == player2:
             await interaction.response.send_message(
@@ -321,7 +337,8 @@ class Player(commands.GroupCog):
             self.active_friend_requests[(player1.discord_id, player2.discord_id)] = False
             return
 
-        await Friendship.create(player1=player1, player2=player2)
+        friendship = await Friendship.create(player1=player1, player2=player2)
+        relation_index.add_friend(player1, player2, friendship.since)
         self.active_friend_requests[(player1.discord_id, player2.discord_id)] = False
 
     @friend.command(name="remove")
@@ -336,8 +353,8 @@ class Player(commands.GroupCog):
         user: discord.User
             The user you want to remove as a friend.
         """
-        player1, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
-        player2, _ = await PlayerModel.get_or_create(discord_id=user.id)
+        player1 = await get_player(interaction.user.id)
+        player2 = await get_player(user.id)
 
         if player1 == player2:
             await interaction.response.send_message("You cannot remove yourself.", ephemeral=True)
@@ -357,6 +374,7 @@ class Player(commands.GroupCog):
                 (Q(player1=player1) & Q(player2=player2))
                 | (Q(player1=player2) & Q(player2=player1))
             ).delete()
+            relation_index.remove_friend(player1, player2)
             await interaction.response.send_message(
                 f"{user.name} has been removed as a friend.", ephemeral=True
             )
@@ -366,14 +384,8 @@ class Player(commands.GroupCog):
         """
         View all your friends.
         """
-        player, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
-
-        friendships = (
-            await Friendship.filter(Q(player1=player) | Q(player2=player))
-            .select_related("player1", "player2")
-            .order_by("since")
-            .all()
-        )
+        player = await get_player(interaction.user.id)
+        friendships = (await relation_index.get(player.pk)).friends
 
         if not friendships:
             await interaction.response.send_message(
@@ -383,13 +395,8 @@ class Player(commands.GroupCog):
 
         entries: list[tuple[str, str]] = []
 
-        for idx, relation in enumerate(friendships, start=1):
-            if relation.player1 == player:
-                friend = relation.player2
-            else:
-                friend = relation.player1
-
-            since = format_dt(relation.since, style="f")
+        for idx, friend in enumerate(friendships.values(), start=1):
+            since = format_dt(friend.since, style="f")
             entries.append(
                 ("", f"**{idx}.** <@{friend.discord_id}> ({friend.discord_id})\nSince: {since}")
             )
@@ -412,8 +419,8 @@ class Player(commands.GroupCog):
         user: discord.User
             The user you want to block.
         """
-        player1, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
-        player2, _ = await PlayerModel.get_or_create(discord_id=user.id)
+        player1 = await get_player(interaction.user.id)
+        player2 = await get_player(user.id)
 
         await interaction.response.defer(ephemeral=True, thinking=True)
 
@@ -456,8 +463,10 @@ class Player(commands.GroupCog):
                     (Q(player1=player1) & Q(player2=player2))
                     | (Q(player1=player2) & Q(player2=player1))
                 ).delete()
+                relation_index.remove_friend(player1, player2)
 
-        await Block.create(player1=player1, player2=player2)
+        block = await Block.create(player1=player1, player2=player2)
+        relation_index.add_block(player1, player2, block.date)
         await interaction.followup.send(f"You have now blocked {user.name}.", ephemeral=True)
 
     @blocked.command(name="remove")
@@ -472,8 +481,8 @@ class Player(commands.GroupCog):
         user: discord.User
             The user you want to unblock.
         """
-        player1, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
-        player2, _ = await PlayerModel.get_or_create(discord_id=user.id)
+        player1 = await get_player(interaction.user.id)
+        player2 = await get_player(user.id)
 
         if player1 == player2:
             await interaction.response.send_message("You cannot unblock yourself.", ephemeral=True)
@@ -489,6 +498,7 @@ class Player(commands.GroupCog):
             return
         else:
             await Block.filter((Q(player1=player1) & Q(player2=player2))).delete()
+            relation_index.remove_block(player1, player2)
             await interaction.response.send_message(
                 f"{user.name} has been unblocked.", ephemeral=True
             )
@@ -498,14 +508,8 @@ class Player(commands.GroupCog):
         """
         View all the users you have blocked.
         """
-        player, _ = await PlayerModel.get_or_create(discord_id=interaction.user.id)
-
-        blocked_relations = (
-            await Block.filter(player1=player)
-            .select_related("player1", "player2")
-            .order_by("date")
-            .all()
-        )
+        player = await get_player(interaction.user.id)
+        blocked_relations = (await relation_index.get(player.pk)).blocked
 
         if not blocked_relations:
             await interaction.response.send_message(
@@ -515,13 +519,8 @@ class Player(commands.GroupCog):
 
         entries: list[tuple[str, str]] = []
 
-        for idx, relation in enumerate(blocked_relations, start=1):
-            if relation.player1 == player:
-                blocked_user = relation.player2
-            else:
-                blocked_user = relation.player1
-
-            since = format_dt(relation.date, style="f")
+        for idx, blocked_user in enumerate(blocked_relations.values(), start=1):
+            since = format_dt(blocked_user.since, style="f")
             entries.append(
                 (
                     "",
@@ -545,23 +544,17 @@ class Player(commands.GroupCog):
         """
         await interaction.response.defer(thinking=True, ephemeral=True)
         try:
-            player = await PlayerModel.get(discord_id=interaction.user.id).prefetch_related(
-                "balls"
-            )
+            player = await get_player(interaction.user.id, create=False)
         except DoesNotExist:
             await interaction.followup.send("You haven't got any info to show!", ephemeral=True)
             return
-        ball = await BallInstance.filter(player=player).prefetch_related("special", "trade_player")
+        totals = await CollectionSummary.totals(player)
 
         user = interaction.user
         bot_countryballs = {x: y.emoji_id for x, y in balls.items() if y.enabled}
         total_countryballs = len(bot_countryballs)
-        owned_countryballs = set(
-            x[0]
-            for x in await player.balls.filter(ball__enabled=True)
-            .distinct()
-            .values_list("ball_id")
-        )
+        completion = await completion_index.get(player.pk)
+        owned_countryballs = bits_to_ids(completion.owned & ids_to_bits(bot_countryballs))
 
         if total_countryballs > 0:
             completion_percentage = (
@@ -570,9 +563,6 @@ class Player(commands.GroupCog):
         else:
             completion_percentage = "0.0%"
 
-        caught_owned = [x for x in ball if x.trade_player is None]
-        balls_owned = [x for x in ball]
-        special = [x for x in ball if x.special is not None]
         trades = await Trade.filter(
             Q(player1__discord_id=interaction.user.id) | Q(player2__discord_id=interaction.user.id)
         ).values_list("player1__discord_id", "player2__discord_id")
@@ -584,10 +574,9 @@ class Player(commands.GroupCog):
             if p2 != interaction.user.id:
                 trade_partners.add(p2)
 
-        friends = await Friendship.filter(
-            Q(player1__discord_id=interaction.user.id) | Q(player2__discord_id=interaction.user.id)
-        ).count()
-        blocks = await Block.filter(player1__discord_id=interaction.user.id).count()
+        relations = await relation_index.get(player.pk)
+        friends = len(relations.friends)
+        blocks = len(relations.blocked)
 
         embed = discord.Embed(
             title=f"**{user.display_name.title()}'s {settings.bot_name.title()} Info**",
@@ -605,9 +594,9 @@ class Player(commands.GroupCog):
             f"**Amount of Blocked Users:** {blocks}\n"
             "## Player Stats\n"
             f"**Completion:** {completion_percentage}\n"
-            f"**{settings.collectible_name.title()}s Owned:** {len(balls_owned):,}\n"
-            f"**Caught {settings.collectible_name.title()}s Owned**: {len(caught_owned):,}\n"
-            f"**Special {settings.collectible_name.title()}s:** {len(special):,}\n"
+            f"**{settings.collectible_name.title()}s Owned:** {totals.total:,}\n"
+            f"**Caught {settings.collectible_name.title()}s Owned**: {totals.caught:,}\n"
+            f"**Special {settings.collectible_name.title()}s:** {totals.special_total:,}\n"
             f"**Trades Completed:** {len(trades):,}\n"
             f"**Amount of Users Traded With:** {len(trade_partners):,}"
         )
@@ -627,7 +616,7 @@ class Player(commands.GroupCog):
         """
         Export your player data.
         """
-        player = await PlayerModel.get_or_none(discord_id=interaction.user.id)
+        player = await get_player_or_none(interaction.user.id)
         if player is None:
             await interaction.response.send_message(
                 "You don't have any player data to export.", ephemeral=True
@@ -9,10 +9,11 @@ from discord.ext import commands
 from discord.utils import MISSING
 from tortoise.expressions import Q
 
-from ballsdex.core.models import BallInstance, Player
+from ballsdex.core.models import BallInstance
 from ballsdex.core.models import Trade as TradeModel
 from ballsdex.core.utils.buttons import ConfirmChoiceView
 from ballsdex.core.utils.paginator import Pages
+from ballsdex.core.utils.players import get_player
 from ballsdex.core.utils.sorting import FilteringChoices, SortingChoices, filter_balls, sort_balls
 from ballsdex.core.utils.transformers import (
     BallEnabledTransform,
@@ -118,8 +119,8 @@ class Trade(commands.GroupCog):
                 "You cannot trade with yourself.", ephemeral=True
             )
             return
-        player1, _ = await Player.get_or_create(discord_id=interaction.user.id)
-        player2, _ = await Player.get_or_create(discord_id=user.id)
+        player1 = await get_player(interaction.user.id)
+        player2 = await get_player(user.id)
         blocked = await player1.is_blocked(player2)
         if blocked:
             await interaction.response.send_message(
@@ -146,8 +147,8 @@ class Trade(commands.GroupCog):
             )
             return
 
-        player1, _ = await Player.get_or_create(discord_id=interaction.user.id)
-        player2, _ = await Player.get_or_create(discord_id=user.id)
+        player1 = await get_player(interaction.user.id)
+        player2 = await get_player(user.id)
         if player2.discord_id in self.bot.blacklist:
             await interaction.response.send_message(
                 "You cannot trade with a blacklisted user.", ephemeral=True
@@ -219,7 +220,7 @@ class Trade(commands.GroupCog):
                 ephemeral=True,
             )
             return
-        if await countryball.is_locked():
+        if await BallInstance.lock_many([countryball.pk]):
             await interaction.followup.send(
                 f"This {settings.collectible_name} is currently in an active trade or donation, "
                 "please try again later.",
@@ -227,7 +228,6 @@ class Trade(commands.GroupCog):
             )
             return
 
-        await countryball.lock_for_trade()
         trader.proposal.append(countryball)
         await interaction.followup.send(
             f"{countryball.countryball.country} added.", ephemeral=True
@@ -334,7 +334,7 @@ class Trade(commands.GroupCog):
         await interaction.response.send_message(
             f"{countryball.countryball.country} removed.", ephemeral=True
         )
-        await countryball.unlock()
+        await BallInstance.unlock_many([countryball.pk])
 
     @app_commands.command()
     async def cancel(self, interaction: discord.Interaction["BallsDexBot"]):
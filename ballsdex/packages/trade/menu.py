@@ -9,10 +9,13 @@ import discord
 from discord.ui import Button, View, button
 from discord.utils import format_dt, utcnow
 
-from ballsdex.core.models import BallInstance, Player, Trade, TradeCooldownPolicy, TradeObject
+from ballsdex.core.models import BallInstance, OwnershipError, Trade, TradeCooldownPolicy
 from ballsdex.core.utils import menus
 from ballsdex.core.utils.buttons import ConfirmChoiceView
+from ballsdex.core.utils.completion import completion_index
 from ballsdex.core.utils.paginator import Pages
+from ballsdex.core.utils.players import get_player
+from ballsdex.core.utils.search import instance_search
 from ballsdex.packages.balls.countryballs_paginator import CountryballsViewer
 from ballsdex.packages.trade.display import fill_trade_embed_fields
 from ballsdex.packages.trade.trade_user import TradingUser
@@ -100,9 +103,7 @@ class TradeView(View):
             )
             return
 
-        for countryball in trader.proposal:
-            await countryball.unlock()
-
+        await BallInstance.unlock_many(x.pk for x in trader.proposal)
         trader.proposal.clear()
         await interaction.followup.send("Proposal cleared.", ephemeral=True)
 
@@ -306,8 +307,7 @@ class TradeMenu:
         if self.task:
             self.task.cancel()
 
-        for countryball in self.trader1.proposal + self.trader2.proposal:
-            await countryball.unlock()
+        await BallInstance.unlock_many(x.pk for x in self.trader1.proposal + self.trader2.proposal)
 
         self.current_view.stop()
         for item in self.current_view.children:
@@ -346,38 +346,19 @@ class TradeMenu:
         await self.cancel()
 
     async def perform_trade(self):
-        valid_transferable_countryballs: list[BallInstance] = []
-
-        trade = await Trade.create(player1=self.trader1.player, player2=self.trader2.player)
-
-        for countryball in self.trader1.proposal:
-            await countryball.refresh_from_db()
-            if countryball.player.discord_id != self.trader1.player.discord_id:
-                # This is a invalid mutation, the player is not the owner of the countryball
-                raise InvalidTradeOperation()
-            countryball.player = self.trader2.player
-            countryball.trade_player = self.trader1.player
-            countryball.favorite = False
-            valid_transferable_countryballs.append(countryball)
-            await TradeObject.create(
-                trade=trade, ballinstance=countryball, player=self.trader1.player
-            )
-
-        for countryball in self.trader2.proposal:
-            if countryball.player.discord_id != self.trader2.player.discord_id:
-                # This is a invalid mutation, the player is not the owner of the countryball
-                raise InvalidTradeOperation()
-            countryball.player = self.trader1.player
-            countryball.trade_player = self.trader2.player
-            countryball.favorite = False
-            valid_transferable_countryballs.append(countryball)
-            await TradeObject.create(
-                trade=trade, ballinstance=countryball, player=self.trader2.player
+        try:
+            await Trade.transfer(
+                self.trader1.player,
+                self.trader2.player,
+                self.trader1.proposal,
+                self.trader2.proposal,
             )
-
-        for countryball in valid_transferable_countryballs:
-            await countryball.unlock()
-            await countryball.save()
+        except OwnershipError as e:
+            # This is a invalid mutation, a player is not the owner of the countryball
+            raise InvalidTradeOperation() from e
+        finally:
+            completion_index.invalidate(self.trader1.player.pk, self.trader2.player.pk)
+            instance_search.invalidate(self.trader1.player.pk, self.trader2.player.pk)
 
     async def confirm(self, trader: TradingUser) -> bool:
         """
@@ -533,25 +514,29 @@ class CountryballsSelector(Pages):
                     f"{settings.collectible_name.title()} #{ball.pk:0X} is not tradeable.",
                     ephemeral=True,
                 )
-            if await ball.is_locked():
-                return await interaction.followup.send(
-                    f"{settings.collectible_name.title()} #{ball.pk:0X} is locked "
-                    "for trade and won't be added to the proposal.",
-                    ephemeral=True,
-                )
+        if any(ball.favorite for ball in self.balls_selected):
             view = ConfirmChoiceView(interaction)
-            if ball.favorite:
-                await interaction.followup.send(
-                    f"One or more of the {settings.plural_collectible_name} is favorited, "
-                    "are you sure you want to add it to the trade?",
-                    view=view,
-                    ephemeral=True,
-                )
-                await view.wait()
-                if not view.value:
-                    return
-            trader.proposal.append(ball)
-            await ball.lock_for_trade()
+            await interaction.followup.send(
+                f"One or more of the {settings.plural_collectible_name} is favorited, "
+                "are you sure you want to add it to the trade?",
+                view=view,
+                ephemeral=True,
+            )
+            await view.wait()
+            if not view.value:
+                return
+
+        ids = {ball.pk for ball in self.balls_selected}
+        already_locked = await BallInstance.lock_many(ids)
+        if already_locked:
+            # nothing is added if one of them can't be locked
+            await BallInstance.unlock_many(ids - already_locked)
+            return await interaction.followup.send(
+                f"{settings.collectible_name.title()} #{min(already_locked):0X} is locked "
+                "for trade and won't be added to the proposal.",
+                ephemeral=True,
+            )
+        trader.proposal.extend(self.balls_selected)
         grammar = (
             f"{settings.collectible_name}"
             if len(self.balls_selected) == 1
@@ -626,7 +611,7 @@ class TradeViewMenu(Pages):
         self, interaction: discord.Interaction["BallsDexBot"], item: discord.ui.Select
     ):
         await interaction.response.defer(thinking=True)
-        player = await Player.get(discord_id=int(item.values[0]))
+        player = await get_player(int(item.values[0]), create=False)
         trade, trader = self.cog.get_trade(interaction)
         if trade is None or trader is None:
             return await interaction.followup.send(
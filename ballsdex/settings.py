@@ -1,6 +1,6 @@
 import logging
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import yaml
 
@@ -62,6 +62,37 @@ class Settings:
         List of packages the bot will load upon startup
     spawn_manager: str
         Python path to a class implementing `BaseSpawnManager`, handling cooldowns and anti-cheat
+    card_cache_memory_size: int
+        Maximum size in megabytes of the in-memory cache of generated cards, 0 to disable
+    card_cache_path: str | None
+        Directory where generated cards are cached between restarts, None to disable
+    card_cache_disk_size: int
+        Maximum size in megabytes of the cards cache on disk
+    render_workers: int
+        Number of processes generating cards, 0 to generate them in the bot's process
+    render_queue_size: int
+        Maximum number of cards waiting to be generated before refusing new requests
+    render_assets_size: int
+        Maximum size in megabytes of the decoded media files kept by each card generation process
+    render_profile: dict[str, Any]
+        Encoding of generated cards: format, quality, method and scale
+    render_preview_profile: dict[str, Any]
+        Encoding of cards displayed while browsing paginators, usually faster and smaller
+    wild_cards_memory_size: int
+        Maximum size in megabytes of the spawn images kept in memory
+    wild_card_profile: dict[str, Any]
+        Recompression of spawn images: format, quality, method and size. Empty to send the files
+        unchanged
+    spawn_queue_size: int
+        Maximum number of spawns waiting to be sent, new spawns are dropped past this number
+    spawn_workers: int
+        Number of tasks sending spawns concurrently
+    spawn_global_rate: float
+        Maximum number of spawns sent per second across all guilds
+    spawn_channel_interval: float
+        Minimum number of seconds between two spawns in the same channel
+    spawn_max_wait: float
+        Number of seconds after which a spawn that couldn't be sent is dropped
     webhook_url: str | None
         URL of a Discord webhook for admin notifications
     client_id: str
@@ -112,6 +143,29 @@ class Settings:
 
     spawn_manager: str = "ballsdex.packages.countryballs.spawn.SpawnManager"
 
+    # card rendering
+    card_cache_memory_size: int = 64
+    card_cache_path: str | None = "./cache/cards"
+    card_cache_disk_size: int = 1024
+    render_workers: int = 2
+    render_queue_size: int = 32
+    render_assets_size: int = 256
+    render_profile: dict[str, Any] = field(
+        default_factory=lambda: {"format": "WEBP", "quality": 80, "method": 4, "scale": 1}
+    )
+    render_preview_profile: dict[str, Any] = field(
+        default_factory=lambda: {"format": "WEBP", "quality": 70, "method": 0, "scale": 0.5}
+    )
+    wild_cards_memory_size: int = 128
+    wild_card_profile: dict[str, Any] = field(default_factory=dict)
+
+    # spawn dispatch
+    spawn_queue_size: int = 512
+    spawn_workers: int = 4
+    spawn_global_rate: float = 5
+    spawn_channel_interval: float = 5
+    spawn_max_wait: float = 60
+
     # django admin panel
     webhook_url: str | None = None
     admin_url: str | None = None
@@ -184,6 +238,25 @@ def read_settings(path: "Path"):
         "spawn-manager", "ballsdex.packages.countryballs.spawn.SpawnManager"
     )
 
+    if rendering := content.get("card-rendering"):
+        settings.card_cache_memory_size = rendering.get("cache-memory-size", 64)
+        settings.card_cache_path = rendering.get("cache-path", "./cache/cards")
+        settings.card_cache_disk_size = rendering.get("cache-disk-size", 1024)
+        settings.render_workers = rendering.get("workers", 2)
+        settings.render_queue_size = rendering.get("queue-size", 32)
+        settings.render_assets_size = rendering.get("assets-memory-size", 256)
+        settings.render_profile.update(rendering.get("profile") or {})
+        settings.render_preview_profile.update(rendering.get("preview-profile") or {})
+        settings.wild_cards_memory_size = rendering.get("wild-cards-memory-size", 128)
+        settings.wild_card_profile = rendering.get("wild-card-profile") or {}
+
+    if dispatch := content.get("spawn-dispatch"):
+        settings.spawn_queue_size = dispatch.get("queue-size", 512)
+        settings.spawn_workers = dispatch.get("workers", 4)
+        settings.spawn_global_rate = dispatch.get("global-rate", 5)
+        settings.spawn_channel_interval = dispatch.get("channel-interval", 5)
+        settings.spawn_max_wait = dispatch.get("max-wait", 60)
+
     if admin := content.get("admin-panel"):
         settings.webhook_url = admin.get("webhook-url")
         settings.client_id = admin.get("client-id")
@@ -325,6 +398,79 @@ prometheus:
 
 spawn-manager: ballsdex.packages.countryballs.spawn.SpawnManager
 
+# options for the generation of cards
+card-rendering:
+
+  # generated cards are cached to avoid drawing the same card again
+  # maximum size of the cache kept in memory in megabytes, set to 0 to disable
+  cache-memory-size: 64
+
+  # directory where generated cards are kept between restarts, leave empty to disable
+  cache-path: ./cache/cards
+
+  # maximum size of the cache kept on disk in megabytes
+  cache-disk-size: 1024
+
+  # number of processes generating cards, set to 0 to generate them within the bot's process
+  workers: 2
+
+  # maximum number of cards waiting to be generated, users are asked to retry past this number
+  queue-size: 32
+
+  # backgrounds, icons and artworks are decoded once and kept in memory by each process
+  # generating cards, maximum size of those in megabytes
+  assets-memory-size: 256
+
+  # encoding of the generated cards
+  # format: WEBP, PNG or JPEG
+  # quality: from 0 to 100, ignored for PNG
+  # method: from 0 (fast) to 6 (slow but smaller), only for WEBP
+  # scale: resize factor of the 1500x2000 card, 1 to keep the full size
+  profile:
+    format: WEBP
+    quality: 80
+    method: 4
+    scale: 1
+
+  # encoding of the cards displayed while browsing lists, same options as above
+  preview-profile:
+    format: WEBP
+    quality: 70
+    method: 0
+    scale: 0.5
+
+  # images sent when a countryball spawns are kept in memory instead of being read on each spawn
+  # maximum size of those in megabytes
+  wild-cards-memory-size: 128
+
+  # recompress the images sent when spawning, leave empty to send the files unchanged
+  # same options as above, except scale which is replaced by size, the maximum width and height
+  # in pixels
+  wild-card-profile:
+  #   format: WEBP
+  #   quality: 80
+  #   method: 4
+  #   size: 512
+
+# options for sending spawned countryballs
+# spawns are queued and sent progressively to avoid hitting Discord's rate limits
+spawn-dispatch:
+
+  # maximum number of spawns waiting to be sent, new spawns are dropped past this number
+  queue-size: 512
+
+  # number of spawns sent concurrently
+  workers: 4
+
+  # maximum number of spawns sent per second across all servers
+  global-rate: 5
+
+  # minimum number of seconds between two spawns in the same channel
+  channel-interval: 5
+
+  # spawns waiting for longer than this number of seconds are dropped
+  max-wait: 60
+
 # sentry details, leave empty if you don't know what this is
 # https://sentry.io/ for error tracking
 sentry:
@@ -373,6 +519,8 @@ def update_settings(path: "Path"):
     add_spawn_manager = "spawn-manager" not in content
     add_django = "Admin panel related settings" not in content
     add_sentry = "sentry:" not in content
+    add_card_rendering = "card-rendering:" not in content
+    add_spawn_dispatch = "spawn-dispatch:" not in content
     add_catch_messages = "catch:" not in content
 
     for line in content.splitlines():
@@ -470,6 +618,85 @@ sentry:
     environment: "production"
 """
 
+    if add_card_rendering:
+        content += """
+# options for the generation of cards
+card-rendering:
+
+  # generated cards are cached to avoid drawing the same card again
+  # maximum size of the cache kept in memory in megabytes, set to 0 to disable
+  cache-memory-size: 64
+
+  # directory where generated cards are kept between restarts, leave empty to disable
+  cache-path: ./cache/cards
+
+  # maximum size of the cache kept on disk in megabytes
+  cache-disk-size: 1024
+
+  # number of processes generating cards, set to 0 to generate them within the bot's process
+  workers: 2
+
+  # maximum number of cards waiting to be generated, users are asked to retry past this number
+  queue-size: 32
+
+  # backgrounds, icons and artworks are decoded once and kept in memory by each process
+  # generating cards, maximum size of those in megabytes
+  assets-memory-size: 256
+
+  # encoding of the generated cards
+  # format: WEBP, PNG or JPEG
+  # quality: from 0 to 100, ignored for PNG
+  # method: from 0 (fast) to 6 (slow but smaller), only for WEBP
+  # scale: resize factor of the 1500x2000 card, 1 to keep the full size
+  profile:
+    format: WEBP
+    quality: 80
+    method: 4
+    scale: 1
+
+  # encoding of the cards displayed while browsing lists, same options as above
+  preview-profile:
+    format: WEBP
+    quality: 70
+    method: 0
+    scale: 0.5
+
+  # images sent when a countryball spawns are kept in memory instead of being read on each spawn
+  # maximum size of those in megabytes
+  wild-cards-memory-size: 128
+
+  # recompress the images sent when spawning, leave empty to send the files unchanged
+  # same options as above, except scale which is replaced by size, the maximum width and height
+  # in pixels
+  wild-card-profile:
+  #   format: WEBP
+  #   quality: 80
+  #   method: 4
+  #   size: 512
+"""
+
+    if add_spawn_dispatch:
+        content += """
+# options for sending spawned countryballs
+# spawns are queued and sent progressively to avoid hitting Discord's rate limits
+spawn-dispatch:
+
+  # maximum number of spawns waiting to be sent, new spawns are dropped past this number
+  queue-size: 512
+
+  # number of spawns sent concurrently
+  workers: 4
+
+  # maximum number of spawns sent per second across all servers
+  global-rate: 5
+
+  # minimum number of seconds between two spawns in the same channel
+  channel-interval: 5
+
+  # spawns waiting for longer than this number of seconds are dropped
+  max-wait: 60
+"""
+
     if add_catch_messages:
         content += """
 catch:
@@ -511,6 +738,8 @@ catch:
             add_spawn_manager,
             add_django,
             add_sentry,
+            add_card_rendering,
+            add_spawn_dispatch,
             add_catch_messages,
         )
     ):
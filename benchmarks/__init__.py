@@ -0,0 +1,10 @@
+"""
+Benchmarks for development, they are not part of the bot and not shipped with the package.
+
+Run them from the root of the repository with "python3 -m benchmarks.<name> --help":
+
+- cards: generation and encoding of cards, files sent when spawning
+- catch: database queries of a catch
+- search: searches of balls and instances with the trigram index
+- spawn_cooldown: hot path of the default spawn manager
+"""
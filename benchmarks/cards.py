@@ -0,0 +1,326 @@
+"""
+Benchmark of the card generation and of the files sent when spawning, without the bot or the
+database.
+
+Usage: "python3 -m benchmarks.cards --help"
+
+Synthetic media files for regimes, specials and balls are generated in a temporary directory,
+then the same cards are drawn and encoded with every method, and timings are compared.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, replace
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable, Iterable, TypeVar
+
+import discord
+from PIL import Image
+
+from ballsdex.core.image_generator.assets import asset_store
+from ballsdex.core.image_generator.image_gen import (
+    ARTWORK_SIZE,
+    HEIGHT,
+    ICON_SIZE,
+    WIDTH,
+    CardData,
+    RenderProfile,
+    draw_stats,
+    encode_card,
+    render_base,
+    render_card,
+)
+from ballsdex.core.image_generator.wild_cards import WildCardProfile, WildCardStore
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+T = TypeVar("T")
+
+DEFAULT_FORMATS = ["WEBP", "WEBP:80", "WEBP:60", "PNG", "JPEG:85"]
+
+
+@dataclass
+class Fixtures:
+    """
+    Synthetic inputs of the benchmark.
+
+    Attributes
+    ----------
+    cards: list[CardData]
+        The cards to draw, picked randomly among balls and backgrounds, with random stats.
+    wild_cards: list[str]
+        Paths of the images sent when a ball spawns.
+    """
+
+    cards: list[CardData]
+    wild_cards: list[str]
+
+
+def make_fixtures(
+    directory: Path, balls: int, specials: int, cards: int, seed: int = 0
+) -> Fixtures:
+    """
+    Generate the media files of `balls` fake balls, 2 regimes, 2 economies and `specials`
+    specials in `directory`. `cards` card inputs are picked among them, 1 in 10 using a special
+    background.
+    """
+    rng = random.Random(seed)
+
+    def image(name: str, size: tuple[int, int]) -> str:
+        path = directory / name
+        # smooth noise makes the encoded sizes closer to real artworks than flat colors
+        noise = Image.effect_noise((size[0] // 16, size[1] // 16), rng.randint(40, 100))
+        noise = noise.convert("RGB").resize(size, Image.Resampling.BICUBIC)
+        color = Image.new("RGB", size, tuple(rng.randrange(256) for _ in range(3)))  # type: ignore
+        Image.blend(noise, color, 0.5).convert("RGBA").save(path)
+        return str(path)
+
+    regimes = [image(f"regime-{i}.png", (WIDTH, HEIGHT)) for i in range(2)]
+    special_backgrounds = [image(f"special-{i}.png", (WIDTH, HEIGHT)) for i in range(specials)]
+    icons = [image(f"economy-{i}.png", (512, 512)) for i in range(2)]
+    wild_cards = [image(f"wild-{i}.png", (512, 512)) for i in range(balls)]
+    bases = [
+        CardData(
+            title=f"Ball {i}",
+            capacity_name=f"Ability {i}",
+            capacity_description="Deals heavy damage to every enemy on the field " * 2,
+            credits="benchmark",
+            card_name=f"regime-{i % len(regimes)}",
+            special_credits=None,
+            rarity=None,
+            health=0,
+            attack=0,
+            background=regimes[i % len(regimes)],
+            icon=icons[i % len(icons)],
+            artwork=image(f"artwork-{i}.png", (1400, 800)),
+        )
+        for i in range(balls)
+    ]
+
+    result: list[CardData] = []
+    for base in rng.choices(bases, k=cards):
+        data = replace(base, health=rng.randint(1000, 5000), attack=rng.randint(1000, 5000))
+        if special_backgrounds and rng.random() < 0.1:
+            special = rng.randrange(len(special_backgrounds))
+            data = replace(
+                data,
+                card_name=f"special-{special}",
+                special_credits="benchmark",
+                background=special_backgrounds[special],
+            )
+        result.append(data)
+    return Fixtures(cards=result, wild_cards=wild_cards)
+
+
+def measure(func: Callable[[T], Any], items: Iterable[T]) -> list[float]:
+    """
+    Call `func` on every item and return the time taken by each call.
+    """
+    timings: list[float] = []
+    for item in items:
+        t1 = time.perf_counter()
+        func(item)
+        timings.append(time.perf_counter() - t1)
+    return timings
+
+
+def percentiles(timings: list[float]) -> tuple[float, float]:
+    """
+    Return the 50th and 95th percentiles in milliseconds.
+    """
+    if len(timings) < 2:
+        return timings[0] * 1000, timings[0] * 1000
+    quantiles = statistics.quantiles(timings, n=100, method="inclusive")
+    return quantiles[49] * 1000, quantiles[94] * 1000
+
+
+def peak_rss() -> str:
+    """
+    Return the peak resident memory of this process, if it can be obtained.
+    """
+    if resource is None:
+        return "n/a"
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    if sys.platform == "darwin":
+        usage //= 1024
+    return f"{usage / 1024:.1f}MB"
+
+
+def parse_format(value: str) -> dict[str, Any]:
+    """
+    Turn a "FORMAT[:QUALITY]" string into arguments for `Image.save`.
+    """
+    format, _, quality = value.partition(":")
+    kwargs: dict[str, Any] = {"format": format.upper()}
+    if quality:
+        kwargs["quality"] = int(quality)
+    return kwargs
+
+
+def render_monolithic(data: CardData) -> Image.Image:
+    """
+    Draw the whole card every time, without reusing the base layer. Assets are read from the
+    asset store, or from the disk if it's empty.
+    """
+    image = render_base(data)
+    draw_stats(image, data)
+    return image
+
+
+def encode(image: Image.Image, kwargs: dict[str, Any]) -> bytes:
+    buffer = BytesIO()
+    if kwargs["format"] == "JPEG":
+        image = image.convert("RGB")
+    image.save(buffer, **kwargs)
+    return buffer.getvalue()
+
+
+def read_spawn_file(path: str) -> bytes:
+    """
+    Build the file sent by `BallSpawnView.spawn` and read it the way discord.py does when
+    uploading.
+    """
+    file = discord.File(path, filename="nt_benchmark." + path.split(".")[-1])
+    try:
+        return file.fp.read()
+    finally:
+        file.close()
+
+
+def benchmark(
+    *,
+    balls: int = 10,
+    specials: int = 2,
+    cards: int = 200,
+    encodes: int = 20,
+    spawns: int = 200,
+    formats: list[str] = DEFAULT_FORMATS,
+    assets_size: int = 256,
+    write: Callable[[str], Any] = print,
+):
+    """
+    Run the whole benchmark and write the results line by line with `write`.
+    """
+
+    def report(name: str, timings: list[float], extra: str = ""):
+        p50, p95 = percentiles(timings)
+        write(f"  {name:<16} p50 {p50:8.2f}ms   p95 {p95:8.2f}ms   {extra}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        fixtures = make_fixtures(Path(directory), balls, specials, cards)
+        write(
+            f"{cards} cards of {balls} balls and {specials} specials, {spawns} spawns, "
+            f"peak RSS after fixtures: {peak_rss()}"
+        )
+
+        write("Drawing")
+        # an empty budget stores nothing: every file is read, decoded and fitted again for each
+        # card, like draw_card did before assets and base layers were cached
+        asset_store.resize(0)
+        original = measure(render_monolithic, fixtures.cards)
+        report("original", original)
+
+        asset_store.resize(assets_size * 1024 * 1024)
+        for data in fixtures.cards:
+            asset_store.get(data.background)
+            asset_store.get(data.artwork, ARTWORK_SIZE)
+            if data.icon:
+                asset_store.get(data.icon, ICON_SIZE)
+        monolithic = measure(render_monolithic, fixtures.cards)
+        report("assets cached", monolithic, f"speedup {sum(original) / sum(monolithic):.1f}x")
+        layered = measure(lambda x: render_card(x)[0], fixtures.cards)
+        report(
+            "layered",
+            layered,
+            f"speedup {sum(original) / sum(layered):.1f}x, "
+            f"{sum(monolithic) / sum(layered):.1f}x over cached assets",
+        )
+        write(f"  asset store {asset_store.images.currsize / 1024 / 1024:.1f}MB")
+
+        write("Encoding")
+        encodings = {x: parse_format(x) for x in formats}
+        timings_per_format: dict[str, list[float]] = {x: [] for x in formats}
+        sizes_per_format: dict[str, list[int]] = {x: [] for x in formats}
+        for data in fixtures.cards[:encodes]:
+            image = render_card(data)[0]
+            for value, kwargs in encodings.items():
+                t1 = time.perf_counter()
+                size = len(encode(image, kwargs))
+                timings_per_format[value].append(time.perf_counter() - t1)
+                sizes_per_format[value].append(size)
+            image.close()
+        for value in formats:
+            average = statistics.fmean(sizes_per_format[value]) / 1024
+            report(value, timings_per_format[value], f"avg size {average:8.1f}KB")
+
+        write("Profiles (drawing included)")
+        for name in ("default", "preview"):
+            profile = RenderProfile.from_settings(name)
+            sizes: list[int] = []
+            timings = measure(
+                lambda x: sizes.append(len(encode_card(x, profile))), fixtures.cards[:encodes]
+            )
+            report(name, timings, f"avg size {statistics.fmean(sizes) / 1024:8.1f}KB")
+
+        write("Spawn files")
+        spawn_files = random.Random(0).choices(fixtures.wild_cards, k=spawns)
+        sizes = []
+        timings = measure(lambda x: sizes.append(len(read_spawn_file(x))), spawn_files)
+        report("discord.File", timings, f"avg size {statistics.fmean(sizes) / 1024:8.1f}KB")
+        for name, profile in (
+            ("store", None),
+            ("store WEBP 512", WildCardProfile(size=512)),
+        ):
+            store = WildCardStore(128 * 1024 * 1024, profile)
+            store.refresh(fixtures.wild_cards)
+            sizes = []
+            timings = measure(lambda x: sizes.append(len(store.get(x)[0])), spawn_files)
+            report(name, timings, f"avg size {statistics.fmean(sizes) / 1024:8.1f}KB")
+
+        write(f"Peak RSS: {peak_rss()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the generation of cards.")
+    parser.add_argument("--balls", type=int, default=10, help="Number of different balls.")
+    parser.add_argument("--specials", type=int, default=2, help="Number of special events.")
+    parser.add_argument("--cards", type=int, default=200, help="Number of cards to draw.")
+    parser.add_argument(
+        "--encodes", type=int, default=20, help="Number of cards to encode in each format."
+    )
+    parser.add_argument("--spawns", type=int, default=200, help="Number of spawn files to read.")
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        default=DEFAULT_FORMATS,
+        help='Encodings to compare, as "FORMAT[:QUALITY]".',
+    )
+    parser.add_argument(
+        "--assets-size",
+        type=int,
+        default=256,
+        help="Memory budget of the asset store in megabytes.",
+    )
+    args = parser.parse_args()
+    benchmark(
+        balls=args.balls,
+        specials=args.specials,
+        cards=args.cards,
+        encodes=args.encodes,
+        spawns=args.spawns,
+        formats=args.formats,
+        assets_size=args.assets_size,
+    )
+
+
+if __name__ == "__main__":
+    main()
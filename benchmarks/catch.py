@@ -0,0 +1,163 @@
+"""
+Benchmark of the database queries of a catch, comparing the current single statement with the
+previous sequence of ORM queries.
+
+Usage: "python3 -m benchmarks.catch --help"
+
+This needs a PostgreSQL database with the bot's schema and at least one ball, given with
+--db-url or the BALLSDEXBOT_DB_URL environment variable. Use a development database: fake
+players are created, then deleted with everything they caught at the end.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, cast
+
+from tortoise import Tortoise
+from tortoise.timezone import now as tortoise_now
+
+from ballsdex.core.models import Ball, BallInstance, Player, Trade, TradeObject
+from ballsdex.packages.countryballs.countryball import BallSpawnView
+
+# discord IDs of the fake players, far from real snowflakes
+FIRST_PLAYER_ID = 10**17
+
+
+async def catch_with_orm(view: BallSpawnView, player: Player) -> tuple[BallInstance, bool]:
+    """
+    The catch queries as sent before `CATCH_QUERY`, one round trip each.
+    """
+    is_new = not await BallInstance.filter(player=player, ball=view.model).exists()
+    ball = await BallInstance.create(
+        ball=view.model,
+        player=player,
+        special=None,
+        attack_bonus=random.randint(-20, 20),
+        health_bonus=random.randint(-20, 20),
+        server_id=None,
+        spawned_time=view.record.spawned_at,
+    )
+    return ball, is_new
+
+
+async def transfer_with_orm(view: BallSpawnView, player: Player) -> tuple[BallInstance, bool]:
+    """
+    The transfer queries as sent before `TRANSFER_QUERY`, one round trip each.
+    """
+    assert view.ballinstance
+    is_new = not await BallInstance.filter(player=player, ball=view.model).exists()
+    trade = await Trade.create(player1=view.ballinstance.player, player2=player)
+    await TradeObject.create(
+        trade=trade, player=view.ballinstance.player, ballinstance=view.ballinstance
+    )
+    view.ballinstance.trade_player = view.ballinstance.player
+    view.ballinstance.player = player
+    view.ballinstance.locked = None  # type: ignore
+    await view.ballinstance.save(update_fields=("player_id", "trade_player_id", "locked"))
+    return view.ballinstance, is_new
+
+
+async def catch_with_statement(view: BallSpawnView, player: Player) -> tuple[BallInstance, bool]:
+    user = SimpleNamespace(id=player.discord_id)
+    return await view.catch_ball(cast(Any, user), player=player, guild=None)
+
+
+async def measure(
+    func: Callable[[BallSpawnView, Player], Awaitable[tuple[BallInstance, bool]]],
+    ball: Ball,
+    players: list[Player],
+    catches: int,
+    transfer: bool,
+) -> tuple[list[float], int]:
+    """
+    Run `catches` catches with random players and return the time taken by each, and the number
+    of first catches.
+    """
+    bot = SimpleNamespace(catch_log=set())
+    spawned_at = tortoise_now()
+    timings: list[float] = []
+    new = 0
+    previous: BallInstance | None = None
+    if transfer:
+        # the same instance is passed from player to player
+        previous = await BallInstance.create(
+            ball=ball, player=players[0], attack_bonus=0, health_bonus=0
+        )
+    for _ in range(catches):
+        view = BallSpawnView(cast(Any, bot), ball)
+        view.record.spawned_at = spawned_at
+        view.ballinstance = previous
+        player = random.choice(players)
+        t1 = time.perf_counter()
+        instance, is_new = await func(view, player)
+        timings.append(time.perf_counter() - t1)
+        new += is_new
+        previous = instance
+    return timings, new
+
+
+def report(name: str, timings: list[float], new: int):
+    quantiles = statistics.quantiles(timings, n=100, method="inclusive")
+    print(
+        f"  {name:<12} p50 {quantiles[49] * 1000:7.2f}ms   p95 {quantiles[94] * 1000:7.2f}ms   "
+        f"{new} first catches"
+    )
+
+
+async def benchmark(db_url: str, catches: int, players: int):
+    await Tortoise.init(
+        config={
+            "connections": {"default": db_url},
+            "apps": {"models": {"models": ["ballsdex.core.models"]}},
+        }
+    )
+    try:
+        ball = await Ball.first()
+        if ball is None:
+            raise RuntimeError("The database must contain at least one ball.")
+        fake_players = [
+            (await Player.get_or_create(discord_id=FIRST_PLAYER_ID + i))[0] for i in range(players)
+        ]
+        try:
+            print(f"{catches} catches of {ball.country} by {players} players")
+            for kind, transfer in (("New instance", False), ("Transfer", True)):
+                print(kind)
+                old = transfer_with_orm if transfer else catch_with_orm
+                for name, func in (("ORM queries", old), ("statement", catch_with_statement)):
+                    # the first catches warm the connection pool and the database cache
+                    await measure(func, ball, fake_players, 10, transfer)
+                    timings, new = await measure(func, ball, fake_players, catches, transfer)
+                    report(name, timings, new)
+        finally:
+            # foreign keys of the schema created by Django do not cascade
+            ids = [x.pk for x in fake_players]
+            await TradeObject.filter(player_id__in=ids).delete()
+            await Trade.filter(player1_id__in=ids).delete()
+            await BallInstance.filter(player_id__in=ids).delete()
+            await Player.filter(id__in=ids).delete()
+    finally:
+        await Tortoise.close_connections()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the database queries of a catch.")
+    parser.add_argument(
+        "--db-url",
+        default=os.environ.get("BALLSDEXBOT_DB_URL"),
+        help="URL of the database, defaults to the BALLSDEXBOT_DB_URL environment variable.",
+    )
+    parser.add_argument("--catches", type=int, default=500, help="Number of catches.")
+    parser.add_argument("--players", type=int, default=20, help="Number of fake players.")
+    args = parser.parse_args()
+    if not args.db_url:
+        parser.error("No database URL given.")
+    asyncio.run(benchmark(args.db_url, args.catches, args.players))
+
+
+if __name__ == "__main__":
+    main()
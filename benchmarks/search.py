@@ -0,0 +1,215 @@
+"""
+Benchmark of the countryball searches, comparing the previous queries with the trigram indexed
+"search_text" column added by the admin panel migration 0009.
+
+Usage: "python3 -m benchmarks.search --help"
+
+This needs a PostgreSQL database with the admin panel migrations applied and at least one
+regime and economy, given with --db-url or the BALLSDEXBOT_DB_URL environment variable. Use a
+development database: fake balls and a fake player owning instances of them are created, then
+deleted at the end.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import string
+import time
+from typing import Any
+
+from tortoise import Tortoise
+from tortoise.transactions import in_transaction
+
+from ballsdex.core.models import Ball, BallInstance, Economy, Player, Regime
+
+# discord ID of the fake player, far from real snowflakes
+PLAYER_ID = 10**17
+# prefix of the fake balls' names, to delete them afterwards
+PREFIX = "zzbench"
+
+# the query of the admin panel's default search on all fields, for one word
+ADMIN_QUERY_BEFORE = """
+SELECT id FROM ball WHERE UPPER(country::text) LIKE UPPER($1)
+    OR UPPER(capacity_name::text) LIKE UPPER($1)
+    OR UPPER(capacity_description::text) LIKE UPPER($1)
+    OR UPPER(catch_names::text) LIKE UPPER($1)
+    OR UPPER(translations::text) LIKE UPPER($1)
+    OR UPPER(credits::text) LIKE UPPER($1)
+    OR UPPER(id::text) LIKE UPPER($1)
+"""
+ADMIN_QUERY_AFTER = "SELECT id FROM ball WHERE search_text LIKE lower($1)"
+# instances of a player matching a search, as queried by autocompletion before it was indexed
+INSTANCE_QUERY_BEFORE = """
+SELECT i.id FROM ballinstance i JOIN ball b ON b.id = i.ball_id
+WHERE i.player_id = $2 AND (
+    to_hex(i.id) || ' ' || b.country || ' ' || COALESCE(b.catch_names, '') || ' '
+    || COALESCE(b.translations, '')
+) ILIKE $1
+LIMIT 25
+"""
+INSTANCE_QUERY_AFTER = """
+SELECT id FROM ballinstance
+WHERE player_id = $2 AND ball_id IN (SELECT id FROM ball WHERE search_text LIKE lower($1))
+LIMIT 25
+"""
+
+
+def random_words(count: int) -> str:
+    return " ".join(
+        "".join(random.choices(string.ascii_lowercase, k=random.randint(4, 10)))
+        for _ in range(count)
+    )
+
+
+def plan_nodes(plan: dict[str, Any]) -> list[str]:
+    """
+    Return the node types of a plan and their relation or index, depth first.
+    """
+    node = plan["Node Type"]
+    if target := plan.get("Index Name") or plan.get("Relation Name"):
+        node += f" on {target}"
+    nodes = [node]
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+async def measure(query: str, params: list[Any], runs: int, *, use_index: bool = True):
+    """
+    Print the plan of a query and the median of its execution time, as measured by
+    EXPLAIN ANALYZE and from the client.
+    """
+    async with in_transaction() as connection:
+        if not use_index:
+            await connection.execute_script(
+                "SET LOCAL enable_bitmapscan = off; SET LOCAL enable_indexscan = off"
+            )
+        server: list[float] = []
+        client: list[float] = []
+        nodes: list[str] = []
+        for _ in range(runs):
+            rows = await connection.execute_query_dict(
+                f"EXPLAIN (ANALYZE, FORMAT JSON) {query}", params
+            )
+            result = rows[0]["QUERY PLAN"]
+            if isinstance(result, str):
+                result = json.loads(result)
+            server.append(result[0]["Execution Time"])
+            nodes = plan_nodes(result[0]["Plan"])
+            t1 = time.perf_counter()
+            await connection.execute_query(query, params)
+            client.append((time.perf_counter() - t1) * 1000)
+    print(
+        f"    server {statistics.median(server):8.2f}ms   "
+        f"client {statistics.median(client):8.2f}ms   plan: {' > '.join(nodes)}"
+    )
+
+
+async def benchmark(db_url: str, balls: int, instances: int, runs: int):
+    await Tortoise.init(
+        config={
+            "connections": {"default": db_url},
+            "apps": {"models": {"models": ["ballsdex.core.models"]}},
+        }
+    )
+    try:
+        connection = Tortoise.get_connection("default")
+        _, rows = await connection.execute_query(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = 'ball' AND column_name = 'search_text'"
+        )
+        if not rows:
+            raise RuntimeError("The search_text column is missing, apply the admin migrations.")
+        regime = await Regime.first()
+        economy = await Economy.first()
+        if regime is None or economy is None:
+            raise RuntimeError("The database must contain at least one regime and economy.")
+
+        fake_balls = [
+            Ball(
+                country=f"{PREFIX} {i} {random_words(1)}",
+                health=100,
+                attack=100,
+                rarity=1,
+                emoji_id=100000000000000000,
+                wild_card="/x.png",
+                collection_card="/x.png",
+                credits=random_words(2),
+                capacity_name=random_words(2),
+                capacity_description=random_words(12),
+                catch_names=";".join(random_words(1) for _ in range(3)),
+                regime=regime,
+                economy=economy,
+            )
+            for i in range(balls)
+        ]
+        await Ball.bulk_create(fake_balls, batch_size=1000)
+        ball_ids = await Ball.filter(country__startswith=PREFIX).values_list("id", flat=True)
+        player, _ = await Player.get_or_create(discord_id=PLAYER_ID)
+        try:
+            await BallInstance.bulk_create(
+                [
+                    BallInstance(
+                        ball_id=random.choice(ball_ids),
+                        player=player,
+                        attack_bonus=0,
+                        health_bonus=0,
+                    )
+                    for _ in range(instances)
+                ],
+                batch_size=5000,
+            )
+            # flush the pending list of the GIN index filled by the inserts, like autovacuum
+            # would, and update the statistics (VACUUM can't run in a multi-statement script)
+            await connection.execute_script("VACUUM ANALYZE ball")
+            await connection.execute_script("VACUUM ANALYZE ballinstance")
+
+            # a word found in a few balls, like a real search
+            sample = await Ball.get(id=random.choice(ball_ids))
+            term = sample.country.split()[-1][:5]
+            pattern = f"%{term}%"
+            print(f"{balls} fake balls, {instances} instances, searching {term!r}")
+            print("Admin search of balls")
+            print("  before: default search on every field")
+            await measure(ADMIN_QUERY_BEFORE, [pattern], runs)
+            print("  after: search_text without its index")
+            await measure(ADMIN_QUERY_AFTER, [pattern], runs, use_index=False)
+            print("  after: search_text")
+            await measure(ADMIN_QUERY_AFTER, [pattern], runs)
+            print("Instances of a player matching a search")
+            print("  before: concatenated text of every instance")
+            await measure(INSTANCE_QUERY_BEFORE, [pattern, player.pk], runs)
+            print("  after: balls from search_text")
+            await measure(INSTANCE_QUERY_AFTER, [pattern, player.pk], runs)
+        finally:
+            # foreign keys of the schema created by Django do not cascade
+            await BallInstance.filter(player=player).delete()
+            await player.delete()
+            await Ball.filter(country__startswith=PREFIX).delete()
+    finally:
+        await Tortoise.close_connections()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the countryball searches.")
+    parser.add_argument(
+        "--db-url",
+        default=os.environ.get("BALLSDEXBOT_DB_URL"),
+        help="URL of the database, defaults to the BALLSDEXBOT_DB_URL environment variable.",
+    )
+    parser.add_argument("--balls", type=int, default=5000, help="Number of fake balls.")
+    parser.add_argument(
+        "--instances", type=int, default=50000, help="Number of instances of the fake player."
+    )
+    parser.add_argument("--runs", type=int, default=20, help="Number of runs of each query.")
+    args = parser.parse_args()
+    if not args.db_url:
+        parser.error("No database URL given.")
+    asyncio.run(benchmark(args.db_url, args.balls, args.instances, args.runs))
+
+
+if __name__ == "__main__":
+    main()
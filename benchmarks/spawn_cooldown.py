@@ -0,0 +1,67 @@
+"""
+Micro-benchmark of the hot path of the default spawn manager, run on every message received.
+
+Usage: "python3 -m benchmarks.spawn_cooldown --help"
+"""
+
+import argparse
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from ballsdex.packages.countryballs.spawn import SpawnCooldown
+
+
+def penalized_by_scan(cache: deque[tuple[str, int]], author_id: int) -> bool:
+    """
+    The chatter penality computed by scanning a deque of whole messages, as done before the
+    counters.
+    """
+    return len(set(x[1] for x in cache)) < 4 or (
+        len(list(filter(lambda x: x[1] == author_id, cache))) / cache.maxlen > 0.4  # type: ignore
+    )
+
+
+def penalized_by_counters(cooldown: SpawnCooldown, author_id: int) -> bool:
+    return cooldown.distinct_authors < 4 or cooldown.author_share(author_id) > 0.4
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the spawn manager's message cache.")
+    parser.add_argument("--messages", type=int, default=200_000, help="Number of messages.")
+    parser.add_argument("--authors", type=int, default=20, help="Number of distinct authors.")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    messages = [
+        ("x" * rng.randint(1, 40), rng.randrange(args.authors)) for _ in range(args.messages)
+    ]
+
+    cache: deque[tuple[str, int]] = deque(maxlen=100)
+    t1 = time.perf_counter()
+    for content, author_id in messages:
+        cache.append((content, author_id))
+        penalized_by_scan(cache, author_id)
+    scan = time.perf_counter() - t1
+
+    cooldown = SpawnCooldown(datetime.now(timezone.utc))
+    t1 = time.perf_counter()
+    for content, author_id in messages:
+        cooldown.cache_message(len(content), author_id)
+        penalized_by_counters(cooldown, author_id)
+    counters = time.perf_counter() - t1
+
+    # both methods must agree on the final state
+    assert all(
+        penalized_by_scan(cache, x) == penalized_by_counters(cooldown, x)
+        for x in range(args.authors)
+    )
+    print(f"{args.messages} messages from {args.authors} authors")
+    print(f"  scan     {scan / args.messages * 1e6:8.2f}µs per message")
+    print(f"  counters {counters / args.messages * 1e6:8.2f}µs per message")
+    print(f"Speedup: {scan / counters:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import asyncio
+
+from ballsdex.core.utils.completion import CompletionIndex, PlayerCompletion
+
+
+class SlowIndex(CompletionIndex):
+    """
+    Completion index returning the snapshot given for each load, once released.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.loaded = 0
+        self.queue: asyncio.Queue[tuple[asyncio.Event, PlayerCompletion]] = asyncio.Queue()
+
+    async def _load(self, player_id: int) -> PlayerCompletion:
+        self.loaded += 1
+        release, snapshot = await self.queue.get()
+        await release.wait()
+        return snapshot
+
+
+def test_concurrent_reads_share_one_load():
+    async def run():
+        index = SlowIndex()
+        release = asyncio.Event()
+        await index.queue.put((release, PlayerCompletion()))
+        readers = [asyncio.create_task(index.get(1)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        release.set()
+        results = await asyncio.gather(*readers)
+        assert index.loaded == 1
+        assert all(x is results[0] for x in results)
+        assert index.peek(1) is results[0]
+
+    asyncio.run(run())
+
+
+def test_change_during_load_is_not_lost():
+    async def run():
+        index = SlowIndex()
+        first, second = asyncio.Event(), asyncio.Event()
+        await index.queue.put((first, PlayerCompletion()))
+        await index.queue.put((second, PlayerCompletion()))
+
+        reader_a = asyncio.create_task(index.get(1))
+        await asyncio.sleep(0.01)
+        # a change detaches the running load, the next reader starts another one
+        index.invalidate(1)
+        reader_b = asyncio.create_task(index.get(1))
+        await asyncio.sleep(0.01)
+        assert index.loaded == 2
+
+        first.set()
+        await reader_a
+        index.add(1, 5)
+        # the second snapshot was taken before the catch of ball 5
+        second.set()
+        await reader_b
+        completion = index.peek(1)
+        assert completion is None or completion.has(5)
+
+    asyncio.run(run())
@@ -0,0 +1,104 @@
+import random
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ballsdex.core.models import Ball, Special, balls, specials
+from ballsdex.core.utils import sampling
+from ballsdex.core.utils.sampling import AliasTable, SpawnSampler
+
+DRAWS = 200_000
+# absolute tolerance on the frequency of each item, several standard deviations for DRAWS
+TOLERANCE = 0.005
+
+
+def frequencies(draw, count: int = DRAWS) -> dict:
+    counter = Counter(draw() for _ in range(count))
+    return {item: n / count for item, n in counter.items()}
+
+
+@pytest.fixture
+def cache():
+    """
+    Replace the cached balls and specials for the duration of a test.
+    """
+    previous_balls, previous_specials = dict(balls), dict(specials)
+    balls.clear()
+    specials.clear()
+    random.seed(1234)
+    yield
+    balls.clear()
+    balls.update(previous_balls)
+    specials.clear()
+    specials.update(previous_specials)
+
+
+def test_alias_table_matches_weights(cache):
+    weights = [1, 2, 3, 10, 0.5, 0]
+    table = AliasTable(list(range(len(weights))), weights)
+    result = frequencies(table.sample)
+    total = sum(weights)
+    for item, weight in enumerate(weights):
+        assert result.get(item, 0) == pytest.approx(weight / total, abs=TOLERANCE)
+
+
+def test_alias_table_rejects_invalid_weights():
+    with pytest.raises(ValueError):
+        AliasTable([], [])
+    with pytest.raises(ValueError):
+        AliasTable([1, 2], [1])
+    with pytest.raises(ValueError):
+        AliasTable([1, 2], [0, 0])
+    with pytest.raises(ValueError):
+        AliasTable([1, 2], [1, -1])
+
+
+def test_spawned_balls_follow_rarities(cache):
+    rarities = {1: 1.0, 2: 0.5, 3: 4.0, 4: 0.1, 5: 2.0}
+    for pk, rarity in rarities.items():
+        balls[pk] = Ball(id=pk, country=f"ball {pk}", rarity=rarity, enabled=True)
+    balls[6] = Ball(id=6, country="disabled", rarity=5.0, enabled=False)
+    balls[7] = Ball(id=7, country="never spawns", rarity=0, enabled=True)
+    sampler = SpawnSampler()
+    sampler.rebuild()
+
+    result = frequencies(lambda: sampler.get_ball().pk)
+    total = sum(rarities.values())
+    assert result.keys() <= rarities.keys()
+    for pk, rarity in rarities.items():
+        assert result.get(pk, 0) == pytest.approx(rarity / total, abs=TOLERANCE)
+
+
+def test_specials_follow_rarities(cache):
+    specials[1] = Special(id=1, name="common event", rarity=0.2)
+    specials[2] = Special(id=2, name="rare event", rarity=0.05)
+    sampler = SpawnSampler()
+    sampler.rebuild()
+
+    result = frequencies(lambda: (x := sampler.get_special()) and x.pk)
+    assert result.get(1, 0) == pytest.approx(0.2, abs=TOLERANCE)
+    assert result.get(2, 0) == pytest.approx(0.05, abs=TOLERANCE)
+    assert result.get(None, 0) == pytest.approx(0.75, abs=TOLERANCE)
+
+
+def test_special_dropped_after_end_date(cache, monkeypatch):
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    monkeypatch.setattr(sampling, "tortoise_now", lambda: now)
+    specials[1] = Special(id=1, name="ending", rarity=0.5, end_date=now + timedelta(hours=1))
+    specials[2] = Special(id=2, name="upcoming", rarity=0.5, start_date=now + timedelta(hours=2))
+    sampler = SpawnSampler()
+    sampler.rebuild()
+    assert sampler.next_boundary == now + timedelta(hours=1)
+    assert {x and x.pk for x in (sampler.get_special() for _ in range(1000))} == {1, None}
+
+    # the event ended, the table is rebuilt on the next draw
+    now += timedelta(hours=1, seconds=1)
+    assert {x and x.pk for x in (sampler.get_special() for _ in range(1000))} == {None}
+    assert sampler.specials is None
+    assert sampler.next_boundary == now + timedelta(minutes=59, seconds=59)
+
+    # the upcoming event started
+    now += timedelta(hours=1)
+    assert {x and x.pk for x in (sampler.get_special() for _ in range(1000))} == {2, None}
+    assert sampler.next_boundary is None
@@ -0,0 +1,46 @@
+import asyncio
+from dataclasses import dataclass, field
+
+import discord
+
+from ballsdex.packages.countryballs.replay import compare, run_virtual, synthetic_stream
+from ballsdex.packages.countryballs.spawn import RATE_LIMIT, SpawnCooldown, SpawnManager
+
+
+@dataclass(slots=True)
+class LockSpawnCooldown(SpawnCooldown):
+    """
+    The previous rate limiting of `SpawnCooldown`, holding a lock while sleeping.
+    """
+
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False)
+
+    async def increase(self, message: discord.Message) -> bool:
+        self.cache_message(len(message.content), message.author.id)
+
+        if self.lock.locked():
+            return False
+
+        async with self.lock:
+            message_multiplier = 1 * 3
+            if message.guild.member_count < 5 or message.guild.member_count > 1000:  # type: ignore
+                message_multiplier /= 2
+            if message._state.intents.message_content and len(message.content) < 5:
+                message_multiplier /= 2
+            if self.distinct_authors < 4 or self.author_share(message.author.id) > 0.4:
+                message_multiplier /= 2
+            self.scaled_message_count += message_multiplier
+            await asyncio.sleep(RATE_LIMIT)
+        return True
+
+
+class LockSpawnManager(SpawnManager):
+    cooldown_class = LockSpawnCooldown
+
+
+def test_same_decisions_as_lock_rate_limit():
+    messages = synthetic_stream(guilds=10, hours=6, seed=1234)
+    expected, actual = run_virtual(compare((LockSpawnManager, SpawnManager), messages, seed=1234))
+    assert len(actual) == len(messages)
+    assert sum(expected) > 0
+    assert [i for i, (a, b) in enumerate(zip(expected, actual)) if a != b] == []